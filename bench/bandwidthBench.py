@@ -0,0 +1,136 @@
+"""
+Bandwidth Limit Benchmark for IDLIX Downloader
+
+Downloads from the stand-in server under a global --rate-limit and checks
+that the limiter holds it:
+    single    one download alone gets the whole rate
+    two       two downloads at once share the rate
+    play      one download while a play job holds its share gets
+              rate * download weight / (download + play weight)
+Reports the measured rate of the downloads next to the expected one.
+
+Usage   :   python -m bench.bandwidthBench [--rate-limit 4M] [--weights play=8,download=1] [--json result.json] [--compare old.json]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.e2eBench import start_server
+from bench.standinServer import add_config_arguments
+from src import logPipeline
+from src.hlsDownloader import HlsDownloader
+from src.jobControl import Job
+from src.bandwidthLimiter import bandwidth, parse_rate, parse_weights
+
+SCENARIOS = ('single', 'two', 'play')
+
+
+def download(base_url, name, sizes):
+    downloader = HlsDownloader(
+        f'{base_url}cdn/{name}/720/media.m3u8', name, mode='preallocate', remux=False, job=Job(budget=None)
+    )
+    path = downloader.download()
+    sizes[name] = os.path.getsize(path)
+    os.remove(path)
+
+
+def run_scenario(base_url, scenario):
+    names = ['a', 'b'] if scenario == 'two' else ['a']
+    player = Job(budget=None, kind='play')
+    if scenario == 'play':
+        player.bandwidth.hold()
+    sizes = {}
+    threads = [threading.Thread(target=download, args=(base_url, f'{scenario}{name}', sizes)) for name in names]
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        player.bandwidth.release()
+    wall = time.perf_counter() - started
+
+    rate = bandwidth.rate
+    if scenario == 'play':
+        download_weight, play_weight = bandwidth.weights['download'], bandwidth.weights['play']
+        rate = rate * download_weight / (download_weight + play_weight)
+    measured = sum(sizes.values()) / wall
+    return {
+        'downloads': len(sizes),
+        'bytes': sum(sizes.values()),
+        'wall_s': round(wall, 3),
+        'measured_kb_s': round(measured / 1024, 1),
+        'expected_kb_s': round(rate / 1024, 1),
+        'ratio': round(measured / rate, 3) if rate else None,
+    }
+
+
+def print_results(results, baseline=None):
+    header = f"{'scenario':<10}{'done':>6}{'wall s':>9}{'measured KB/s':>15}{'expected KB/s':>15}{'ratio':>8}"
+    print(header + (f"{'base ratio':>12}" if baseline else ''))
+    for scenario, result in results['scenarios'].items():
+        row = (
+            f"{scenario:<10}{result['downloads']:>6}{result['wall_s']:>9}{result['measured_kb_s']:>15}"
+            f"{result['expected_kb_s']:>15}{str(result['ratio']):>8}"
+        )
+        old = baseline and baseline['scenarios'].get(scenario)
+        if old:
+            row += f"{str(old['ratio']):>12}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Global bandwidth limit and play priority benchmark")
+    add_config_arguments(parser)
+    parser.set_defaults(segments=120, segment_size=128 * 1024, page_padding=20 * 1024, latency=0.01)
+    parser.add_argument('--rate-limit', default='4M', help='global rate, e.g. 500K or 4M (bytes/s)')
+    parser.add_argument('--weights', default='', help='bandwidth weight per job kind, e.g. play=8,download=1')
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS), help='comma separated, from: ' + ", ".join(SCENARIOS))
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results JSON of an earlier run to compare with')
+    args = parser.parse_args()
+
+    logPipeline.configure(level='ERROR')
+    bandwidth.configure(rate=parse_rate(args.rate_limit), weights=parse_weights(args.weights))
+    process, base_url = start_server(args)
+    work_dir = tempfile.mkdtemp(prefix='idlix_bandwidth_bench_')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        results = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'rate': bandwidth.rate,
+            'weights': dict(bandwidth.weights),
+            'scenarios': {
+                scenario: run_scenario(base_url, scenario)
+                for scenario in args.scenarios.split(',') if scenario in SCENARIOS
+            },
+        }
+    finally:
+        os.chdir(previous_dir)
+        process.terminate()
+        process.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
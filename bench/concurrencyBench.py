@@ -0,0 +1,170 @@
+"""
+Adaptive Concurrency Benchmark for IDLIX Downloader
+
+Downloads the same titles from the stand-in server with a fixed worker
+count and with the adaptive (AIMD) limit, under three network profiles:
+    fat       per-connection bandwidth cap, more connections = more goodput
+    weak      one slow link shared by every connection
+    throttle  a CDN that answers 429 above a number of segments in flight
+Reports goodput, wall time, 429s seen and where the adaptive limit settled.
+
+Usage   :   python -m bench.concurrencyBench [--profiles fat,weak,throttle] [--workers 10] [--json result.json] [--compare old.json]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.e2eBench import start_server, point_helpers_at, percentiles
+from bench.standinServer import add_config_arguments
+from src import logPipeline
+from src.idlixHelper import IdlixHelper
+from src.hlsDownloader import HlsDownloader
+from src.sessionPool import SessionPool
+from src.metrics import metrics
+
+# Server settings per profile, on top of the command line defaults
+PROFILES = {
+    'fat': {'latency': 0.05, 'bandwidth': 512 * 1024},
+    'weak': {'latency': 0.02, 'link_bandwidth': 2 * 1024 * 1024},
+    'throttle': {'latency': 0.05, 'bandwidth': 512 * 1024, 'max_inflight': 6},
+}
+STRATEGIES = ('fixed', 'adaptive')
+
+
+def profile_args(args, profile):
+    values = argparse.Namespace(**vars(args))
+    for key, value in PROFILES[profile].items():
+        setattr(values, key, value)
+    return values
+
+
+def bench_strategy(base_url, pool, args, strategy):
+    metrics.reset()
+    good_bytes, runs, errors, limits = 0, [], [], []
+    started = time.perf_counter()
+    for i in range(args.downloads):
+        helper = IdlixHelper(cache=False, pool=pool)
+        if not (helper.get_video_data(f'{base_url}movie/movie-{i}/').get('status')
+                and helper.get_embed_url().get('status') and helper.get_m3u8_url().get('status')):
+            errors.append(f'movie-{i}: resolve failed')
+            continue
+        run_started = time.perf_counter()
+        result = helper.download_m3u8(max_num_workers=args.workers, mode=args.mode, remux=False,
+                                      adaptive=strategy == 'adaptive')
+        runs.append(time.perf_counter() - run_started)
+        if not result.get('status'):
+            errors.append(f'movie-{i}: {result.get("message")}')
+            continue
+        good_bytes += os.path.getsize(result['path'])
+        os.remove(result['path'])
+        limits += [value for (name, _), value in metrics.gauges.items() if name == 'segment_concurrency']
+    wall = time.perf_counter() - started
+    changes = sum(value for (name, _), value in metrics.counters.items() if name == 'concurrency_changes_total')
+    return {
+        'downloaded': args.downloads - len(errors),
+        'bytes': good_bytes,
+        'wall_s': round(wall, 3),
+        'goodput_mb_s': round(good_bytes / wall / 1024 / 1024, 2) if wall else None,
+        'per_title': percentiles(runs),
+        'final_limit': limits[-1] if limits else args.workers,
+        'limit_changes': changes,
+        'errors': errors,
+    }
+
+
+def run_profile(args, profile):
+    values = profile_args(args, profile)
+    results = {}
+    for strategy in STRATEGIES:
+        # A fresh server per strategy so the 429 counters belong to it alone
+        process, base_url = start_server(values)
+        point_helpers_at(base_url)
+        pool = SessionPool()
+        try:
+            results[strategy] = bench_strategy(base_url, pool, args, strategy)
+            # Not through the pool, a circuit opened by the 429s must not hide the counters
+            with urllib.request.urlopen(base_url + '__stats') as stats:
+                server = json.load(stats)
+        finally:
+            pool.close()
+            process.terminate()
+            process.wait()
+        results[strategy]['throttled'] = server['faults'].get('429', 0)
+        results[strategy]['segment_requests'] = server['requests'].get('segment', 0)
+    return {'server': PROFILES[profile], 'strategies': results}
+
+
+def print_results(results, baseline=None):
+    header = f"{'profile':<10}{'strategy':<10}{'done':>6}{'wall s':>9}{'goodput MB/s':>14}{'429s':>7}{'requests':>10}{'limit':>7}{'changes':>9}"
+    print(header + (f"{'base MB/s':>11}{'change':>9}" if baseline else ''))
+    for profile, result in results['profiles'].items():
+        for strategy, run in result['strategies'].items():
+            row = (
+                f"{profile:<10}{strategy:<10}{run['downloaded']:>6}{run['wall_s']:>9}{str(run['goodput_mb_s']):>14}"
+                f"{run['throttled']:>7}{run['segment_requests']:>10}{run['final_limit']:>7}{run['limit_changes']:>9}"
+            )
+            old = baseline and baseline['profiles'].get(profile, {}).get('strategies', {}).get(strategy)
+            if old:
+                old_goodput = old['goodput_mb_s']
+                change = f"{(run['goodput_mb_s'] - old_goodput) / old_goodput * 100:+.1f}%" if old_goodput else '-'
+                row += f"{old_goodput:>11}{change:>9}"
+            print(row)
+    for profile, result in results['profiles'].items():
+        for strategy, run in result['strategies'].items():
+            for error in run['errors']:
+                print(f'{profile} {strategy}: {error}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixed vs adaptive segment concurrency benchmark")
+    add_config_arguments(parser)
+    parser.set_defaults(titles=2, segments=60, segment_size=256 * 1024, page_padding=20 * 1024)
+    parser.add_argument('--profiles', default=",".join(PROFILES), help='comma separated, from: ' + ", ".join(PROFILES))
+    parser.add_argument('--downloads', type=int, default=2, help='titles to download per strategy')
+    parser.add_argument('--workers', type=int, default=HlsDownloader.MAX_NUM_WORKERS,
+                        help='fixed worker count, and where the adaptive limit starts')
+    parser.add_argument('--mode', choices=HlsDownloader.MODES, default='preallocate')
+    parser.add_argument('--log-level', default='ERROR', help='DEBUG shows every change of the adaptive limit')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results JSON of an earlier run to compare with')
+    args = parser.parse_args()
+
+    logPipeline.configure(level=args.log_level.upper())
+    work_dir = tempfile.mkdtemp(prefix='idlix_concurrency_bench_')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        results = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'workers': args.workers,
+            'bounds': [HlsDownloader.MIN_WORKERS, HlsDownloader.MAX_WORKERS],
+            'profiles': {
+                profile: run_profile(args, profile)
+                for profile in args.profiles.split(',') if profile in PROFILES
+            },
+        }
+    finally:
+        os.chdir(previous_dir)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+End-to-end Benchmark for IDLIX Downloader
+
+Starts bench/standinServer.py in a child process, points IdlixHelper at it
+and measures, fully offline:
+    resolve        page -> embed -> m3u8 per title (sync helper, no cache)
+    async resolve  the same titles through AsyncIdlixHelper.resolve_many
+    download       download_m3u8 of the first --downloads titles
+plus CPU time and peak RSS of this process (the server runs in its own).
+ffmpeg must be in PATH, IdlixHelper refuses to start without it; the default
+preallocate mode without remux never calls it.
+
+Usage   :   python -m bench.e2eBench [--latency 0.02] [--json result.json] [--compare old.json]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import platform
+import argparse
+import tempfile
+import subprocess
+from statistics import mean, quantiles
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.standinServer import add_config_arguments, config_arguments
+from src import logPipeline
+from src.idlixHelper import IdlixHelper
+from src.asyncIdlixHelper import AsyncIdlixHelper
+from src.hlsDownloader import HlsDownloader
+from src.sessionPool import SessionPool
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ('get_video_data', 'get_embed_url', 'get_m3u8_url')
+
+
+def start_server(args):
+    command = [sys.executable, '-m', 'bench.standinServer', '--port', '0'] + config_arguments(args)
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Serving on '):
+        process.kill()
+        raise Exception('Stand-in server did not start')
+    return process, line.split('Serving on ', 1)[1].strip()
+
+
+def point_helpers_at(base_url):
+    IdlixHelper.BASE_WEB_URL = base_url
+    IdlixHelper.JENIUSPLAY_URL = base_url + 'player/index.php'
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    if len(values) == 1:
+        cuts = values * 99
+    else:
+        cuts = quantiles(values, n=100, method='inclusive')
+    return {
+        'mean_ms': round(mean(values) * 1000, 2),
+        'p50_ms': round(cuts[49] * 1000, 2),
+        'p90_ms': round(cuts[89] * 1000, 2),
+        'p95_ms': round(cuts[94] * 1000, 2),
+        'p99_ms': round(cuts[98] * 1000, 2),
+        'max_ms': round(values[-1] * 1000, 2),
+    }
+
+
+def usage():
+    if resource is None:
+        return {'cpu_s': round(time.process_time(), 3), 'peak_rss_mb': None}
+    rusage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'cpu_s': round(rusage.ru_utime + rusage.ru_stime, 3),
+        'peak_rss_mb': round(rusage.ru_maxrss / scale, 1),
+    }
+
+
+def bench_resolve(urls, pool):
+    helpers, totals, stages, errors = [], [], {stage: [] for stage in STAGES}, []
+    for url in urls:
+        helper = IdlixHelper(cache=False, pool=pool)
+        started = time.perf_counter()
+        for stage in STAGES:
+            stage_started = time.perf_counter()
+            result = getattr(helper, stage)(url) if stage == 'get_video_data' else getattr(helper, stage)()
+            stages[stage].append(time.perf_counter() - stage_started)
+            if not result.get('status'):
+                errors.append(f'{url} {stage}: {result.get("message")}')
+                break
+        else:
+            totals.append(time.perf_counter() - started)
+            helpers.append(helper)
+    return helpers, {
+        'titles': len(urls),
+        'resolved': len(totals),
+        'errors': errors,
+        'latency': percentiles(totals),
+        'stages': {stage: percentiles(values) for stage, values in stages.items()},
+    }
+
+
+def bench_async_resolve(urls):
+    async def run():
+        async with AsyncIdlixHelper() as helper:
+            return await helper.resolve_many(urls)
+
+    started = time.perf_counter()
+    titles = asyncio.run(run())
+    return {
+        'titles': len(urls),
+        'resolved': sum(1 for title in titles if title.status),
+        'wall_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def bench_download(helpers, segments, workers, mode, remux):
+    runs, total_bytes, errors = [], 0, []
+    started = time.perf_counter()
+    for helper in helpers:
+        run_started = time.perf_counter()
+        result = helper.download_m3u8(max_num_workers=workers, mode=mode, remux=remux)
+        elapsed = time.perf_counter() - run_started
+        if not result.get('status'):
+            errors.append(f'{helper.video_name}: {result.get("message")}')
+            continue
+        size = os.path.getsize(result['path'])
+        runs.append(elapsed)
+        total_bytes += size
+        os.remove(result['path'])
+    wall = time.perf_counter() - started
+    return {
+        'titles': len(helpers),
+        'downloaded': len(runs),
+        'errors': errors,
+        'mode': mode,
+        'workers': workers,
+        'bytes': total_bytes,
+        'wall_s': round(wall, 3),
+        'throughput_mb_s': round(total_bytes / wall / 1024 / 1024, 2) if wall else None,
+        'segments_per_s': round(len(runs) * segments / wall, 1) if wall else None,
+        'per_title': percentiles(runs),
+    }
+
+
+def run(args):
+    process, base_url = start_server(args)
+    point_helpers_at(base_url)
+    pool = SessionPool()
+    work_dir = tempfile.mkdtemp(prefix='idlix_bench_')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        urls = [f'{base_url}movie/movie-{i}/' for i in range(args.titles)]
+        before = usage()
+        helpers, resolve = bench_resolve(urls, pool)
+        async_resolve = bench_async_resolve(urls)
+        download = bench_download(helpers[:args.downloads], args.segments, args.workers, args.mode, args.remux)
+        after = usage()
+    finally:
+        os.chdir(previous_dir)
+        pool.close()
+        process.terminate()
+        process.wait()
+    return {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            key: getattr(args, key) for key in (
+                'titles', 'segments', 'segment_size', 'latency', 'bandwidth', 'page_padding',
+                'downloads', 'workers', 'mode', 'remux'
+            )
+        },
+        'resolve': resolve,
+        'async_resolve': async_resolve,
+        'download': download,
+        'cpu_s': round(after['cpu_s'] - before['cpu_s'], 3),
+        'peak_rss_mb': after['peak_rss_mb'],
+    }
+
+
+def headline(results):
+    return {
+        'resolve p50 ms': results['resolve']['latency'].get('p50_ms'),
+        'resolve p95 ms': results['resolve']['latency'].get('p95_ms'),
+        'resolve p99 ms': results['resolve']['latency'].get('p99_ms'),
+        'async resolve ms': results['async_resolve']['wall_ms'],
+        'download MB/s': results['download']['throughput_mb_s'],
+        'segments/s': results['download']['segments_per_s'],
+        'cpu s': results['cpu_s'],
+        'peak RSS MB': results['peak_rss_mb'],
+    }
+
+
+def print_results(results, baseline=None):
+    current = headline(results)
+    previous = headline(baseline) if baseline else {}
+    print(f"{'metric':<20}{'value':>12}" + (f"{'baseline':>12}{'change':>10}" if baseline else ''))
+    for name, value in current.items():
+        row = f"{name:<20}{str(value):>12}"
+        if baseline:
+            old = previous.get(name)
+            change = f'{(value - old) / old * 100:+.1f}%' if value is not None and old else '-'
+            row += f"{str(old):>12}{change:>10}"
+        print(row)
+    for error in results['resolve']['errors'] + results['download']['errors']:
+        print(f'error: {error}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against a local stand-in server")
+    add_config_arguments(parser)
+    parser.add_argument('--downloads', type=int, default=3, help='titles to download after resolving')
+    parser.add_argument('--workers', type=int, default=HlsDownloader.MAX_NUM_WORKERS)
+    parser.add_argument('--mode', choices=HlsDownloader.MODES, default='preallocate')
+    parser.add_argument('--remux', action='store_true', help='remux to MP4 with ffmpeg (counted in the timings)')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results JSON of an earlier run to compare with')
+    args = parser.parse_args()
+
+    logPipeline.configure(level='WARNING')
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Fault Recovery Benchmark for IDLIX Downloader
+
+Runs the resolve chain (wrapped in retryPolicy.retry, like the CLI) and
+download_m3u8 against the stand-in server once per fault scenario: clean,
+5xx, 403 token expiry, connection resets, truncated bodies, slow-tail stalls
+and all of them mixed. Reports success, wall time, attempts and goodput next
+to the faults the server actually injected.
+
+Usage   :   python -m bench.faultBench [--rate 0.05] [--scenarios 5xx,slow] [--json result.json] [--compare old.json]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import functools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.e2eBench import start_server, point_helpers_at, percentiles
+from bench.standinServer import FAULTS, add_config_arguments
+from src import logPipeline
+from src.idlixHelper import IdlixHelper
+from src.hlsDownloader import HlsDownloader
+from src.sessionPool import SessionPool
+from src.retryPolicy import retry
+
+SCENARIOS = ('clean',) + FAULTS + ('mixed',)
+
+
+def scenario_args(args, scenario):
+    """
+    Copy of the command line args with the fault rates of one scenario.
+    """
+    values = argparse.Namespace(**vars(args))
+    for fault in FAULTS:
+        if scenario == 'mixed':
+            rate = args.rate / len(FAULTS)
+        else:
+            rate = args.rate if fault == scenario else 0.0
+        setattr(values, f'fault_{fault}', rate)
+    return values
+
+
+def counted(func, counter):
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        counter['attempts'] += 1
+        return func(*args, **kwargs)
+    return call
+
+
+def bench_resolve(urls, pool):
+    helpers, totals, counter, errors = [], [], {'attempts': 0, 'uncaught': 0}, []
+    for url in urls:
+        helper = IdlixHelper(cache=False, pool=pool)
+        started = time.perf_counter()
+        for stage, stage_args in (('get_video_data', (url,)), ('get_embed_url', ()), ('get_m3u8_url', ())):
+            try:
+                result = retry(counted(getattr(helper, stage), counter), *stage_args)
+            except Exception as error_stage:
+                # An exception escaping retry() would end the CLI, count it as its own kind of failure
+                counter['uncaught'] += 1
+                result = {'status': False, 'message': f'uncaught {type(error_stage).__name__}: {error_stage}'}
+            if not result.get('status'):
+                errors.append(f'{url} {stage}: {result.get("message")}')
+                break
+        else:
+            helpers.append(helper)
+        totals.append(time.perf_counter() - started)
+    return helpers, {
+        'titles': len(urls),
+        'resolved': len(helpers),
+        'attempts': counter['attempts'],
+        'uncaught': counter['uncaught'],
+        'wall_s': round(sum(totals), 3),
+        'latency': percentiles(totals),
+        'errors': errors,
+    }
+
+
+def bench_download(helpers, workers, mode):
+    good_bytes, runs, errors = 0, [], []
+    started = time.perf_counter()
+    for helper in helpers:
+        run_started = time.perf_counter()
+        result = helper.download_m3u8(max_num_workers=workers, mode=mode, remux=False)
+        runs.append(time.perf_counter() - run_started)
+        if not result.get('status'):
+            errors.append(f'{helper.video_name}: {result.get("message")}')
+            continue
+        good_bytes += os.path.getsize(result['path'])
+        os.remove(result['path'])
+    wall = time.perf_counter() - started
+    return {
+        'titles': len(helpers),
+        'downloaded': len(helpers) - len(errors),
+        'bytes': good_bytes,
+        'wall_s': round(wall, 3),
+        'goodput_mb_s': round(good_bytes / wall / 1024 / 1024, 2) if wall else None,
+        'per_title': percentiles(runs),
+        'errors': errors,
+    }
+
+
+def run_scenario(args, scenario):
+    values = scenario_args(args, scenario)
+    process, base_url = start_server(values)
+    point_helpers_at(base_url)
+    pool = SessionPool()
+    try:
+        urls = [f'{base_url}movie/movie-{i}/' for i in range(args.titles)]
+        helpers, resolve = bench_resolve(urls, pool)
+        download = bench_download(helpers[:args.downloads], args.workers, args.mode)
+        server = pool.get(base_url + '__stats').json()
+    finally:
+        pool.close()
+        process.terminate()
+        process.wait()
+    segments_needed = download['titles'] * args.segments
+    segment_requests = server['requests'].get('segment', 0)
+    return {
+        'faults': {fault: getattr(values, f'fault_{fault}') for fault in FAULTS},
+        'resolve': resolve,
+        'download': download,
+        'server': server,
+        # Segment requests per segment actually needed, 1.0 = no retries
+        'segment_amplification': round(segment_requests / segments_needed, 3) if segments_needed else None,
+    }
+
+
+def print_results(results, baseline=None):
+    header = f"{'scenario':<10}{'resolved':>10}{'attempts':>10}{'resolve s':>11}{'downloaded':>12}{'download s':>12}{'goodput MB/s':>14}{'amplif.':>9}"
+    print(header + (f"{'base dl s':>11}{'change':>9}" if baseline else ''))
+    for scenario, result in results['scenarios'].items():
+        resolve, download = result['resolve'], result['download']
+        row = (
+            f"{scenario:<10}{resolve['resolved']:>6}/{resolve['titles']:<3}{resolve['attempts']:>10}{resolve['wall_s']:>11}"
+            f"{download['downloaded']:>8}/{download['titles']:<3}{download['wall_s']:>12}"
+            f"{str(download['goodput_mb_s']):>14}{str(result['segment_amplification']):>9}"
+        )
+        old = baseline and baseline['scenarios'].get(scenario)
+        if old:
+            old_wall = old['download']['wall_s']
+            change = f"{(download['wall_s'] - old_wall) / old_wall * 100:+.1f}%" if old_wall else '-'
+            row += f"{old_wall:>11}{change:>9}"
+        print(row)
+    for scenario, result in results['scenarios'].items():
+        for error in result['resolve']['errors'] + result['download']['errors']:
+            print(f'{scenario}: {error}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recovery benchmark under injected faults")
+    add_config_arguments(parser)
+    parser.set_defaults(titles=4, segments=30, segment_size=64 * 1024, page_padding=20 * 1024, fault_scope='all', seed=1)
+    parser.add_argument('--rate', type=float, default=0.05, help='fault rate per request for each scenario')
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS), help='comma separated, from: ' + ", ".join(SCENARIOS))
+    parser.add_argument('--downloads', type=int, default=2, help='titles to download per scenario')
+    parser.add_argument('--workers', type=int, default=HlsDownloader.MAX_NUM_WORKERS)
+    parser.add_argument('--mode', choices=HlsDownloader.MODES, default='preallocate')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results JSON of an earlier run to compare with')
+    args = parser.parse_args()
+
+    logPipeline.configure(level='ERROR')
+    work_dir = tempfile.mkdtemp(prefix='idlix_fault_bench_')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        results = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'rate': args.rate,
+            'fault_scope': args.fault_scope,
+            'scenarios': {
+                scenario: run_scenario(args, scenario)
+                for scenario in args.scenarios.split(',') if scenario in SCENARIOS
+            },
+        }
+    finally:
+        os.chdir(previous_dir)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Import Time Benchmark for IDLIX Downloader
+
+Imports each entry point in a fresh interpreter with `python -X importtime`
+and reports the cumulative import time (median of --runs), the heaviest
+direct imports and any heavy module that should only load on first use
+(bs4, m3u8, Crypto, vtt_to_srt, inquirer). With --check it exits non-zero
+when an entry point is over --budget-ms or imports one of those eagerly,
+so a startup regression is caught before it ships.
+
+Usage   :   python -m bench.importBench [--runs 7] [--check --budget-ms 300] [--json result.json] [--compare old.json]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = ('src.idlixHelper', 'main', 'main_gui')
+# Loaded where they are used, no entry point may import them at startup
+LAZY = ('bs4', 'm3u8', 'Crypto', 'vtt_to_srt', 'inquirer')
+LAZY_TARGETS = TARGETS
+
+
+def import_once(target):
+    """
+    One fresh interpreter. Returns (wall seconds, {module: (cumulative us, direct import of target)}),
+    or an error string instead of the dict.
+    """
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if process.returncode != 0:
+        return wall, process.stderr.strip().splitlines()[-1]
+    modules, pending = {}, []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        # Children are printed before their parent, the next depth 0 line owns the pending depth 1 ones
+        if depth == 1:
+            pending.append(name)
+        elif depth == 0:
+            for child in pending:
+                modules[child] = (modules[child][0], name == target)
+            pending = []
+        modules[name] = (int(cumulative), False)
+    return wall, modules
+
+
+def bench_target(target, runs):
+    walls, totals, children, loaded = [], [], {}, set()
+    for _ in range(runs):
+        wall, modules = import_once(target)
+        if isinstance(modules, str):
+            return {'error': modules}
+        walls.append(wall)
+        totals.append(modules[target][0])
+        loaded.update(name.split('.')[0] for name in modules)
+        for name, (cumulative, direct) in modules.items():
+            if direct:
+                children.setdefault(name, []).append(cumulative)
+    heaviest = sorted(((median(values), name) for name, values in children.items()), reverse=True)[:8]
+    return {
+        'import_ms': round(median(totals) / 1000, 1),
+        'process_ms': round(median(walls) * 1000, 1),
+        'heaviest': {name: round(value / 1000, 1) for value, name in heaviest},
+        'eager': sorted(name for name in LAZY if name in loaded) if target in LAZY_TARGETS else [],
+    }
+
+
+def print_results(results, baseline=None):
+    print(f"{'target':<18}{'import ms':>11}{'process ms':>12}" + (f"{'baseline':>10}{'change':>9}" if baseline else '') + "  eager")
+    for target, result in results['targets'].items():
+        if 'error' in result:
+            print(f"{target:<18}  {result['error']}")
+            continue
+        row = f"{target:<18}{result['import_ms']:>11}{result['process_ms']:>12}"
+        if baseline:
+            old = baseline['targets'].get(target, {}).get('import_ms')
+            change = f"{(result['import_ms'] - old) / old * 100:+.1f}%" if old else '-'
+            row += f"{str(old):>10}{change:>9}"
+        print(row + '  ' + (", ".join(result['eager']) or '-'))
+    for target, result in results['targets'].items():
+        for name, value in result.get('heaviest', {}).items():
+            print(f"  {target}: {name} {value} ms")
+
+
+def failures(results, budget_ms):
+    problems = []
+    for target, result in results['targets'].items():
+        if 'error' in result:
+            continue
+        if budget_ms and result['import_ms'] > budget_ms:
+            problems.append(f"{target} imports in {result['import_ms']} ms, budget {budget_ms} ms")
+        for name in result['eager']:
+            problems.append(f"{target} imports {name} at startup")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time benchmark of the entry points")
+    parser.add_argument('--runs', type=int, default=7, help='fresh interpreters per target, the median is reported')
+    parser.add_argument('--targets', default=",".join(TARGETS), help='comma separated module names')
+    parser.add_argument('--check', action='store_true', help='exit 1 on eager heavy imports or a blown budget')
+    parser.add_argument('--budget-ms', type=float, help='max cumulative import time per target for --check')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results JSON of an earlier run to compare with')
+    args = parser.parse_args()
+
+    results = {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'targets': {target: bench_target(target, args.runs) for target in args.targets.split(',')},
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+    if args.check:
+        problems = failures(results, args.budget_ms)
+        for problem in problems:
+            print(f'FAIL: {problem}')
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
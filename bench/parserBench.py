@@ -0,0 +1,99 @@
+"""
+HTML Parser Micro-benchmark for IDLIX Downloader
+
+Compares the regex fast path (src/htmlExtract.py) with the BeautifulSoup
+fallback on the saved pages in bench/fixtures: parse time and peak memory,
+and checks that both paths agree.
+
+Usage   :   python -m bench.parserBench [--repeat 50] [--json result.json]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import htmlExtract
+from src.idlixHelper import IdlixHelper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def parsers():
+    cases = {
+        'home': {
+            'regex': htmlExtract.home,
+            'bs4 html.parser': IdlixHelper.parse_home_soup,
+        },
+        'movie': {
+            'regex': htmlExtract.video_data,
+            'bs4 html.parser': IdlixHelper.parse_video_page_soup,
+        },
+    }
+    try:
+        import lxml  # noqa: F401
+        cases['home']['bs4 lxml'] = lambda html: IdlixHelper.parse_home_soup(html, 'lxml')
+        cases['movie']['bs4 lxml'] = lambda html: IdlixHelper.parse_video_page_soup(html, 'lxml')
+    except ImportError:
+        pass
+    return cases
+
+
+def measure(parse, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(html)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'median_ms': round(median(timings) * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(repeat):
+    results = {}
+    for page, cases in parsers().items():
+        with open(os.path.join(FIXTURES, page + '.html'), 'r', encoding='utf-8') as fixture:
+            html = fixture.read()
+        reference = cases['bs4 html.parser'](html)
+        results[page] = {'bytes': len(html), 'parsers': {}}
+        for name, parse in cases.items():
+            result = measure(parse, html, repeat)
+            result['matches_bs4'] = parse(html) == reference
+            results[page]['parsers'][name] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parser micro-benchmark")
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'page':<8}{'parser':<18}{'median ms':>12}{'min ms':>10}{'peak KB':>10}  match")
+    for page, result in results.items():
+        for name, row in result['parsers'].items():
+            print(f"{page:<8}{name:<18}{row['median_ms']:>12}{row['min_ms']:>10}{row['peak_kb']:>10}  {row['matches_bs4']}")
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Playback Proxy Benchmark for IDLIX Downloader
+
+A simulated player reads the stand-in server playlist like ffplay does
+(one segment at a time, one segment of read-ahead, playing each segment
+for --segment-seconds), once straight from the server and once through
+src/hlsProxy.py. It plays the start, seeks forward, then seeks back and
+reports startup time, rebuffer pauses and seek latency.
+
+Usage   :   python -m bench.proxyBench [--latency 0.15 --bandwidth 1048576] [--segment-seconds 0.35] [--json result.json] [--compare old.json]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import urllib.request
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.e2eBench import start_server
+from bench.standinServer import add_config_arguments
+from src import logPipeline
+from src.hlsDownloader import HlsDownloader
+from src.hlsProxy import HlsProxy
+from src.jobControl import Job
+from src.metrics import metrics
+
+SOURCES = ('direct', 'proxy')
+
+
+def read(url):
+    with urllib.request.urlopen(url) as response:
+        return response.read()
+
+
+def segment_urls(playlist_url):
+    lines = read(playlist_url).decode().splitlines()
+    return [urljoin(playlist_url, line) for line in lines if line and not line.startswith('#')]
+
+
+def play(urls, order, segment_seconds):
+    """
+    Plays `order` (lists of segment indices, a new list = a seek). Returns startup, seeks and rebuffers.
+    """
+    startups, stalls, started = [], [], time.perf_counter()
+    for part in order:
+        play_end = None
+        for index in part:
+            if play_end is not None:
+                # One segment of read-ahead, like the ffplay HLS demuxer
+                time.sleep(max(play_end - segment_seconds - time.perf_counter(), 0))
+            asked = time.perf_counter()
+            read(urls[index])
+            now = time.perf_counter()
+            if play_end is None:
+                startups.append(now - asked)
+                play_end = now + segment_seconds
+            elif now > play_end:
+                stalls.append(now - play_end)
+                play_end = now + segment_seconds
+            else:
+                play_end += segment_seconds
+        time.sleep(max(play_end - time.perf_counter(), 0))
+    return {
+        'startup_ms': round(startups[0] * 1000, 1),
+        'seek_forward_ms': round(startups[1] * 1000, 1),
+        'seek_back_ms': round(startups[2] * 1000, 1),
+        'rebuffers': len(stalls),
+        'rebuffer_s': round(sum(stalls), 3),
+        'wall_s': round(time.perf_counter() - started, 3),
+    }
+
+
+def run_source(args, base_url, source):
+    playlist_url = f'{base_url}cdn/{source}/720/media.m3u8'
+    order = [range(0, args.play), range(args.seek_to, args.seek_to + args.play // 2), range(2, 2 + args.play // 4)]
+    metrics.reset()
+    if source == 'direct':
+        return play(segment_urls(playlist_url), order, args.segment_seconds)
+    downloader = HlsDownloader(playlist_url, source, job=Job(budget=None, kind='play'))
+    with HlsProxy(downloader, prefetch=args.prefetch, workers=args.workers) as proxy:
+        result = play(segment_urls(proxy.url), order, args.segment_seconds)
+    result['served'] = {
+        dict(labels)['source']: value for (name, labels), value in metrics.counters.items()
+        if name == 'proxy_segments_total'
+    }
+    return result
+
+
+def print_results(results, baseline=None):
+    header = f"{'source':<8}{'startup ms':>12}{'rebuffers':>11}{'rebuffer s':>12}{'seek fwd ms':>13}{'seek back ms':>14}{'wall s':>9}"
+    print(header + (f"{'base rebuf s':>14}" if baseline else ''))
+    for source, result in results['sources'].items():
+        row = (
+            f"{source:<8}{result['startup_ms']:>12}{result['rebuffers']:>11}{result['rebuffer_s']:>12}"
+            f"{result['seek_forward_ms']:>13}{result['seek_back_ms']:>14}{result['wall_s']:>9}"
+        )
+        old = baseline and baseline['sources'].get(source)
+        if old:
+            row += f"{old['rebuffer_s']:>14}"
+        print(row)
+    for source, result in results['sources'].items():
+        if 'served' in result:
+            print(f"{source}: segments served " + ", ".join(f"{key} {value}" for key, value in sorted(result['served'].items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ffplay-like playback, direct vs through the prefetch proxy")
+    add_config_arguments(parser)
+    parser.set_defaults(segments=60, segment_size=256 * 1024, latency=0.15, bandwidth=1024 * 1024, page_padding=20 * 1024)
+    parser.add_argument('--segment-seconds', type=float, default=0.35, help='playback time of one segment')
+    parser.add_argument('--play', type=int, default=16, help='segments played from the start')
+    parser.add_argument('--seek-to', type=int, default=40, help='segment of the forward seek')
+    parser.add_argument('--prefetch', type=int, default=HlsProxy.PREFETCH)
+    parser.add_argument('--workers', type=int, default=HlsProxy.PREFETCH_WORKERS)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results JSON of an earlier run to compare with')
+    args = parser.parse_args()
+
+    logPipeline.configure(level='ERROR')
+    process, base_url = start_server(args)
+    try:
+        results = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'segment_seconds': args.segment_seconds,
+            'sources': {source: run_source(args, base_url, source) for source in SOURCES},
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
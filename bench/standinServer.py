@@ -0,0 +1,468 @@
+"""
+Local Stand-in Server for IDLIX Downloader benchmarks
+
+Imitates every remote the helpers talk to, on one localhost port:
+    GET  /                              idlix home page (featured grid)
+    GET  /<slug>/                       idlix movie page
+    POST /wp-admin/admin-ajax.php       CryptoJS-style encrypted embed_url + key
+    POST /player/index.php?do=getVideo  jeniusplay videoSource + playerjsSubtitle
+    GET  /cdn/<hash>/master.m3u8        master playlist
+    GET  /cdn/<hash>/<variant>/...      media playlist and .ts segments
+    GET  /poster/<n>.jpg, /sub/<hash>.vtt
+    GET  /__stats                       request and injected fault counters
+
+Latency, per-connection bandwidth, a link bandwidth shared by all segment
+connections and a CDN cap on segments in flight (429 above it) are
+configurable, and faults (5xx, 403 token expiry, connection resets,
+truncated bodies, slow-tail stalls) can be injected at a given rate on
+segments or on every endpoint.
+
+Usage   :   python -m bench.standinServer [--port 8800] [--latency 0.02] [--bandwidth 0]
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import socket
+import struct
+import base64
+import hashlib
+import argparse
+import threading
+from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from src.CryptoJsAesHelper import CryptoJsAes
+
+
+FAULTS = ('5xx', '403', 'reset', 'truncate', 'slow')
+
+
+class StandinConfig:
+    def __init__(self, titles=12, segments=40, segment_size=256 * 1024, variants=(360, 720),
+                 latency=0.02, bandwidth=0, page_padding=200 * 1024,
+                 faults=None, fault_scope='segments', slow_delay=3.0, seed=None,
+                 link_bandwidth=0, max_inflight=0):
+        self.titles = titles
+        self.segments = segments
+        self.segment_size = segment_size
+        self.variants = variants
+        # Seconds before the first byte of every response
+        self.latency = latency
+        # Bytes per second per connection for segments, 0 = unlimited
+        self.bandwidth = bandwidth
+        # Bytes per second for all segment connections together (a weak link), 0 = unlimited
+        self.link_bandwidth = link_bandwidth
+        # Segment requests in flight above this answer 429 (a throttling CDN), 0 = no cap
+        self.max_inflight = max_inflight
+        # Filler after the player block, like the comments and related grids of the real page
+        self.page_padding = page_padding
+        # {fault: rate}, rates are per request and checked in FAULTS order
+        self.faults = faults or {}
+        # 'segments' only hits .ts requests, 'all' also the pages, ajax, getVideo and playlists
+        self.fault_scope = fault_scope
+        # Seconds a slow-tail response stalls before its first byte
+        self.slow_delay = slow_delay
+        self.seed = seed
+
+
+class StandinStats:
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.requests = {}
+        self.faults = {}
+        self.inflight = 0
+        self._link_free = 0.0
+        self._lock = threading.Lock()
+
+    def count(self, kind):
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def draw(self, faults):
+        with self._lock:
+            roll = self.random.random()
+            for fault in FAULTS:
+                rate = faults.get(fault, 0)
+                if roll < rate:
+                    self.faults[fault] = self.faults.get(fault, 0) + 1
+                    return fault
+                roll -= rate
+        return None
+
+    def enter(self, cap):
+        """
+        One more segment in flight; False (and counted as a 429 fault) when that goes over `cap`.
+        """
+        with self._lock:
+            if cap and self.inflight >= cap:
+                self.faults['429'] = self.faults.get('429', 0) + 1
+                return False
+            self.inflight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.inflight -= 1
+
+    def pace(self, nbytes, rate):
+        """
+        Seconds to wait before sending nbytes over a link shared by every connection at `rate` bytes/s.
+        """
+        with self._lock:
+            now = time.perf_counter()
+            self._link_free = max(self._link_free, now) + nbytes / rate
+            return self._link_free - now
+
+    def to_dict(self):
+        with self._lock:
+            return {'requests': dict(self.requests), 'faults': dict(self.faults)}
+
+
+def make_key(passphrase_hex):
+    """
+    Build the `key` and `m` values that src.CryptoJsAesHelper.dec turns back into the passphrase.
+    """
+    pairs = [passphrase_hex[i:i + 2] for i in range(0, len(passphrase_hex), 2)]
+    key = "".join("zz" + pair for pair in pairs)
+    m = base64.b64encode("|".join(str(i) for i in range(len(pairs))).encode()).decode().rstrip('=')[::-1]
+    passphrase = "".join("\\x" + pair for pair in pairs)
+    return key, m, passphrase
+
+
+def segment_bytes(hash_value, variant, index, size):
+    # Deterministic payload so downloads can be verified byte for byte
+    seed = hashlib.sha1(f'{hash_value}/{variant}/{index}'.encode()).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+_posters = {}
+
+
+def poster_bytes(index):
+    # Real JPEGs so the GUI poster path decodes them like the live ones
+    if index not in _posters:
+        image = Image.new('RGB', (300, 450), ((index * 40) % 256, (index * 90) % 256, (index * 150) % 256))
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG', quality=80)
+        _posters[index] = buffer.getvalue()
+    return _posters[index]
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes, Nagle + delayed ACK would add ~40 ms to each response
+    disable_nagle_algorithm = True
+    config = StandinConfig()
+    stats = None
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # Pooled clients drop idle keep-alive connections when they close
+            pass
+
+    @property
+    def base(self):
+        return f'http://{self.headers.get("X-Standin-Host") or self.server.standin_host}/'
+
+    def _send(self, status, body=b'', content_type='text/plain', headers=None, throttle=False, kind='other'):
+        self.stats.count(kind if self.command != 'HEAD' else kind + '_head')
+        fault = None
+        # /__stats is the benchmarks' control endpoint, never faulted
+        if kind != 'stats' and (kind == 'segment' or self.config.fault_scope == 'all'):
+            fault = self.stats.draw(self.config.faults)
+        time.sleep(self.config.latency + (self.config.slow_delay if fault == 'slow' else 0))
+        if fault == 'reset':
+            return self._reset()
+        if fault == '5xx':
+            status, body, content_type = 503, 'Service Unavailable', 'text/plain'
+        elif fault == '403':
+            status, body, content_type = 403, 'token expired', 'text/plain'
+
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+        if fault == 'truncate':
+            # Full Content-Length announced, half the body sent, then the connection is dropped
+            self._write(body[:len(body) // 2], throttle)
+            return self._reset()
+        self._write(body, throttle)
+
+    def _reset(self):
+        # SO_LINGER 0 turns close() into a TCP RST
+        self.close_connection = True
+        try:
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.connection.close()
+        except OSError:
+            pass
+
+    def _write(self, body, throttle):
+        try:
+            self._throttled_write(body, throttle)
+        except (BrokenPipeError, ConnectionResetError):
+            # Early-terminating and cancelled clients hang up mid body
+            self.close_connection = True
+
+    def _throttled_write(self, body, throttle):
+        bandwidth, link = self.config.bandwidth, self.config.link_bandwidth
+        if not throttle or not (bandwidth or link):
+            self.wfile.write(body)
+            return
+        chunk = max(min(rate for rate in (bandwidth, link) if rate) // 20, 1024)
+        for offset in range(0, len(body), chunk):
+            started = time.perf_counter()
+            part = body[offset:offset + chunk]
+            if link:
+                time.sleep(self.stats.pace(len(part), link))
+            self.wfile.write(part)
+            if bandwidth:
+                spare = len(part) / bandwidth - (time.perf_counter() - started)
+                if spare > 0:
+                    time.sleep(spare)
+
+    def _slug(self, index):
+        return f'movie-{index}'
+
+    def _home(self):
+        articles = "".join(
+            f'<article><a href="{self.base}movie/{self._slug(i)}/"><img src="{self.base}poster/{i}.jpg"></a>'
+            f'<h3>Stand-in Movie {i}</h3><span>20{i % 25:02d}</span></article>'
+            for i in range(self.config.titles)
+        )
+        return f'<html><body><div class="items featured">{articles}</div></body></html>'
+
+    def _movie(self, slug):
+        index = int(slug.rsplit('-', 1)[1])
+        padding = '<div class="comment">' + 'x' * 1000 + '</div>'
+        return (
+            '<html><head>'
+            f'<meta id="dooplay-ajax-counter" data-postid="{1000 + index}">'
+            f'<meta itemprop="name" content="Stand-in%20Movie%20{index}">'
+            '</head><body>'
+            f'<div class="poster"><img itemprop="image" src="{self.base}poster/{index}.jpg"></div>'
+            + padding * (self.config.page_padding // len(padding)) +
+            '</body></html>'
+        )
+
+    def _embed(self, post_id):
+        hash_value = hashlib.md5(str(post_id).encode()).hexdigest()
+        key, m, passphrase = make_key(hashlib.sha1(hash_value.encode()).hexdigest()[:32])
+        embed = json.loads(CryptoJsAes.encrypt(f'https://jeniusplay.com/video/{hash_value}', passphrase))
+        embed['m'] = m
+        return json.dumps({'embed_url': json.dumps(embed), 'key': key, 'type': 'iframe'})
+
+    def _get_video(self, hash_value):
+        return json.dumps({
+            'hls': True,
+            'videoSource': f'{self.base}cdn/{hash_value}/master.txt',
+            'player': f'var playerjsSubtitle = "[Indonesian]https://{self.base[7:]}sub/{hash_value}.vtt";'
+        })
+
+    def _master(self, hash_value):
+        lines = ['#EXTM3U']
+        for height in self.config.variants:
+            lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={height * 2000},RESOLUTION={height * 16 // 9}x{height}')
+            lines.append(f'{self.base}cdn/{hash_value}/{height}/media.m3u8')
+        return "\n".join(lines) + "\n"
+
+    def _media(self, hash_value, variant):
+        lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-TARGETDURATION:4', '#EXT-X-MEDIA-SEQUENCE:0']
+        for index in range(self.config.segments):
+            lines.append('#EXTINF:4.000,')
+            lines.append(f'seg{index}.ts')
+        lines.append('#EXT-X-ENDLIST')
+        return "\n".join(lines) + "\n"
+
+    def route(self):
+        path = urlsplit(self.path).path
+        if path == '/__stats':
+            return self._send(200, json.dumps(self.stats.to_dict()), 'application/json', kind='stats')
+        if path == '/':
+            return self._send(200, self._home(), 'text/html', kind='home')
+        match = re.fullmatch(r'/movie/([\w-]+)/', path)
+        if match:
+            return self._send(200, self._movie(match.group(1)), 'text/html', kind='page')
+        match = re.fullmatch(r'/cdn/(\w+)/master\.m3u8', path)
+        if match:
+            return self._send(200, self._master(match.group(1)), 'application/vnd.apple.mpegurl', kind='playlist')
+        match = re.fullmatch(r'/cdn/(\w+)/(\d+)/media\.m3u8', path)
+        if match:
+            return self._send(200, self._media(*match.groups()), 'application/vnd.apple.mpegurl', kind='playlist')
+        match = re.fullmatch(r'/cdn/(\w+)/(\d+)/seg(\d+)\.ts', path)
+        if match:
+            hash_value, variant, index = match.groups()
+            return self.segment(hash_value, variant, int(index))
+        match = re.fullmatch(r'/poster/(\d+)\.jpg', path)
+        if match:
+            return self._send(200, poster_bytes(int(match.group(1))), 'image/jpeg', kind='poster')
+        match = re.fullmatch(r'/sub/(\w+)\.vtt', path)
+        if match:
+            return self._send(200, 'WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nHalo\n', 'text/vtt', kind='subtitle')
+        return self._send(404, 'not found')
+
+    def segment(self, hash_value, variant, index):
+        if self.command == 'GET' and not self.stats.enter(self.config.max_inflight):
+            return self._send(429, 'Too Many Requests', headers={'Retry-After': '1'}, kind='segment')
+        try:
+            self._send(
+                200,
+                segment_bytes(hash_value, variant, index, self.config.segment_size),
+                'video/mp2t',
+                throttle=True,
+                kind='segment'
+            )
+        finally:
+            if self.command == 'GET':
+                self.stats.leave()
+
+    def do_GET(self):
+        self.route()
+
+    def do_HEAD(self):
+        self.route()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()
+        form = parse_qs(body)
+        path = urlsplit(self.path).path
+        if path == '/wp-admin/admin-ajax.php':
+            return self._send(200, self._embed(form.get('post', [''])[0]), 'application/json', kind='ajax')
+        if path == '/player/index.php':
+            query = parse_qs(urlsplit(self.path).query)
+            return self._send(200, self._get_video(query.get('data', [''])[0]), 'application/json', kind='getVideo')
+        return self._send(404, 'not found')
+
+
+class StandinHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs when a worker pool connects at once, each costing a 1 s retransmit
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StandinServer:
+    def __init__(self, config=None, port=0, handler=StandinHandler):
+        config = config or StandinConfig()
+        self.handler = type('Handler', (handler,), {'config': config, 'stats': StandinStats(config.seed)})
+        self.httpd = StandinHTTPServer(('127.0.0.1', port), self.handler)
+        self.httpd.standin_host = f'127.0.0.1:{self.httpd.server_address[1]}'
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f'http://{self.httpd.standin_host}/'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_config_arguments(parser):
+    defaults = StandinConfig()
+    parser.add_argument('--titles', type=int, default=defaults.titles)
+    parser.add_argument('--segments', type=int, default=defaults.segments, help='segments per title')
+    parser.add_argument('--segment-size', type=int, default=defaults.segment_size, help='bytes per segment')
+    parser.add_argument('--latency', type=float, default=defaults.latency, help='seconds before every response')
+    parser.add_argument('--bandwidth', type=int, default=defaults.bandwidth, help='segment bytes/s per connection, 0 = unlimited')
+    parser.add_argument('--link-bandwidth', type=int, default=defaults.link_bandwidth, help='segment bytes/s shared by all connections, 0 = unlimited')
+    parser.add_argument('--max-inflight', type=int, default=defaults.max_inflight, help='segment requests in flight before 429, 0 = no cap')
+    parser.add_argument('--page-padding', type=int, default=defaults.page_padding, help='bytes of filler on movie pages')
+    for fault in FAULTS:
+        parser.add_argument(f'--fault-{fault}', type=float, default=0.0, help=f'rate of {fault} responses (0-1)')
+    parser.add_argument('--fault-scope', choices=('segments', 'all'), default=defaults.fault_scope)
+    parser.add_argument('--slow-delay', type=float, default=defaults.slow_delay, help='seconds a slow-tail response stalls')
+    parser.add_argument('--seed', type=int, help='seed for reproducible fault sequences')
+
+
+def config_arguments(args):
+    """
+    Command line for a child stand-in server with the same settings as `args`.
+    """
+    argv = [
+        '--titles', str(args.titles),
+        '--segments', str(args.segments),
+        '--segment-size', str(args.segment_size),
+        '--latency', str(args.latency),
+        '--bandwidth', str(args.bandwidth),
+        '--link-bandwidth', str(args.link_bandwidth),
+        '--max-inflight', str(args.max_inflight),
+        '--page-padding', str(args.page_padding),
+        '--fault-scope', args.fault_scope,
+        '--slow-delay', str(args.slow_delay),
+    ]
+    for fault in FAULTS:
+        argv += [f'--fault-{fault}', str(getattr(args, f'fault_{fault}'))]
+    if args.seed is not None:
+        argv += ['--seed', str(args.seed)]
+    return argv
+
+
+def config_from_args(args):
+    return StandinConfig(
+        titles=args.titles,
+        segments=args.segments,
+        segment_size=args.segment_size,
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        link_bandwidth=args.link_bandwidth,
+        max_inflight=args.max_inflight,
+        page_padding=args.page_padding,
+        faults={fault: getattr(args, f'fault_{fault}') for fault in FAULTS},
+        fault_scope=args.fault_scope,
+        slow_delay=args.slow_delay,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IDLIX stand-in server")
+    parser.add_argument('--port', type=int, default=8800, help='0 picks a free port')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    server = StandinServer(config_from_args(args), port=args.port)
+    # First stdout line is read by the benchmarks that spawn this server
+    print(f'Serving on {server.base_url}', flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,14 @@
 from src.idlixHelper import IdlixHelper, logger
+from src.batchQueue import BatchQueue
+from src.hlsDownloader import HlsDownloader
+from src import logPipeline
+from src.metrics import metrics
+from src.retryPolicy import retry
+from src.jobControl import Job
+from src.bandwidthLimiter import bandwidth, parse_rate, parse_weights
 from prettytable import PrettyTable
-import inquirer
+import argparse
 import threading
-import time
-
-RETRY_LIMIT = 3
-
-
-def retry(func, *args, **kwargs):
-    for _ in range(RETRY_LIMIT):
-        result = func(*args, **kwargs)
-        if result and result.get("status"):
-            return result
-        time.sleep(1)
-    return {"status": False, "message": "Maximum retry reached"}
 
 
 def play_m3u8_thread(idlix_helper):
@@ -24,7 +19,9 @@ def play_m3u8_thread(idlix_helper):
         logger.error("Error playing m3u8")
 
 
-def process_movie(idlix_helper, url: str, mode: str):
+def process_movie(session_helper, url: str, mode: str):
+    # Own helper per title, a play thread may still use the previous one; pool, cache and ffmpeg lookup are shared
+    idlix_helper = IdlixHelper(cache=session_helper.cache, pool=session_helper.pool, job=Job(kind=mode))
     video_data = retry(idlix_helper.get_video_data, url)
     if not video_data.get("status"):
         logger.error("Error getting video data")
@@ -50,6 +47,7 @@ def process_movie(idlix_helper, url: str, mode: str):
 
     if m3u8.get("is_variant_playlist"):
         logger.warning("This video has a variant playlist")
+        import inquirer
 
         choices = [
             f"{v['id']} - {v['resolution']}" for v in m3u8["variant_playlist"]
@@ -63,7 +61,9 @@ def process_movie(idlix_helper, url: str, mode: str):
                 carousel=True
             )
         ]
-        answer = inquirer.prompt(question)
+        # Time spent choosing does not count against the resolve budget
+        with idlix_helper.job.paused():
+            answer = inquirer.prompt(question)
 
         selected_id = answer["variant"].split(" - ")[0]
 
@@ -119,11 +119,123 @@ def show_featured_table(featured):
     print(table)
 
 
+def run_batch(urls, max_connections, max_downloads, workers):
+    logger.info(f"Batch download of {len(urls)} titles")
+    results = BatchQueue(
+        max_connections=max_connections,
+        max_downloads=max_downloads,
+        retry=retry,
+        **workers
+    ).download(urls)
+
+    table = PrettyTable()
+    table.align = "l"
+    table.title = "Batch Result"
+    table.field_names = ["No", "URL", "Status", "Result"]
+    for i, result in enumerate(results):
+        table.add_row([
+            i + 1,
+            result["url"],
+            "OK" if result["status"] else "FAILED",
+            result.get("path") or result.get("message")
+        ])
+    print(table)
+
+
+def show_metrics_table():
+    rows = metrics.summary_rows()
+    if not rows:
+        return
+    table = PrettyTable()
+    table.align = "l"
+    table.title = "Timing per Stage / Host"
+    table.field_names = ["Stage", "Host", "Count", "Errors", "Retries", "p50 ms", "p95 ms", "Total s", "MB"]
+    for row in rows:
+        table.add_row([
+            row["stage"], row["host"], row["count"], row["errors"], row["retries"],
+            row["p50_ms"], row["p95_ms"], row["total_s"], row["mb"]
+        ])
+    print(table)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="IDLIX Downloader & Player CLI")
+    parser.add_argument("urls", nargs="*", help="movie URLs to download as a batch")
+    parser.add_argument("-b", "--batch", help="file with one movie URL per line")
+    parser.add_argument(
+        "--connections", type=int, default=BatchQueue.MAX_CONNECTIONS,
+        help="total segment connections across all batch jobs"
+    )
+    parser.add_argument(
+        "--parallel", type=int, default=BatchQueue.MAX_DOWNLOADS,
+        help="titles downloading at the same time"
+    )
+    parser.add_argument(
+        "--min-workers", type=int, default=HlsDownloader.MIN_WORKERS,
+        help="lowest segment concurrency per title the adaptive limit may drop to"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, default=HlsDownloader.MAX_WORKERS,
+        help="highest segment concurrency per title the adaptive limit may grow to"
+    )
+    parser.add_argument(
+        "--fixed-workers", type=int,
+        help="disable the adaptive limit and keep exactly this many segment fetches per title"
+    )
+    parser.add_argument(
+        "--rate-limit", default="0",
+        help="total download rate for segments, posters and subtitles, e.g. 500K or 4M (bytes/s), 0 = unlimited"
+    )
+    parser.add_argument(
+        "--weights", default="",
+        help="bandwidth weight per job kind, e.g. play=8,download=1"
+    )
+    parser.add_argument(
+        "--direct-play", action="store_true",
+        help="let ffplay read the remote playlist instead of the local prefetching proxy"
+    )
+    parser.add_argument("--log-level", default="INFO", help="DEBUG also logs every segment")
+    parser.add_argument("--log-json", help="append structured JSON lines logs to this file")
+    parser.add_argument("--metrics", help="write metrics on exit, JSON if the name ends with .json, else Prometheus text")
+    parser.add_argument("--metrics-port", type=int, help="serve /metrics and /metrics.json on this local port")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    logPipeline.configure(level=args.log_level.upper(), json_path=args.log_json)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    bandwidth.configure(rate=parse_rate(args.rate_limit), weights=parse_weights(args.weights))
+    if args.direct_play:
+        IdlixHelper.PLAY_PROXY = False
+    urls = list(args.urls)
+    if args.batch:
+        urls += BatchQueue.read_url_file(args.batch)
+    try:
+        if urls:
+            if args.fixed_workers:
+                workers = {'adaptive': False, 'workers_per_job': args.fixed_workers}
+            else:
+                workers = {'min_workers': args.min_workers, 'max_workers': args.max_workers}
+            run_batch(urls, args.connections, args.parallel, workers)
+        else:
+            run_interactive()
+    finally:
+        show_metrics_table()
+        if args.metrics:
+            metrics.write(args.metrics)
+
+
+def run_interactive():
+    # inquirer is only needed here, batch runs start without it
+    import inquirer
+
+    # One pool, cache and impersonation profile for the session, every title builds its helper on them
+    idlix = IdlixHelper()
     status_exit = False
 
     while not status_exit:
-        idlix = IdlixHelper()
         home = retry(idlix.get_home)
 
         if not home.get("status") or len(home.get("featured_movie", [])) == 0:
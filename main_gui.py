@@ -1,54 +1,238 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import threading
+import queue
 import subprocess
 import os
-import time
 import webbrowser
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, Future
 
 from PIL import Image, ImageTk
-import requests
-from bs4 import BeautifulSoup
 
 from src.idlixHelper import IdlixHelper, logger
-
-# ============================================================
-# RETRY logic (same as CLI)
-# ============================================================
-RETRY_LIMIT = 3
-
-
-def retry(func, *args, **kwargs):
-    for _ in range(RETRY_LIMIT):
-        result = func(*args, **kwargs)
-        if result and result.get("status"):
-            return result
-        time.sleep(1)
-    return {"status": False, "message": "Maximum retry reached"}
+from src.batchQueue import BatchQueue
+from src.posterCache import PosterCache
+from src import logPipeline
+from src.retryPolicy import retry
+from src.jobControl import Job
+from src.bandwidthLimiter import bandwidth, parse_rate, parse_weights
+from src.toolLocator import tools
 
 
 # ============================================================
 # GUI LOGGER
 # ============================================================
 class GuiLogger:
-    def __init__(self, textbox):
+    """
+    Drains the log ring into the Text widget from a Tk timer, one insert per batch,
+    keeping at most MAX_LINES lines in the widget.
+    """
+    DRAIN_MS = 100
+    BATCH = 500
+    MAX_LINES = 2000
+
+    def __init__(self, textbox, ring):
         self.textbox = textbox
+        self.ring = ring
+        self.textbox.after(self.DRAIN_MS, self.drain)
+
+    def drain(self):
+        lines = self.ring.drain(self.BATCH)
+        if self.ring.dropped:
+            lines.insert(0, f"... {self.ring.dropped} log lines dropped\n")
+            self.ring.dropped = 0
+        if lines:
+            self.textbox.configure(state='normal')
+            self.textbox.insert(tk.END, "".join(lines))
+            self.textbox.delete("1.0", f"end-{self.MAX_LINES + 1}l")
+            self.textbox.see(tk.END)
+            self.textbox.configure(state='disabled')
+        self.textbox.after(self.DRAIN_MS, self.drain)
 
-    def write(self, msg):
-        self.textbox.configure(state='normal')
-        self.textbox.insert(tk.END, msg)
-        self.textbox.see(tk.END)
-        self.textbox.configure(state='disabled')
 
-    def flush(self):
-        pass
+# ============================================================
+# WORKER -> UI BRIDGE
+# ============================================================
+class UiBridge:
+    """
+    Worker threads never touch Tk. They queue a call and get a Future back,
+    the Tk thread runs queued calls from a short `after` poll.
+    """
+    POLL_MS = 50
+
+    def __init__(self, root):
+        self.root = root
+        self.calls = queue.Queue()
+        self.root.after(self.POLL_MS, self._drain)
+
+    def call(self, func, *args):
+        """
+        Run func(*args) on the Tk thread, the Future holds its return value.
+        """
+        future = Future()
+        self.calls.put((future, func, args, False))
+        return future
+
+    def prompt(self, func, *args):
+        """
+        Run func(future, *args) on the Tk thread; func resolves the Future itself once the user answered.
+        """
+        future = Future()
+        self.calls.put((future, func, args, True))
+        return future
+
+    def _drain(self):
+        while True:
+            try:
+                future, func, args, deferred = self.calls.get_nowait()
+            except queue.Empty:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if deferred:
+                    func(future, *args)
+                else:
+                    future.set_result(func(*args))
+            except Exception as error_call:
+                if not future.done():
+                    future.set_exception(error_call)
+        self.root.after(self.POLL_MS, self._drain)
+
+
+# ============================================================
+# VIRTUAL POSTER GRID
+# ============================================================
+class VirtualPosterGrid:
+    """
+    Poster grid drawn straight on a Canvas. Only the rows in or near the viewport get canvas
+    items and PhotoImages; cells are recycled while scrolling, so cost does not grow with the catalog.
+    """
+    PAD = 10
+    LABEL_HEIGHT = 40
+    BUFFER_ROWS = 2
+
+    def __init__(self, canvas, scrollbar, poster_size, on_click, on_need_image):
+        self.canvas = canvas
+        self.poster_size = poster_size
+        self.on_click = on_click
+        self.on_need_image = on_need_image
+        self.items = []
+        self.cells = []
+        self.images = {}
+        self.requested = set()
+        self.visible = range(0)
+        self.columns = 1
+        self.generation = 0
+        self.placeholder = ImageTk.PhotoImage(Image.new("RGB", poster_size, "#2a2a2a"))
+
+        scrollbar.configure(command=self.yview)
+        canvas.bind("<Configure>", lambda e: self.redraw())
+        canvas.bind("<MouseWheel>", lambda e: self.yview("scroll", -1 * (e.delta // 120 or (1 if e.delta > 0 else -1)), "units"))
+        canvas.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        canvas.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+
+    @property
+    def cell_width(self):
+        return self.poster_size[0] + 2 * self.PAD
+
+    @property
+    def cell_height(self):
+        return self.poster_size[1] + self.LABEL_HEIGHT + 2 * self.PAD
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.redraw()
+
+    def set_items(self, items):
+        self.items = list(items)
+        # Images of an older list that land late are dropped
+        self.generation += 1
+        self.images.clear()
+        self.requested.clear()
+        self.visible = range(0)
+        self.canvas.yview_moveto(0)
+        self.redraw()
+
+    def _new_cell(self):
+        tag = f"cell{len(self.cells)}"
+        cell = {
+            "tag": tag,
+            "index": None,
+            "image": self.canvas.create_image(0, 0, anchor="nw", image=self.placeholder, tags=(tag,)),
+            "text": self.canvas.create_text(
+                0, 0, anchor="n", fill="#eeeeee", width=self.poster_size[0], justify="center", tags=(tag,)
+            ),
+        }
+        self.canvas.tag_bind(tag, "<Button-1>", lambda e, c=cell: self._click(c))
+        self.cells.append(cell)
+        return cell
+
+    def _click(self, cell):
+        if cell["index"] is not None and cell["index"] < len(self.items):
+            self.on_click(self.items[cell["index"]])
+
+    def redraw(self):
+        width = max(self.canvas.winfo_width(), self.cell_width)
+        height = max(self.canvas.winfo_height(), 1)
+        self.columns = max(width // self.cell_width, 1)
+        rows = -(-len(self.items) // self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell_width, rows * self.cell_height))
+
+        top = self.canvas.canvasy(0)
+        first_row = max(int(top // self.cell_height) - self.BUFFER_ROWS, 0)
+        last_row = min(int((top + height) // self.cell_height) + self.BUFFER_ROWS, rows - 1)
+        visible = range(first_row * self.columns, min((last_row + 1) * self.columns, len(self.items)))
+
+        # Forget decoded images of rows that scrolled out of the window
+        for index in list(self.images):
+            if index not in visible:
+                del self.images[index]
+        self.requested &= set(visible)
+        # Before placing: a cached poster is handed to set_image from inside _place
+        self.visible = visible
+
+        while len(self.cells) < len(visible):
+            self._new_cell()
+        for cell, index in zip(self.cells, visible):
+            self._place(cell, index)
+        for cell in self.cells[len(visible):]:
+            cell["index"] = None
+            self.canvas.itemconfigure(cell["tag"], state="hidden")
+
+    def _place(self, cell, index):
+        row, column = divmod(index, self.columns)
+        x = column * self.cell_width + self.PAD
+        y = row * self.cell_height + self.PAD
+        if cell["index"] != index:
+            cell["index"] = index
+            self.canvas.itemconfigure(cell["text"], text=self.items[index]["title"])
+            self.canvas.itemconfigure(cell["image"], image=self.images.get(index, self.placeholder))
+        self.canvas.coords(cell["image"], x, y)
+        self.canvas.coords(cell["text"], x + self.poster_size[0] // 2, y + self.poster_size[1] + 4)
+        self.canvas.itemconfigure(cell["tag"], state="normal")
+        if index not in self.images and index not in self.requested:
+            self.requested.add(index)
+            self.on_need_image(self.generation, index, self.items[index])
+
+    def set_image(self, generation, index, img):
+        if generation != self.generation or index not in self.visible:
+            return
+        self.requested.discard(index)
+        if img is None:
+            return
+        self.images[index] = ImageTk.PhotoImage(img)
+        for cell in self.cells:
+            if cell["index"] == index:
+                self.canvas.itemconfigure(cell["image"], image=self.images[index])
 
 
 # ============================================================
 # MAIN GUI
 # ============================================================
 class IdlixGUI:
+    POSTER_SIZE = (150, 210)
+
     def __init__(self, root):
         self.root = root
         self.root.title("IDLIX Downloader & Player GUI")
@@ -56,8 +240,15 @@ class IdlixGUI:
 
         self.idlix = IdlixHelper()
         self.featured_movies = []
-        self.poster_images = []
+        self.poster_cache = PosterCache()
+        self.poster_executor = ThreadPoolExecutor(max_workers=6)
         self.ffplay_process = None
+        # Job of the title in ffplay, its bandwidth share stays reserved while the player runs
+        self.player_job = None
+        self.bridge = UiBridge(root)
+        self.variant_policy = tk.StringVar(value="Ask")
+        # Running jobs, for the Cancel Jobs button
+        self.jobs = set()
 
         # Main container
         main_frame = ttk.Frame(root, padding=10)
@@ -71,19 +262,19 @@ class IdlixGUI:
 
         ttk.Label(left_panel, text="Featured Movies", font=("Arial", 16, "bold")).pack(anchor="w")
 
-        self.poster_canvas = tk.Canvas(left_panel, bg="#181818")
-        scrollbar = ttk.Scrollbar(left_panel, orient="vertical", command=self.poster_canvas.yview)
+        self.poster_canvas = tk.Canvas(left_panel, bg="#181818", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(left_panel, orient="vertical")
         self.poster_canvas.configure(yscrollcommand=scrollbar.set)
 
         scrollbar.pack(side="right", fill="y")
         self.poster_canvas.pack(side="left", fill="both", expand=True)
 
-        self.poster_frame = ttk.Frame(self.poster_canvas)
-        self.poster_canvas.create_window((0, 0), window=self.poster_frame, anchor="nw")
-
-        self.poster_canvas.bind(
-            "<Configure>",
-            lambda e: self.poster_canvas.configure(scrollregion=self.poster_canvas.bbox("all"))
+        self.poster_grid = VirtualPosterGrid(
+            self.poster_canvas,
+            scrollbar,
+            self.POSTER_SIZE,
+            on_click=self.on_poster_click,
+            on_need_image=self.request_poster
         )
 
         # RIGHT = controls + log
@@ -96,6 +287,19 @@ class IdlixGUI:
         ttk.Button(right_panel, text="Refresh Featured", command=self.refresh_featured).pack(fill="x", pady=4)
         ttk.Button(right_panel, text="Download by URL", command=self.download_by_url).pack(fill="x", pady=4)
         ttk.Button(right_panel, text="Play by URL", command=self.play_by_url).pack(fill="x", pady=4)
+        ttk.Button(right_panel, text="Batch Download (URL list)", command=self.batch_download).pack(fill="x", pady=4)
+        variant_row = ttk.Frame(right_panel)
+        variant_row.pack(fill="x", pady=4)
+        ttk.Label(variant_row, text="Variant").pack(side="left")
+        ttk.Combobox(
+            variant_row,
+            textvariable=self.variant_policy,
+            values=("Ask",) + IdlixHelper.VARIANT_POLICIES,
+            state="readonly",
+            width=10
+        ).pack(side="right")
+
+        ttk.Button(right_panel, text="Cancel Jobs", command=self.cancel_jobs).pack(fill="x", pady=4)
         ttk.Button(right_panel, text="Stop Player", command=self.stop_player).pack(fill="x", pady=4)
         ttk.Button(right_panel, text="Open Downloads Folder", command=self.open_download_folder).pack(fill="x", pady=4)
         ttk.Button(right_panel, text="Clear Log", command=self.clear_log).pack(fill="x", pady=4)
@@ -106,8 +310,20 @@ class IdlixGUI:
         self.log_box.pack(fill="both", expand=True)
 
         # Logger injection
-        logger.remove()
-        logger.add(GuiLogger(self.log_box), format="{time:HH:mm:ss} | {level} | {message}")
+        self.log_ring = logPipeline.LogRing()
+        logPipeline.configure(
+            level=os.environ.get("IDLIX_LOG_LEVEL", "INFO"),
+            console=False,
+            json_path=os.environ.get("IDLIX_LOG_JSON"),
+            gui_ring=self.log_ring
+        )
+        GuiLogger(self.log_box, self.log_ring)
+        bandwidth.configure(
+            rate=parse_rate(os.environ.get("IDLIX_RATE_LIMIT")),
+            weights=parse_weights(os.environ.get("IDLIX_WEIGHTS"))
+        )
+        if os.environ.get("IDLIX_PLAY_PROXY") == "0":
+            IdlixHelper.PLAY_PROXY = False
 
         # Load posters initially
         self.refresh_featured()
@@ -116,46 +332,23 @@ class IdlixGUI:
     # POSTER GRID
     # ============================================================
     def show_poster_grid(self):
-        for w in self.poster_frame.winfo_children():
-            w.destroy()
-
-        self.poster_images.clear()
-
-        posters_per_row = 4
-        size = (150, 210)
-        row = col = 0
-
-        for movie in self.featured_movies:
-            try:
-                img_raw = requests.get(movie["poster"], timeout=8).content
-                img = Image.open(BytesIO(img_raw)).resize(size)
-                tk_img = ImageTk.PhotoImage(img)
-            except:
-                continue
-
-            self.poster_images.append(tk_img)
-
-            frame = ttk.Frame(self.poster_frame)
-            frame.grid(row=row, column=col, padx=10, pady=10)
-
-            tk.Button(
-                frame,
-                image=tk_img,
-                relief="flat",
-                command=lambda m=movie: self.on_poster_click(m)
-            ).pack()
-
-            ttk.Label(
-                frame,
-                text=movie["title"],
-                wraplength=150,
-                justify="center"
-            ).pack()
-
-            col += 1
-            if col >= posters_per_row:
-                col = 0
-                row += 1
+        self.poster_grid.set_items(self.featured_movies)
+
+    def request_poster(self, generation, index, movie):
+        # Cached thumbnails paint right away, the rest arrive one by one from the pool
+        cached = self.poster_cache.get(movie["poster"], self.POSTER_SIZE)
+        if cached:
+            self.poster_grid.set_image(generation, index, cached)
+        else:
+            self.poster_executor.submit(self.load_poster, generation, index, movie["poster"])
+
+    def load_poster(self, generation, index, url):
+        try:
+            img = self.poster_cache.fetch(url, self.POSTER_SIZE, self.idlix.pool)
+        except Exception as error_poster:
+            logger.warning(f"Poster failed: {error_poster}")
+            img = None
+        self.bridge.call(self.poster_grid.set_image, generation, index, img)
 
     # ============================================================
     # POSTER POPUP MENU
@@ -183,8 +376,8 @@ class IdlixGUI:
 
         ttk.Button(popup, text="Cancel", width=20, command=popup.destroy).pack(pady=10)
 
-    # Variant selector
-    def ask_variant(self, choices):
+    # Variant selector, answers through `future`; closing the window answers None
+    def ask_variant(self, future, choices):
         popup = tk.Toplevel(self.root)
         popup.title("Select Resolution")
         popup.geometry("300x350")
@@ -196,20 +389,19 @@ class IdlixGUI:
             listbox.insert(tk.END, c)
         listbox.pack()
 
-        result = {"res": None}
+        def answer(value):
+            if not future.done():
+                future.set_result(value)
+            popup.destroy()
 
         def choose():
             sel = listbox.curselection()
-            if sel:
-                result["res"] = listbox.get(sel[0])
-            popup.destroy()
+            answer(listbox.get(sel[0]) if sel else None)
 
         ttk.Button(popup, text="OK", command=choose).pack(pady=10)
+        popup.protocol("WM_DELETE_WINDOW", lambda: answer(None))
 
         popup.grab_set()
-        self.root.wait_window(popup)
-
-        return result["res"]
 
     # ============================================================
     # REFRESH FEATURED LIST
@@ -224,7 +416,7 @@ class IdlixGUI:
                 return
 
             self.featured_movies = home["featured_movie"]
-            self.root.after(0, self.show_poster_grid)
+            self.bridge.call(self.show_poster_grid)
 
             logger.success("Featured loaded.")
 
@@ -243,13 +435,62 @@ class IdlixGUI:
         if url:
             self.process_movie(url.strip(), "play")
 
+    def batch_download(self):
+        path = filedialog.askopenfilename(
+            title="Select URL list",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        job = Job(budget=None)
+
+        def task():
+            urls = BatchQueue.read_url_file(path)
+            logger.info(f"Batch download of {len(urls)} titles")
+            results = BatchQueue(retry=retry, job=job).download(urls)
+            done = sum(1 for r in results if r["status"])
+            logger.success(f"Batch finished: {done}/{len(results)} downloaded")
+
+        self.run_job(job, task)
+
+    # ============================================================
+    # JOBS
+    # ============================================================
+    def run_job(self, job, func):
+        """
+        Run func in a worker thread, listed in self.jobs while it runs so Cancel Jobs can reach it.
+        """
+        def task():
+            self.jobs.add(job)
+            try:
+                func()
+            finally:
+                self.jobs.discard(job)
+                if job.cancelled:
+                    logger.warning(f"Job stopped: {job.reason}")
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def cancel_jobs(self):
+        jobs = list(self.jobs)
+        if not jobs:
+            logger.info("No running jobs.")
+            return
+        for job in jobs:
+            job.cancel("Cancelled by user")
+        logger.warning(f"Cancelling {len(jobs)} job(s)...")
+
     # ============================================================
     # CORE PROCESS (100% same as CLI)
     # ============================================================
     def process_movie(self, url: str, mode: str):
+        policy = self.variant_policy.get().lower()
+        job = Job(kind=mode)
 
         def task():
-            idlix = self.idlix
+            # Own helper per job: shared pool and cache, but its own state and deadline
+            idlix = IdlixHelper(cache=self.idlix.cache, pool=self.idlix.pool, job=job)
 
             # 1. get video data
             video_data = retry(idlix.get_video_data, url)
@@ -279,27 +520,26 @@ class IdlixGUI:
 
             # 4. variant playlist
             if m3u8.get("is_variant_playlist"):
-                choices = [
-                    f"{v['id']} - {v['resolution']}" for v in m3u8["variant_playlist"]
-                ]
-
-                selected = None
-
-                def ask():
-                    nonlocal selected
-                    selected = self.ask_variant(choices)
-
-                self.root.after(0, ask)
-                while selected is None:
-                    self.root.update()
-
-                selected_id = selected.split(" - ")[0]
-
-                for v in m3u8["variant_playlist"]:
-                    if str(v["id"]) == selected_id:
-                        idlix.set_m3u8_url(v["uri"])
-                        logger.success(f"Variant selected: {v['resolution']}")
-                        break
+                if policy in IdlixHelper.VARIANT_POLICIES:
+                    variant = IdlixHelper.pick_variant(m3u8["variant_playlist"], policy)
+                else:
+                    choices = [
+                        f"{v['id']} - {v['resolution']}" for v in m3u8["variant_playlist"]
+                    ]
+
+                    # Blocks this worker only, the Tk loop stays idle until the user answers;
+                    # the resolve budget is paused meanwhile
+                    with job.paused():
+                        selected = self.bridge.prompt(self.ask_variant, choices).result()
+                    if selected is None:
+                        logger.warning("Variant selection cancelled.")
+                        return
+
+                    selected_id = selected.split(" - ")[0]
+                    variant = next(v for v in m3u8["variant_playlist"] if str(v["id"]) == selected_id)
+
+                idlix.set_m3u8_url(variant["uri"])
+                logger.success(f"Variant selected: {variant['resolution']}")
             else:
                 logger.warning("No variant playlist.")
 
@@ -309,7 +549,8 @@ class IdlixGUI:
 
                 subtitle_file = subtitle["subtitle"] if subtitle.get("status") else None
 
-                self.start_ffplay(idlix.m3u8_url, subtitle_file)
+                source, proxy = idlix.play_source()
+                self.start_ffplay(source, subtitle_file, job, proxy)
 
             # DOWNLOAD
             else:
@@ -319,22 +560,34 @@ class IdlixGUI:
                 else:
                     logger.error("Download failed.")
 
-        threading.Thread(target=task, daemon=True).start()
+        self.run_job(job, task)
 
     # ============================================================
     # ffplay controls
     # ============================================================
-    def start_ffplay(self, m3u8_url, subtitle=None):
+    def start_ffplay(self, m3u8_url, subtitle=None, job=None, proxy=None):
 
         self.stop_player()
 
-        args = ["ffplay", "-i", m3u8_url, "-window_title", "IDLIX Player", "-loglevel", "panic"]
+        args = [tools.command("ffplay"), "-i", m3u8_url, "-window_title", "IDLIX Player", "-loglevel", "panic"]
 
         if subtitle:
             args += ["-vf", f"subtitles={subtitle}"]
 
         logger.info("Opening ffplay...")
-        self.ffplay_process = subprocess.Popen(args)
+        try:
+            self.ffplay_process = process = subprocess.Popen(args)
+        except Exception:
+            if proxy:
+                proxy.close()
+            raise
+        self.player_job = job
+        if job:
+            # Downloads running next to the player get less bandwidth until ffplay exits
+            job.bandwidth.hold(lambda: process.poll() is None)
+        if proxy:
+            # The proxy lives as long as this ffplay, however it ends
+            threading.Thread(target=lambda: (process.wait(), proxy.close()), daemon=True).start()
 
     def stop_player(self):
         if self.ffplay_process and self.ffplay_process.poll() is None:
@@ -343,6 +596,10 @@ class IdlixGUI:
                 logger.info("ffplay terminated.")
             except:
                 pass
+        if self.player_job:
+            # Hand the play share back to the downloads now, not when the next pace() notices the exit
+            self.player_job.bandwidth.release()
+            self.player_job = None
 
     def open_download_folder(self):
         webbrowser.open(os.getcwd())
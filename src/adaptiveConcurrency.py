@@ -0,0 +1,160 @@
+"""
+Adaptive Concurrency for IDLIX Downloader
+
+AIMD limit on the segment requests one download keeps in flight, so the
+same build fills a fat pipe and backs off on a weak link or a throttling
+CDN without hand-tuning max_num_workers. A 429 / 5xx / network error cuts
+the limit in half right away (once per round: requests already in flight
+at the old limit do not cut again). After every window of good requests
+(about one per slot) the limit moves:
+    slowdown   median speed per request under best / SLOWDOWN
+               (the link is full, requests only queue)        limit * 0.8
+    plateau    the last increase bought no goodput            back to before it
+    otherwise                                                 limit + 1
+                                      (limit * 2 until the first cut)
+always between floor and ceiling. Every change is logged at DEBUG and
+exported as metrics (segment_concurrency gauge, concurrency_changes_total).
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import time
+import asyncio
+import contextlib
+from collections import deque
+from statistics import median
+from loguru import logger
+from src.metrics import metrics
+
+# Answers that mean "too much load", unlike a 403 token expiry or a 404
+CONGESTION_STATUS = (429, 500, 502, 503, 504)
+
+
+class AimdLimiter:
+    INCREASE = 1
+    ERROR_DECREASE = 0.5
+    SLOWDOWN_DECREASE = 0.8
+    SLOWDOWN = 2.0
+    MIN_GAIN = 0.05
+    # The best speed decays a little every window, so the reference follows a link that got slower
+    BEST_DECAY = 0.98
+    # A window is one round of `limit` requests; fewer than this is too noisy to compare
+    MIN_SAMPLES = 2
+
+    def __init__(self, initial, floor, ceiling, host='segments'):
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.limit = min(max(initial, self.floor), self.ceiling)
+        self.host = host
+        self.active = 0
+        self.peak = self.limit
+        self.changes = 0
+        self.best_speed = None
+        self.last_goodput = None
+        self.increased = False
+        self.previous_limit = self.limit
+        # Double per window until the first sign of a full link, then go additive
+        self.slow_start = True
+        self._window = []
+        self._window_started = None
+        # Requests started before the last cut saw the old limit, their congestion says nothing new
+        self._cut_at = 0.0
+        self._waiters = deque()
+        metrics.set('segment_concurrency', self.limit, host=host)
+
+    # ============================================================
+    # Slots, all on the event loop of the download
+    # ============================================================
+    async def acquire(self):
+        while self.active >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _wake(self):
+        free = self.limit - self.active
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    # ============================================================
+    # Control
+    # ============================================================
+    def observe(self, seconds, nbytes=0, congested=False):
+        """
+        One finished segment request: its duration, body size and whether it was a congestion signal.
+        """
+        now = time.perf_counter()
+        if congested:
+            if now - seconds >= self._cut_at:
+                self._window, self._window_started = [], now
+                self._cut_at = now
+                self.increased, self.last_goodput, self.slow_start = False, None, False
+                self._change(int(self.limit * self.ERROR_DECREASE), 'errors', f'congested after {seconds:.2f}s')
+            return
+        if self._window_started is None:
+            self._window_started = now - seconds
+        self._window.append((seconds, nbytes))
+        if len(self._window) >= max(self.MIN_SAMPLES, self.limit):
+            self._decide(now)
+
+    def _decide(self, now):
+        window, self._window = self._window, []
+        elapsed = max(now - self._window_started, 1e-6)
+        self._window_started = now
+        speeds = [nbytes / seconds for seconds, nbytes in window if seconds > 0]
+        goodput = sum(nbytes for _, nbytes in window) / elapsed
+        speed = median(speeds) if speeds else 0.0
+        if speeds:
+            self.best_speed = max(speed, (self.best_speed or 0.0) * self.BEST_DECAY)
+
+        if speeds and speed < self.best_speed / self.SLOWDOWN:
+            limit, reason = int(self.limit * self.SLOWDOWN_DECREASE), 'slowdown'
+        elif self.increased and self.last_goodput and goodput < self.last_goodput * (1 + self.MIN_GAIN):
+            limit, reason = self.previous_limit, 'plateau'
+        else:
+            limit, reason = self.limit * 2 if self.slow_start else self.limit + self.INCREASE, 'probe'
+        limit = min(max(limit, self.floor), self.ceiling)
+        if reason != 'probe':
+            self.slow_start = False
+
+        self.increased = limit > self.limit
+        self.previous_limit = self.limit
+        self.last_goodput = goodput
+        if limit < self.limit:
+            self._cut_at = now
+        self._change(
+            limit, reason, f'{speed / 1024:.0f} KB/s per request, {goodput / 1024 / 1024:.2f} MB/s total'
+        )
+
+    def _change(self, limit, reason, detail):
+        limit = min(max(limit, self.floor), self.ceiling)
+        if limit == self.limit:
+            return
+        logger.debug(f'Concurrency {self.limit} -> {limit} ({reason}: {detail})')
+        metrics.inc('concurrency_changes_total', host=self.host, reason=reason)
+        metrics.set('segment_concurrency', limit, host=self.host)
+        self.changes += 1
+        self.limit = limit
+        self.peak = max(self.peak, limit)
+        self._wake()
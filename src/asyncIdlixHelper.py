@@ -0,0 +1,294 @@
+"""
+Asyncio Helper Class for IDLIX Downloader
+
+Stateless counterpart of IdlixHelper: every coroutine takes and returns an
+IdlixTitle, so one helper can resolve many titles concurrently on a single
+event loop. Requests are bounded per host.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import time
+import random
+import asyncio
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from http.cookiejar import CookieJar
+from curl_cffi.requests import AsyncSession
+from src.idlixHelper import IdlixHelper
+from src.htmlExtract import VideoDataScanner
+from src.sessionPool import SessionPool
+from src.metrics import metrics, current_stage
+from src.retryPolicy import retry_policy
+from src.jobControl import Job, DeadlineExceeded
+
+
+class IdlixTitle:
+    """
+    Everything resolved for one page URL. `status` / `message` mirror the result dicts of IdlixHelper.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.status = True
+        self.message = None
+        self.video_id = None
+        self.video_name = None
+        self.poster = None
+        self.embed_url = None
+        self.m3u8_url = None
+        self.variant_playlist = []
+        self.subtitle = None
+        self.cached = False
+
+    def fail(self, message):
+        self.status = False
+        self.message = message
+        return self
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class AsyncIdlixHelper:
+    MAX_PER_HOST = 8
+    TIMEOUT = 30
+    # getVideo answers kept for get_subtitle after get_m3u8_url, least recently used dropped first
+    MAX_PAYLOADS = 64
+
+    def __init__(self, max_per_host=MAX_PER_HOST, impersonate=None, cache=None, timeout=TIMEOUT):
+        self.max_per_host = max_per_host
+        self.impersonate = impersonate or random.choice(SessionPool.IMPERSONATE)
+        self.cache = cache
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.session = None
+        self._payloads = OrderedDict()
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        self.session = AsyncSession(
+            impersonate=self.impersonate,
+            cookies=self.cookies,
+            max_clients=self.max_per_host * 4,
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._semaphores[host]
+
+    async def _request(self, method, url, **kwargs):
+        if url.startswith(IdlixHelper.BASE_WEB_URL):
+            kwargs['headers'] = dict(IdlixHelper.BASE_STATIC_HEADERS, **(kwargs.get('headers') or {}))
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        retry_policy.before_request(host)
+        async with self._host_limit(url):
+            started = time.perf_counter()
+            try:
+                request = await self.session.request(method, url, **kwargs)
+            except Exception as error_request:
+                metrics.record_request(host, time.perf_counter() - started, error=type(error_request).__name__)
+                retry_policy.after_request(host, error=error_request)
+                raise
+            except BaseException as error_cancel:
+                # Cancelled, not failed: only hand back a half-open probe this request may hold
+                retry_policy.after_request(host, error=error_cancel)
+                raise
+        metrics.record_request(host, time.perf_counter() - started, request.status_code, len(request.content))
+        retry_policy.after_request(host, request.status_code)
+        return request
+
+    async def _scan_page(self, url):
+        """
+        Stream the movie page and close it as soon as the scanner has every field.
+        Returns the status, the scanner and whether the body was read to the end.
+        """
+        scanner = VideoDataScanner()
+        complete = True
+        host = urlsplit(url).netloc
+        retry_policy.before_request(host)
+        async with self._host_limit(url):
+            started = time.perf_counter()
+            try:
+                response = await self.session.request(
+                    'GET', url, stream=True, timeout=self.timeout, headers=IdlixHelper.BASE_STATIC_HEADERS
+                )
+                try:
+                    if response.status_code == 200:
+                        async for chunk in response.aiter_content():
+                            if scanner.feed(chunk):
+                                complete = False
+                                break
+                finally:
+                    await response.aclose()
+            except Exception as error_request:
+                metrics.record_request(
+                    host, time.perf_counter() - started, nbytes=scanner.bytes_read, error=type(error_request).__name__
+                )
+                retry_policy.after_request(host, error=error_request)
+                raise
+            except BaseException as error_cancel:
+                retry_policy.after_request(host, error=error_cancel)
+                raise
+        metrics.record_request(host, time.perf_counter() - started, response.status_code, scanner.bytes_read)
+        retry_policy.after_request(host, response.status_code)
+        return response.status_code, scanner, complete
+
+    async def get_home(self):
+        request = await self._request('GET', IdlixHelper.BASE_WEB_URL)
+        if request.status_code != 200:
+            return {'status': False, 'message': 'Failed to get home page'}
+        return {'status': True, 'featured_movie': IdlixHelper.parse_home(request.text)}
+
+    async def get_video_data(self, title):
+        if not title.url or not title.url.startswith(IdlixHelper.BASE_WEB_URL):
+            return title.fail('Invalid URL')
+        cached = self.cache and self.cache.get(title.url, 'video_id', 'video_name', 'poster')
+        if cached:
+            title.video_id, title.video_name, title.poster = \
+                cached['video_id'], cached['video_name'], cached['poster']
+            title.cached = True
+            return title
+
+        status_code, scanner, complete = await self._scan_page(title.url)
+        if status_code != 200:
+            return title.fail('Failed to get video data')
+        video_data = scanner.result()
+        if video_data is None:
+            # Tags seen but not usable by the fast path, the full parse needs the whole page
+            page_text = scanner.text if complete else (await self._request('GET', title.url)).text
+            video_data = IdlixHelper.parse_video_page(page_text)
+        title.video_id = video_data['video_id']
+        title.video_name = video_data['video_name']
+        title.poster = video_data['poster']
+        if self.cache:
+            self.cache.set(title.url, **video_data)
+        return title
+
+    async def get_embed_url(self, title):
+        if not title.video_id:
+            return title.fail('Video ID is required')
+        cached = self.cache and self.cache.get(title.url, 'embed_url')
+        if cached:
+            title.embed_url = IdlixHelper.embed_hash(cached['embed_url'])
+            return title
+
+        request = await self._request(
+            'POST',
+            IdlixHelper.BASE_WEB_URL + "wp-admin/admin-ajax.php",
+            data=IdlixHelper.embed_request_data(title.video_id)
+        )
+        if request.status_code != 200 or not request.json().get('embed_url'):
+            return title.fail('Failed to get embed URL')
+        embed_url = IdlixHelper.decrypt_embed_url(request.json())
+        if self.cache:
+            self.cache.set(title.url, embed_url=embed_url)
+        title.embed_url = IdlixHelper.embed_hash(embed_url)
+        return title
+
+    async def _video_payload(self, embed_hash):
+        if embed_hash not in self._payloads:
+            # Concurrent callers for the same hash share one in-flight request
+            self._payloads[embed_hash] = asyncio.ensure_future(self._request(
+                'POST', IdlixHelper.JENIUSPLAY_URL, **IdlixHelper.get_video_request(embed_hash)
+            ))
+            while len(self._payloads) > self.MAX_PAYLOADS:
+                self._payloads.popitem(last=False)
+        self._payloads.move_to_end(embed_hash)
+        payload = self._payloads[embed_hash]
+        try:
+            request = await asyncio.shield(payload)
+        except Exception:
+            self._forget_payload(embed_hash, payload)
+            raise
+        if request.status_code != 200:
+            self._forget_payload(embed_hash, payload)
+            return None
+        video_payload = IdlixHelper.parse_video_payload(request.text)
+        if not IdlixHelper.video_source_m3u8(video_payload['json']):
+            # A transient error body, the next caller asks again
+            self._forget_payload(embed_hash, payload)
+        return video_payload
+
+    def _forget_payload(self, embed_hash, payload):
+        # Only the failed request, a later retry may already have put a new one in its place
+        if self._payloads.get(embed_hash) is payload:
+            del self._payloads[embed_hash]
+
+    async def _load_variants(self, title):
+        request = await self._request('GET', title.m3u8_url)
+        if request.status_code != 200:
+            raise Exception(f'HTTP {request.status_code} loading {title.m3u8_url}')
+        _, title.variant_playlist = IdlixHelper.parse_variant_playlist(request.text, title.m3u8_url)
+
+    async def get_m3u8_url(self, title):
+        if not title.embed_url:
+            return title.fail('Embed URL is required')
+        cached = self.cache and self.cache.get(title.url, 'm3u8_url', 'variant_playlist')
+        if cached:
+            title.m3u8_url = cached['m3u8_url']
+            try:
+                await self._load_variants(title)
+                return title
+            except Exception:
+                self.cache.invalidate(title.url, 'm3u8_url', 'variant_playlist')
+
+        payload = await self._video_payload(title.embed_url)
+        title.m3u8_url = payload and IdlixHelper.video_source_m3u8(payload['json'])
+        if not title.m3u8_url:
+            return title.fail('Failed to get m3u8 URL')
+        await self._load_variants(title)
+        if self.cache:
+            self.cache.set(title.url, m3u8_url=title.m3u8_url, variant_playlist=title.variant_playlist)
+        return title
+
+    async def get_subtitle(self, title):
+        if not title.embed_url:
+            return title.fail('Embed URL is required')
+        payload = await self._video_payload(title.embed_url)
+        title.subtitle = payload and IdlixHelper.subtitle_url(payload['text'])
+        return title
+
+    async def _resolve(self, title, subtitle, job):
+        stages = (self.get_video_data, self.get_embed_url, self.get_m3u8_url)
+        for stage in stages + ((self.get_subtitle,) if subtitle else ()):
+            # Each resolve() runs in its own task, so the stage label stays per title
+            current_stage.set(stage.__name__)
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(stage(title), job.remaining(stage.__name__))
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f'{stage.__name__} ran out of its time budget') from None
+            metrics.observe('stage_seconds', time.perf_counter() - started, stage=stage.__name__)
+            if not title.status:
+                metrics.inc('stage_errors_total', stage=stage.__name__, kind='failed')
+                return
+
+    async def resolve(self, url, subtitle=False, job=None):
+        """
+        `job` carries the deadline budget of this title and cancels it from any thread.
+        """
+        title = IdlixTitle(url)
+        job = job or Job()
+        try:
+            await job.guard(self._resolve(title, subtitle, job))
+        except Exception as error_resolve:
+            title.fail(str(error_resolve))
+        return title
+
+    async def resolve_many(self, urls, subtitle=False, job=None):
+        """
+        Cancelling `job` cancels every title, each one still gets its own deadline budget.
+        """
+        return await asyncio.gather(*(
+            self.resolve(url, subtitle, Job(parent=job) if job else None) for url in urls
+        ))
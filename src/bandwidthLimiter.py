@@ -0,0 +1,142 @@
+"""
+Bandwidth Limiter for IDLIX Downloader
+
+One token bucket rate for the whole process (segments, posters, subtitles),
+split over the jobs moving data by their weight. A "play" job weighs more
+than a "download" job and holds its share while ffplay runs, even though
+ffplay fetches on its own, so background downloads slow down for playback
+instead of starving it. rate=0 (the default) turns limiting off.
+
+    bandwidth.configure(rate=parse_rate('4M'), weights={'play': 8, 'download': 1})
+    share = bandwidth.share('download')
+    time.sleep(share.pace(len(body)))            # or await asyncio.sleep(...)
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import re
+import time
+import weakref
+import threading
+
+
+def parse_rate(value):
+    """
+    Bytes per second from '500K', '4M', '1.5M' or a plain number; 0 / '' = unlimited.
+    """
+    match = re.fullmatch(r'([\d.]+)\s*([KMG]?)B?(/S)?', str(value or 0).strip().upper())
+    if not match:
+        raise ValueError(f'Invalid rate {value}')
+    number, unit = match.group(1), match.group(2)
+    return int(float(number) * {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}[unit])
+
+
+def parse_weights(value):
+    """
+    {'play': 8, 'download': 1} from 'play=8,download=1'.
+    """
+    weights = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        kind, weight = item.split('=')
+        weights[kind.strip()] = float(weight)
+    return weights
+
+
+class BandwidthShare:
+    """
+    The part of the global rate one job gets. Created by BandwidthLimiter.share().
+    """
+
+    def __init__(self, limiter, kind, weight):
+        self.limiter = limiter
+        self.kind = kind
+        self.weight = weight
+        self.tokens = None
+        self.updated = 0.0
+        self.last_used = None
+        self._alive = None
+
+    @property
+    def weight_now(self):
+        return self.weight if self.weight is not None else self.limiter.weights.get(self.kind, 1)
+
+    def pace(self, nbytes):
+        """
+        Charge nbytes (received, or expected before a request); returns the seconds to wait.
+        """
+        return self.limiter.pace(self, nbytes)
+
+    def hold(self, alive=None):
+        """
+        Keep the share of this job reserved while it moves no bytes through here (ffplay fetches
+        by itself), until release() or until alive() returns False.
+        """
+        self._alive = alive or (lambda: True)
+
+    def release(self):
+        self._alive = None
+
+    def active(self, now):
+        if self._alive is not None:
+            if self._alive():
+                return True
+            self._alive = None
+        return self.last_used is not None and now - self.last_used < self.limiter.IDLE
+
+
+class BandwidthLimiter:
+    WEIGHTS = {'play': 8, 'download': 1, 'background': 1}
+    # Seconds of its rate a share may spend at once
+    BURST = 0.5
+    # A share that moved nothing for this long stops counting in the split
+    IDLE = 2.0
+
+    def __init__(self, rate=0, weights=None):
+        self.rate = rate
+        self.weights = dict(self.WEIGHTS)
+        self.weights.update(weights or {})
+        self._shares = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # Posters and other fetches outside a job
+        self.background = self.share('background')
+
+    def configure(self, rate=None, weights=None):
+        with self._lock:
+            if rate is not None:
+                self.rate = rate
+            self.weights.update(weights or {})
+
+    def share(self, kind='download', weight=None):
+        share = BandwidthShare(self, kind, weight)
+        with self._lock:
+            self._shares.add(share)
+        return share
+
+    def share_rate(self, share, now=None):
+        """
+        Bytes per second `share` gets right now: the global rate times its part of the active weight.
+        """
+        now = now or time.monotonic()
+        total = sum(other.weight_now for other in self._shares if other is not share and other.active(now))
+        return self.rate * share.weight_now / (total + share.weight_now)
+
+    def pace(self, share, nbytes):
+        now = time.monotonic()
+        with self._lock:
+            share.last_used = now
+            if not self.rate:
+                return 0.0
+            rate = self.share_rate(share, now)
+            burst = rate * self.BURST
+            if share.tokens is None:
+                share.tokens = burst
+            else:
+                share.tokens += (now - share.updated) * rate
+            share.updated = now
+            # nbytes < 0 hands back an estimate charged in advance
+            share.tokens = min(share.tokens - nbytes, burst)
+            return max(-share.tokens / rate, 0.0)
+
+
+bandwidth = BandwidthLimiter()
@@ -0,0 +1,154 @@
+"""
+Batch Download Queue for IDLIX Downloader
+
+Resolves titles ahead of the running downloads and caps the total number of
+segment connections across every job on one event loop.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import shutil
+import asyncio
+from loguru import logger
+from src.idlixHelper import IdlixHelper
+from src.sessionPool import SessionPool
+from src.resolveCache import ResolveCache
+from src.hlsDownloader import HlsDownloader
+from src.jobControl import Job
+
+
+class BatchQueue:
+    MAX_CONNECTIONS = 20
+    MAX_DOWNLOADS = 2
+    MAX_RESOLVERS = 1
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_downloads=MAX_DOWNLOADS,
+                 max_resolvers=MAX_RESOLVERS, workers_per_job=HlsDownloader.MAX_NUM_WORKERS,
+                 mode='segments', output_dir=None, work_dir=None, retry=None, job=None,
+                 adaptive=True, min_workers=HlsDownloader.MIN_WORKERS, max_workers=HlsDownloader.MAX_WORKERS):
+        self.max_connections = max_connections
+        self.max_downloads = max_downloads
+        self.max_resolvers = max_resolvers
+        self.workers_per_job = workers_per_job
+        # Each job tunes its own segment concurrency, max_connections still caps the sum
+        self.adaptive = adaptive
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.mode = mode
+        self.output_dir = output_dir or os.getcwd()
+        self.work_dir = work_dir or os.path.join(os.getcwd(), 'tmp')
+        self.retry = retry or (lambda func, *args, **kwargs: func(*args, **kwargs))
+        # Cancelling the batch job cancels every title; each title has its own resolve deadline
+        self.job = job or Job(budget=None)
+        # All resolver threads share warm per-host sessions and one SQLite connection of the cache
+        self.pool = SessionPool()
+        self.cache = ResolveCache()
+
+    @staticmethod
+    def read_url_file(path):
+        with open(path, 'r', encoding='utf-8') as url_file:
+            return [
+                line.strip() for line in url_file
+                if line.strip() and not line.strip().startswith('#')
+            ]
+
+    def resolve(self, url):
+        """
+        Blocking resolution of one title, run in a thread so it overlaps with running downloads.
+        No variant prompt in batch mode, the downloader takes the best bandwidth variant.
+        """
+        helper = IdlixHelper(cache=self.cache, pool=self.pool, job=Job(parent=self.job))
+        video_data = self.retry(helper.get_video_data, url)
+        if not video_data.get("status"):
+            return {'status': False, 'message': 'Error getting video data'}
+        embed = self.retry(helper.get_embed_url)
+        if not embed.get("status"):
+            return {'status': False, 'message': 'Error getting embed URL'}
+        m3u8 = self.retry(helper.get_m3u8_url)
+        if not m3u8.get("status"):
+            return {'status': False, 'message': 'Error getting M3U8 URL'}
+        return {'status': True, 'helper': helper}
+
+    async def _download(self, helper, connection_limit):
+        # Each job gets its own working dir, nothing is shared between titles
+        tmp_dir = os.path.join(self.work_dir, helper.video_name.replace(" ", "_"))
+        downloader = HlsDownloader(
+            m3u8_url=helper.m3u8_url,
+            output_name=helper.video_name,
+            output_dir=self.output_dir,
+            tmp_dir=tmp_dir,
+            max_num_workers=self.workers_per_job,
+            impersonate=helper.pool.impersonate,
+            cookies=helper.pool.cookies,
+            mode=self.mode,
+            connection_limit=connection_limit,
+            job=helper.job,
+            adaptive=self.adaptive,
+            min_workers=self.min_workers,
+            max_workers=self.max_workers,
+        )
+        path = await downloader.run()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return path
+
+    async def _resolver(self, urls, resolved):
+        while not urls.empty():
+            index, url = urls.get_nowait()
+            if self.job.cancelled:
+                await resolved.put((index, url, {'status': False, 'message': self.job.reason}))
+                continue
+            logger.info(f'[{index + 1}] Resolving {url}')
+            try:
+                result = await asyncio.to_thread(self.resolve, url)
+            except Exception as error_resolve:
+                # One bad URL (not a movie page, page layout changed) must not stop the batch
+                result = {'status': False, 'message': f'Error resolving: {error_resolve}'}
+            await resolved.put((index, url, result))
+
+    async def _downloader(self, resolved, results, connection_limit):
+        while True:
+            item = await resolved.get()
+            if item is None:
+                return
+            index, url, result = item
+            if not result.get('status'):
+                logger.error(f"[{index + 1}] {result['message']}")
+                results[index] = {'url': url, 'status': False, 'message': result['message']}
+                continue
+
+            helper = result['helper']
+            logger.info(f'[{index + 1}] Downloading {helper.video_name}')
+            try:
+                path = await self._download(helper, connection_limit)
+                logger.success(f'[{index + 1}] Downloaded {path}')
+                results[index] = {'url': url, 'status': True, 'path': path}
+            except Exception as error_download:
+                logger.error(f'[{index + 1}] Download failed: {error_download}')
+                results[index] = {'url': url, 'status': False, 'message': str(error_download)}
+
+    async def run(self, urls):
+        results = [None] * len(urls)
+        connection_limit = asyncio.Semaphore(self.max_connections)
+        pending = asyncio.Queue()
+        for item in enumerate(urls):
+            pending.put_nowait(item)
+
+        # Small hand-off queue: resolve the next title while the current ones download,
+        # but not so far ahead that the signed playlist URLs go stale
+        resolved = asyncio.Queue(maxsize=self.max_downloads)
+        downloaders = [
+            asyncio.create_task(self._downloader(resolved, results, connection_limit))
+            for _ in range(self.max_downloads)
+        ]
+        await asyncio.gather(*(
+            self._resolver(pending, resolved) for _ in range(self.max_resolvers)
+        ))
+        for _ in downloaders:
+            await resolved.put(None)
+        await asyncio.gather(*downloaders)
+        return results
+
+    def download(self, urls):
+        return asyncio.run(self.run(urls))
@@ -0,0 +1,760 @@
+"""
+HLS Segment Downloader for IDLIX Downloader
+
+Fetches media-playlist segments concurrently over a pooled curl_cffi
+AsyncSession and hands them to ffmpeg in playlist order.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import asyncio
+import subprocess
+import contextlib
+from collections import deque
+from statistics import quantiles
+from loguru import logger
+from urllib.parse import urlsplit
+from curl_cffi.requests import AsyncSession
+from src.metrics import metrics
+from src.retryPolicy import retry_policy, retryable_error, CircuitOpenError, RETRYABLE_STATUS
+from src.jobControl import Job
+from src.toolLocator import tools
+from src.adaptiveConcurrency import AimdLimiter, CONGESTION_STATUS
+
+
+class SegmentError(Exception):
+    pass
+
+
+class SegmentJournal:
+    """
+    Append-only record of finished segments so an interrupted download can resume.
+    Each line is either the header (playlist URL, segment count) or one finished segment.
+    """
+    FILE_NAME = 'journal.jsonl'
+
+    def __init__(self, tmp_dir):
+        self.path = os.path.join(tmp_dir, self.FILE_NAME)
+        self._file = None
+
+    @staticmethod
+    def checksum(data):
+        return hashlib.sha1(data).hexdigest()
+
+    @staticmethod
+    def _playlist_key(url):
+        # Signed CDN URLs change their query on every resolve, the path stays the same
+        return urlsplit(url)._replace(query='', fragment='').geturl()
+
+    def _read(self):
+        header, entries = None, {}
+        if not os.path.exists(self.path):
+            return header, entries
+        with open(self.path, 'r') as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line after a crash
+                    continue
+                if 'playlist' in entry:
+                    header = entry
+                elif entry.get('done'):
+                    entries[entry['index']] = entry
+        return header, entries
+
+    def resume(self, playlist_url, total, segment_path):
+        """
+        Return the indices already on disk whose length and checksum still match.
+        A journal written for another playlist is discarded.
+        """
+        header, entries = self._read()
+        if not header or header.get('playlist') != self._playlist_key(playlist_url) \
+                or header.get('segments') != total:
+            entries = {}
+            with open(self.path, 'w') as journal_file:
+                journal_file.write(json.dumps({
+                    'playlist': self._playlist_key(playlist_url),
+                    'segments': total
+                }) + '\n')
+
+        finished = set()
+        for index, entry in entries.items():
+            path = segment_path(index)
+            if not os.path.exists(path) or os.path.getsize(path) != entry['length']:
+                continue
+            with open(path, 'rb') as segment_file:
+                if self.checksum(segment_file.read()) == entry['checksum']:
+                    finished.add(index)
+
+        self._file = open(self.path, 'a')
+        return finished
+
+    def record(self, index, data):
+        self._file.write(json.dumps({
+            'index': index,
+            'length': len(data),
+            'checksum': self.checksum(data),
+            'done': True
+        }) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class SegmentHedger:
+    """
+    Rolling p95 of segment request times for one download. A segment still running after the p95
+    gets a second request (on another connection or a mirror host); the first answer wins.
+    """
+    WINDOW = 64
+    MIN_SAMPLES = 8
+    # Never hedge sooner than this, a p95 of a few ms is noise on a LAN
+    MIN_DELAY = 0.1
+    # Hedges per segment fetched, so a slow CDN is not sent double the load
+    RATIO = 0.1
+
+    def __init__(self, mirrors=None):
+        self.samples = deque(maxlen=self.WINDOW)
+        self.mirrors = list(mirrors or [])
+        self.fetches = 0
+        self.hedges = 0
+        self.won = 0
+        self._next_mirror = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def delay(self):
+        """
+        Seconds a segment fetch may run before it is hedged, None while the window is too small.
+        """
+        if len(self.samples) < self.MIN_SAMPLES:
+            return None
+        return max(quantiles(self.samples, n=20)[18], self.MIN_DELAY)
+
+    def take(self):
+        if self.hedges >= max(1, self.fetches * self.RATIO):
+            return False
+        self.hedges += 1
+        return True
+
+    def mirror_url(self, url):
+        if not self.mirrors:
+            return url
+        mirror = urlsplit(self.mirrors[self._next_mirror % len(self.mirrors)])
+        self._next_mirror += 1
+        return urlsplit(url)._replace(scheme=mirror.scheme, netloc=mirror.netloc).geturl()
+
+
+def ffmpeg_error(stderr):
+    return SegmentError(f'ffmpeg failed: {stderr.decode(errors="ignore").strip()}')
+
+
+class SegmentFileSink:
+    """
+    Stores every segment as its own file in tmp_dir and concatenates them with ffmpeg at the end.
+    Resumable through the segment journal.
+    """
+    ordered = False
+
+    def __init__(self, tmp_dir, output_path):
+        self.tmp_dir = tmp_dir
+        self.output_path = output_path
+        self.journal = SegmentJournal(tmp_dir)
+        self.total = 0
+
+    def segment_path(self, index):
+        return os.path.join(self.tmp_dir, f'{index:06d}.ts')
+
+    async def open(self, playlist_url, total):
+        self.total = total
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return await asyncio.to_thread(self.journal.resume, playlist_url, total, self.segment_path)
+
+    async def reserve(self, index):
+        pass
+
+    def _store(self, index, data):
+        with open(self.segment_path(index), 'wb') as segment_file:
+            segment_file.write(data)
+        self.journal.record(index, data)
+
+    async def write(self, index, data):
+        await asyncio.to_thread(self._store, index, data)
+
+    def _mux(self):
+        recipe = os.path.join(self.tmp_dir, 'segments.txt')
+        with open(recipe, 'w') as recipe_file:
+            for index in range(self.total):
+                # Relative to the recipe, tmp_dir carries the title and may contain a quote
+                recipe_file.write(f"file '{os.path.basename(self.segment_path(index))}'\n")
+        process = subprocess.run(
+            [
+                tools.command("ffmpeg"), "-y",
+                "-f", "concat", "-safe", "0",
+                "-i", recipe,
+                "-c", "copy",
+                "-hide_banner", "-loglevel", "error",
+                self.output_path
+            ],
+            capture_output=True
+        )
+        if process.returncode != 0:
+            raise ffmpeg_error(process.stderr)
+
+    async def finish(self):
+        self.journal.close()
+        await asyncio.to_thread(self._mux)
+        return self.output_path
+
+    async def abort(self):
+        self.journal.close()
+
+
+class FfmpegPipeSink:
+    """
+    Streams segments in playlist order straight into `ffmpeg -i pipe:0 -c copy`.
+    Nothing touches the disk except the final MP4; at most `window` segments are held in memory.
+    """
+    ordered = True
+
+    def __init__(self, output_path, window):
+        self.output_path = output_path
+        self.window = max(window, 1)
+        self.process = None
+        self.buffer = {}
+        self.next_index = 0
+        self._lock = asyncio.Lock()
+        self._advanced = asyncio.Condition()
+
+    async def open(self, playlist_url, total):
+        self.process = subprocess.Popen(
+            [
+                tools.command("ffmpeg"), "-y",
+                "-f", "mpegts",
+                "-i", "pipe:0",
+                "-c", "copy",
+                "-hide_banner", "-loglevel", "error",
+                self.output_path
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        return set()
+
+    async def reserve(self, index):
+        # Fetching too far ahead of the writer would let the reorder buffer grow without limit
+        async with self._advanced:
+            await self._advanced.wait_for(lambda: index < self.next_index + self.window)
+
+    async def write(self, index, data):
+        async with self._lock:
+            self.buffer[index] = data
+            while self.next_index in self.buffer:
+                chunk = self.buffer.pop(self.next_index)
+                try:
+                    await asyncio.to_thread(self.process.stdin.write, chunk)
+                except (BrokenPipeError, OSError):
+                    raise ffmpeg_error(await asyncio.to_thread(self.process.stderr.read))
+                self.next_index += 1
+        async with self._advanced:
+            self._advanced.notify_all()
+
+    def _close(self):
+        self.process.stdin.close()
+        stderr = self.process.stderr.read()
+        if self.process.wait() != 0:
+            raise ffmpeg_error(stderr)
+
+    async def finish(self):
+        await asyncio.to_thread(self._close)
+        return self.output_path
+
+    async def abort(self):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+
+class PreallocatedFileSink:
+    """
+    Raw TS assembly: the output file is preallocated from the known segment sizes and every
+    segment is written at its own offset as soon as it arrives, in any order.
+    Optionally remuxed to MP4 with ffmpeg at the end.
+    """
+    ordered = False
+
+    def __init__(self, ts_path, output_path, sizes, remux=True):
+        self.ts_path = ts_path
+        self.output_path = output_path
+        self.sizes = sizes
+        self.offsets = [0]
+        for size in sizes[:-1]:
+            self.offsets.append(self.offsets[-1] + size)
+        self.remux = remux
+        self.fd = None
+        # os.pwrite is POSIX only, Windows falls back to seek + write under a lock
+        self._seek_lock = None if hasattr(os, 'pwrite') else asyncio.Lock()
+
+    def _allocate(self):
+        self.fd = os.open(self.ts_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0))
+        total = sum(self.sizes)
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(self.fd, 0, total)
+                return
+            except OSError:
+                pass
+        os.ftruncate(self.fd, total)
+
+    async def open(self, playlist_url, total):
+        await asyncio.to_thread(self._allocate)
+        return set()
+
+    async def reserve(self, index):
+        pass
+
+    async def write(self, index, data):
+        if len(data) != self.sizes[index]:
+            raise SegmentError(f'Segment {index} size changed ({len(data)} != {self.sizes[index]})')
+        if self._seek_lock is None:
+            await asyncio.to_thread(os.pwrite, self.fd, data, self.offsets[index])
+            return
+        async with self._seek_lock:
+            await asyncio.to_thread(self._seek_write, data, self.offsets[index])
+
+    def _seek_write(self, data, offset):
+        os.lseek(self.fd, offset, os.SEEK_SET)
+        os.write(self.fd, data)
+
+    def _remux(self):
+        process = subprocess.run(
+            [
+                tools.command("ffmpeg"), "-y",
+                "-i", self.ts_path,
+                "-c", "copy",
+                "-hide_banner", "-loglevel", "error",
+                self.output_path
+            ],
+            capture_output=True
+        )
+        if process.returncode != 0:
+            raise ffmpeg_error(process.stderr)
+        os.remove(self.ts_path)
+
+    async def finish(self):
+        os.close(self.fd)
+        self.fd = None
+        if not self.remux:
+            return self.ts_path
+        await asyncio.to_thread(self._remux)
+        return self.output_path
+
+    async def abort(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class HlsDownloader:
+    MAX_NUM_WORKERS = 10
+    # Bounds of the adaptive limit; max_num_workers is where it starts
+    MIN_WORKERS = 2
+    MAX_WORKERS = 32
+    REORDER_WINDOW = 32
+    MODES = ('segments', 'pipe', 'preallocate')
+    SEGMENT_RETRY_LIMIT = 3
+    SEGMENT_TIMEOUT = 30
+
+    def __init__(self, m3u8_url, output_name, output_dir=None, tmp_dir=None,
+                 max_num_workers=MAX_NUM_WORKERS, impersonate=None, headers=None, cookies=None,
+                 mode='segments', reorder_window=REORDER_WINDOW, remux=True, connection_limit=None, policy=None, job=None,
+                 adaptive=True, min_workers=MIN_WORKERS, max_workers=MAX_WORKERS, hedge=True, mirrors=None):
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown download mode {mode}')
+        self.m3u8_url = m3u8_url
+        self.output_name = output_name
+        self.output_dir = output_dir or os.getcwd()
+        self.tmp_dir = tmp_dir or os.path.join(os.getcwd(), 'tmp')
+        self.max_num_workers = max_num_workers
+        # adaptive=False keeps exactly max_num_workers segment fetches in flight
+        self.adaptive = adaptive
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.limiter = None
+        # Slow-tail segments get a hedged second request, on a fresh connection or one of `mirrors`
+        # (scheme://host that serve the same paths)
+        self.hedger = SegmentHedger(mirrors) if hedge else None
+        self._hedge_session = None
+        self.impersonate = impersonate or random.choice(["chrome124", "chrome119", "chrome104"])
+        self.headers = headers or {}
+        self.cookies = cookies
+        self.media_playlist = None
+        self.segments = []
+        self.mode = mode
+        self.reorder_window = reorder_window
+        self.remux = remux
+        # Optional asyncio.Semaphore shared by every job on the loop to cap total segment connections
+        self.connection_limit = connection_limit
+        self.policy = policy or retry_policy
+        # cancel() on the job stops the workers and closes the session of this download
+        self.job = job or Job(budget=None)
+        self.sink = None
+        self._keys = {}
+        self._done = 0
+        self._segment_size = 0
+
+    @property
+    def output_path(self):
+        return os.path.join(self.output_dir, self.output_name + '.mp4')
+
+    @property
+    def worker_count(self):
+        return max(self.max_workers, self.max_num_workers) if self.adaptive else self.max_num_workers
+
+    def _new_session(self):
+        return AsyncSession(
+            impersonate=self.impersonate,
+            headers=self.headers,
+            cookies=self.cookies,
+            max_clients=self.worker_count,
+        )
+
+    async def _request(self, session, method, url, stage=None, retry=False, **kwargs):
+        host = urlsplit(url).netloc
+        self.policy.before_request(host)
+        started = time.perf_counter()
+        try:
+            request = await session.request(method, url, timeout=self.SEGMENT_TIMEOUT, **kwargs)
+        except Exception as error_request:
+            metrics.record_request(
+                host, time.perf_counter() - started, error=type(error_request).__name__, stage=stage, retry=retry
+            )
+            self.policy.after_request(host, error=error_request)
+            if stage == 'segment' and self.limiter:
+                self.limiter.observe(time.perf_counter() - started, congested=retryable_error(error_request))
+            raise
+        except BaseException as error_cancel:
+            # Cancelled, not failed: only hand back a half-open probe this request may hold
+            self.policy.after_request(host, error=error_cancel)
+            raise
+        self.policy.after_request(host, request.status_code)
+        metrics.record_request(
+            host, time.perf_counter() - started, request.status_code, len(request.content), stage=stage, retry=retry
+        )
+        if stage == 'segment' and self.limiter:
+            self.limiter.observe(
+                time.perf_counter() - started, len(request.content), request.status_code in CONGESTION_STATUS
+            )
+        if stage == 'segment' and self.hedger and request.status_code in (200, 206):
+            self.hedger.record(time.perf_counter() - started)
+        return request
+
+    async def _fetch(self, session, method, url, stage, what, limit=None, headers=None, on_start=None):
+        """
+        _request with the retry policy: backoff + jitter for retryable statuses and network errors,
+        immediate failure for fatal ones, an open circuit or a spent retry budget.
+        on_start() is called whenever an attempt holds its slots and goes out.
+        """
+        ok = (200, 206)
+        last_error = None
+        # The adaptive limit is taken per attempt, so a backoff sleep does not hold a slot
+        slot = self.limiter.slot if stage == 'segment' and self.limiter else contextlib.nullcontext
+        for attempt in range(self.SEGMENT_RETRY_LIMIT):
+            self.job.check()
+            self.policy.budget.deposit()
+            retry_after = 0
+            try:
+                async with slot(), limit or contextlib.nullcontext():
+                    if on_start:
+                        on_start()
+                    request = await self._request(
+                        session, method, url, stage=stage, retry=attempt > 0, headers=headers
+                    )
+                if request.status_code in ok and (method == 'HEAD' or request.content):
+                    return request
+                last_error = f'HTTP {request.status_code}'
+                if request.status_code == 429 and request.headers.get('Retry-After', '').isdigit():
+                    retry_after = min(int(request.headers['Retry-After']), self.policy.max_delay)
+                if request.status_code not in ok + RETRYABLE_STATUS:
+                    break
+            except CircuitOpenError as error_circuit:
+                last_error = str(error_circuit)
+                break
+            except Exception as error_fetch:
+                last_error = str(error_fetch)
+                if not retryable_error(error_fetch):
+                    break
+            if attempt + 1 == self.SEGMENT_RETRY_LIMIT or not self.policy.may_retry():
+                break
+            await asyncio.sleep(max(self.policy.backoff(attempt), retry_after))
+        raise SegmentError(f'Failed to load {what}: {last_error}')
+
+    async def load_playlist(self, session):
+        # m3u8 and Crypto are imported with the first download, not with the app
+        import m3u8
+        request = await self._fetch(session, 'GET', self.m3u8_url, 'playlist', 'playlist')
+        playlist = m3u8.loads(request.text, uri=self.m3u8_url)
+
+        # Master playlist without a chosen variant, take the best bandwidth like m3u8_To_MP4 did
+        if playlist.is_variant:
+            best = max(playlist.playlists, key=lambda p: p.stream_info.bandwidth or 0)
+            request = await self._fetch(session, 'GET', best.absolute_uri, 'playlist', 'variant playlist')
+            playlist = m3u8.loads(request.text, uri=best.absolute_uri)
+
+        self.media_playlist = playlist
+        self.segments = list(playlist.segments)
+        if not self.segments:
+            raise SegmentError('Media playlist has no segments')
+        return playlist
+
+    async def _get_key(self, session, key):
+        if key.absolute_uri not in self._keys:
+            request = await self._fetch(session, 'GET', key.absolute_uri, 'key', 'key')
+            self._keys[key.absolute_uri] = request.content
+        return self._keys[key.absolute_uri]
+
+    async def _decrypt(self, session, index, segment, data):
+        key = segment.key
+        if not key or not key.method or key.method == 'NONE':
+            return data
+        if key.method != 'AES-128':
+            raise SegmentError(f'Unsupported key method {key.method}')
+        if key.iv:
+            iv = bytes.fromhex(key.iv[2:] if key.iv.lower().startswith('0x') else key.iv)
+        else:
+            iv = (self.media_playlist.media_sequence + index).to_bytes(16, 'big')
+        from Crypto.Cipher import AES
+        cipher = AES.new(await self._get_key(session, key), AES.MODE_CBC, iv)
+        data = cipher.decrypt(data)
+        return data[:-data[-1]]
+
+    def _segment_headers(self, segment):
+        if not segment.byterange:
+            return None
+        length, _, offset = segment.byterange.partition('@')
+        start = int(offset) if offset else 0
+        return {"Range": f"bytes={start}-{start + int(length) - 1}"}
+
+    async def segment_sizes(self, session):
+        """
+        Byte size of every segment, from EXT-X-BYTERANGE or a HEAD pass over the media playlist.
+        Returns None when a size cannot be known up front.
+        """
+        if any(segment.key and segment.key.method not in (None, 'NONE') for segment in self.segments):
+            # Padding makes the decrypted size unknown until the segment is fetched
+            return None
+        semaphore = asyncio.Semaphore(self.max_num_workers)
+
+        async def head(segment):
+            if segment.byterange:
+                return int(segment.byterange.split('@')[0])
+            try:
+                request = await self._fetch(
+                    session, 'HEAD', segment.absolute_uri, 'segment_head', 'segment size', limit=semaphore
+                )
+            except SegmentError:
+                return None
+            length = request.headers.get('Content-Length')
+            if request.status_code != 200 or not length or request.headers.get('Content-Encoding'):
+                return None
+            return int(length)
+
+        sizes = await asyncio.gather(*(head(segment) for segment in self.segments))
+        return None if None in sizes else list(sizes)
+
+    async def _hedged_fetch(self, session, url, what, headers):
+        """
+        _fetch of a segment, plus a hedged duplicate when it runs past the rolling p95.
+        The first success is returned and the other request cancelled.
+        """
+        def fetch(fetch_session, fetch_url, on_start=None):
+            return asyncio.ensure_future(self._fetch(
+                fetch_session, 'GET', fetch_url, 'segment', what, limit=self.connection_limit, headers=headers,
+                on_start=on_start
+            ))
+
+        # Start of the attempt in flight; time spent queued for a slot is not a slow tail
+        started = []
+        primary = fetch(session, url, on_start=lambda: started.append(time.perf_counter()))
+        if not self.hedger:
+            return await primary
+        self.hedger.fetches += 1
+        racers = [primary]
+        try:
+            # The first segments start before there is a p95, and the primary may still be queued,
+            # so both are looked up again while waiting
+            while True:
+                delay = self.hedger.delay()
+                waited = time.perf_counter() - started[-1] if started else 0
+                if delay is not None and started and waited >= delay:
+                    break
+                done, _ = await asyncio.wait(
+                    racers, timeout=delay - waited if delay is not None and started else self.hedger.MIN_DELAY
+                )
+                if done:
+                    return await primary
+            if self._hedge_would_queue() or not self.hedger.take():
+                return await primary
+            if self._hedge_session is None:
+                self._hedge_session = self._new_session()
+            hedge_url = self.hedger.mirror_url(url)
+            logger.debug(f'{what} still running after {delay:.2f}s (p95), hedging on {urlsplit(hedge_url).netloc}')
+            hedge = fetch(self._hedge_session, hedge_url)
+            racers.append(hedge)
+            pending, error = set(racers), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedger.won += 1
+                        metrics.inc(
+                            'segment_hedges_total', host=urlsplit(hedge_url).netloc,
+                            outcome='won' if task is hedge else 'lost'
+                        )
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in racers:
+                task.cancel()
+
+    def _hedge_would_queue(self):
+        # A hedge waiting for a slot only lengthens the queue, it cannot overtake anything
+        if self.limiter and self.limiter.active >= self.limiter.limit:
+            return True
+        return self.connection_limit is not None and self.connection_limit.locked()
+
+    async def fetch_segment(self, session, index):
+        segment = self.segments[index]
+        # Global bandwidth limit: charged before the request, at the size of the last segment, so a
+        # burst of workers cannot overshoot it; paced outside the concurrency slot
+        expected = int(segment.byterange.split('@')[0]) if segment.byterange else self._segment_size
+        await asyncio.sleep(self.job.bandwidth.pace(expected))
+        try:
+            request = await self._hedged_fetch(
+                session, segment.absolute_uri, f'segment {index}', self._segment_headers(segment)
+            )
+        except SegmentError as error_segment:
+            raise SegmentError(f'Segment {index} failed: {error_segment}')
+        # Settle the estimate with the real size
+        await asyncio.sleep(self.job.bandwidth.pace(len(request.content) - expected))
+        self._segment_size = len(request.content)
+        return await self._decrypt(session, index, segment, request.content)
+
+    def _log_progress(self, index, size):
+        self._done += 1
+        total = len(self.segments)
+        logger.debug(f'Segment {index} done ({size} bytes)')
+        step = max(total // 10, 1)
+        if self._done % step == 0 or self._done == total:
+            logger.info(f'Segments: {self._done}/{total}')
+
+    async def _worker(self, session, queue):
+        while True:
+            index = await queue.get()
+            try:
+                self.job.check()
+                await self.sink.reserve(index)
+                data = await self.fetch_segment(session, index)
+                await self.sink.write(index, data)
+                self._log_progress(index, len(data))
+            finally:
+                queue.task_done()
+
+    async def _new_sink(self, session):
+        if self.mode == 'pipe':
+            return FfmpegPipeSink(self.output_path, self.reorder_window)
+        if self.mode == 'preallocate':
+            sizes = await self.segment_sizes(session)
+            if sizes:
+                return PreallocatedFileSink(
+                    os.path.join(self.output_dir, self.output_name + '.ts'),
+                    self.output_path,
+                    sizes,
+                    remux=self.remux
+                )
+            logger.warning('Segment sizes unknown, falling back to segments mode')
+        return SegmentFileSink(self.tmp_dir, self.output_path)
+
+    async def run(self):
+        return await self.job.guard(self._run())
+
+    async def _run(self):
+        try:
+            return await self._download_segments()
+        finally:
+            await self.close_hedge_session()
+
+    async def close_hedge_session(self):
+        if self._hedge_session is not None:
+            await self._hedge_session.close()
+            self._hedge_session = None
+
+    async def _download_segments(self):
+        async with self._new_session() as session:
+            await self.load_playlist(session)
+            self.sink = await self._new_sink(session)
+            finished = await self.sink.open(self.m3u8_url, len(self.segments))
+            pending = [index for index in range(len(self.segments)) if index not in finished]
+            self._done = len(finished)
+            if finished:
+                logger.info(f'Resuming: {len(finished)}/{len(self.segments)} segments already on disk')
+            if self.adaptive:
+                self.limiter = AimdLimiter(
+                    self.max_num_workers, self.min_workers, self.max_workers, urlsplit(self.m3u8_url).netloc
+                )
+                logger.info(
+                    f'Downloading {len(pending)} segments, {self.limiter.limit} workers to start '
+                    f'(adaptive {self.limiter.floor}-{self.limiter.ceiling})'
+                )
+            else:
+                logger.info(f'Downloading {len(pending)} segments with {self.max_num_workers} workers')
+
+            queue = asyncio.Queue()
+            for index in pending:
+                queue.put_nowait(index)
+
+            workers = [
+                asyncio.create_task(self._worker(session, queue))
+                for _ in range(min(self.worker_count, len(pending)))
+            ]
+            join = asyncio.create_task(queue.join())
+            try:
+                # A worker only finishes early when a segment ran out of retries
+                await asyncio.wait([join, *workers], return_when=asyncio.FIRST_COMPLETED)
+                for task in workers:
+                    if task.done():
+                        task.result()
+            except BaseException:
+                await self.sink.abort()
+                raise
+            finally:
+                join.cancel()
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(join, *workers, return_exceptions=True)
+            if self.limiter:
+                logger.info(
+                    f'Concurrency settled at {self.limiter.limit} (peak {self.limiter.peak}, '
+                    f'{self.limiter.changes} changes)'
+                )
+            if self.hedger and self.hedger.hedges:
+                logger.info(f'Hedged {self.hedger.hedges} slow segments, {self.hedger.won} answered first by the hedge')
+
+        return await self.sink.finish()
+
+    def download(self):
+        return asyncio.run(self.run())
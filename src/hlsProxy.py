@@ -0,0 +1,300 @@
+"""
+Local HLS Prefetch Proxy for IDLIX Downloader
+
+ffplay reads a remote playlist one segment at a time with no read-ahead,
+and every seek starts from scratch. HlsProxy serves the media playlist on
+127.0.0.1 with each segment rewritten to a local URL, fetches the next
+`prefetch` segments ahead of the player through an HlsDownloader (pooled
+session, retries, hedging, bandwidth share and AES decryption included)
+and keeps them in a bounded LRU cache in memory, optionally spilling to
+disk, so seeking back is served locally.
+
+    with HlsProxy(HlsDownloader(m3u8_url, name, job=job)) as proxy:
+        subprocess.call([ffplay, "-i", proxy.url])
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import re
+import asyncio
+import threading
+import contextlib
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+from src.metrics import metrics
+
+
+class SegmentCache:
+    """
+    LRU of decrypted segments, up to max_bytes in memory. With cache_dir the segments pushed out
+    of memory are kept on disk up to disk_bytes.
+    """
+
+    def __init__(self, max_bytes, cache_dir=None, disk_bytes=0):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk = OrderedDict()
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, index):
+        return os.path.join(self.cache_dir, f'{index:06d}.ts')
+
+    def __contains__(self, index):
+        with self._lock:
+            return index in self._memory or index in self._disk
+
+    def get(self, index):
+        with self._lock:
+            if index in self._memory:
+                self._memory.move_to_end(index)
+                return self._memory[index]
+            if index not in self._disk:
+                return None
+            self._disk.move_to_end(index)
+        try:
+            with open(self._path(index), 'rb') as segment_file:
+                return segment_file.read()
+        except OSError:
+            return None
+
+    def put(self, index, data):
+        spilled = []
+        with self._lock:
+            if index in self._memory:
+                return
+            self._memory[index] = data
+            self._memory_size += len(data)
+            while self._memory_size > self.max_bytes and len(self._memory) > 1:
+                old_index, old_data = self._memory.popitem(last=False)
+                self._memory_size -= len(old_data)
+                spilled.append((old_index, old_data))
+        if not self.cache_dir:
+            return
+        for old_index, old_data in spilled:
+            with open(self._path(old_index), 'wb') as segment_file:
+                segment_file.write(old_data)
+            with self._lock:
+                self._disk[old_index] = len(old_data)
+                self._disk_size += len(old_data)
+                while self._disk_size > self.disk_bytes and self._disk:
+                    evicted, size = self._disk.popitem(last=False)
+                    self._disk_size -= size
+                    with contextlib.suppress(OSError):
+                        os.remove(self._path(evicted))
+
+    def clear(self):
+        with self._lock:
+            disk, self._disk = self._disk, OrderedDict()
+            self._memory.clear()
+            self._memory_size = self._disk_size = 0
+        for index in disk:
+            with contextlib.suppress(OSError):
+                os.remove(self._path(index))
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Set on the per-proxy subclass
+    proxy = None
+
+    def _send(self, status, body, content_type='text/plain'):
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # ffplay dropped the connection, e.g. on a seek
+            self.close_connection = True
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/index.m3u8':
+            return self._send(200, self.proxy.playlist.encode(), 'application/vnd.apple.mpegurl')
+        match = re.fullmatch(r'/seg(\d+)\.ts', path)
+        if not match or int(match.group(1)) >= len(self.proxy.downloader.segments):
+            return self._send(404, b'not found')
+        try:
+            body = self.proxy.segment(int(match.group(1)))
+        except Exception as error_segment:
+            logger.warning(f'Proxy segment {match.group(1)} failed: {error_segment}')
+            return self._send(502, str(error_segment).encode())
+        self._send(200, body, 'video/mp2t')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HlsProxy:
+    PREFETCH = 6
+    PREFETCH_WORKERS = 3
+    MAX_BYTES = 256 * 1024 * 1024
+    DISK_BYTES = 1024 * 1024 * 1024
+    START_TIMEOUT = 30
+
+    def __init__(self, downloader, prefetch=PREFETCH, workers=PREFETCH_WORKERS, max_bytes=MAX_BYTES,
+                 cache_dir=None, disk_bytes=DISK_BYTES, host='127.0.0.1', port=0):
+        self.downloader = downloader
+        self.prefetch = prefetch
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.cache = SegmentCache(max_bytes, cache_dir, disk_bytes)
+        self.playlist = None
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._session = None
+        self._semaphore = None
+        # index -> fetch task, prefetched or asked for by the player
+        self._tasks = {}
+        self._running = set()
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}/index.m3u8'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ============================================================
+    # Lifecycle
+    # ============================================================
+    def start(self):
+        """
+        Load the playlist and start serving. Raises what loading the playlist raised.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._open(), self._loop).result(timeout=self.START_TIMEOUT)
+            handler = type('Handler', (ProxyHandler,), {'proxy': self})
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        except BaseException:
+            self.close()
+            raise
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f'HLS proxy on {self.url}, {len(self.downloader.segments)} segments, prefetching {self.prefetch}')
+        return self
+
+    async def _open(self):
+        self._session = self.downloader._new_session()
+        self._semaphore = asyncio.Semaphore(self.workers)
+        await self.downloader.load_playlist(self._session)
+        self.playlist = self._local_playlist()
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._loop is not None:
+            if self._thread.is_alive():
+                with contextlib.suppress(Exception):
+                    asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout=10)
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+        self.cache.clear()
+
+    async def _close(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        await self.downloader.close_hedge_session()
+
+    def _local_playlist(self):
+        # Segments are served decrypted and whole, so no EXT-X-KEY and no byte ranges
+        playlist = self.downloader.media_playlist
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            '#EXT-X-PLAYLIST-TYPE:VOD',
+            f'#EXT-X-TARGETDURATION:{int(playlist.target_duration or 10)}',
+            f'#EXT-X-MEDIA-SEQUENCE:{playlist.media_sequence or 0}',
+        ]
+        for index, segment in enumerate(self.downloader.segments):
+            if segment.discontinuity:
+                lines.append('#EXT-X-DISCONTINUITY')
+            lines.append(f'#EXTINF:{segment.duration:.3f},')
+            lines.append(f'seg{index}.ts')
+        lines.append('#EXT-X-ENDLIST')
+        return "\n".join(lines) + "\n"
+
+    # ============================================================
+    # Segments, on the proxy loop
+    # ============================================================
+    def segment(self, index):
+        """
+        Bytes of segment `index` for a handler thread; moves the prefetch window to it.
+        """
+        return asyncio.run_coroutine_threadsafe(self._segment(index), self._loop).result()
+
+    async def _segment(self, index):
+        self._prefetch(index)
+        data = self.cache.get(index)
+        if data is not None:
+            metrics.inc('proxy_segments_total', source='cache')
+            return data
+        task = self._tasks.get(index)
+        metrics.inc('proxy_segments_total', source='prefetch' if task and index in self._running else 'fetch')
+        return await asyncio.shield(self._start(index, priority=True))
+
+    def _start(self, index, priority=False):
+        task = self._tasks.get(index)
+        if task is not None and priority and index not in self._running:
+            # Still queued behind the prefetch workers, the player needs it now
+            task.cancel()
+            task = None
+        if task is None:
+            task = self._tasks[index] = asyncio.ensure_future(self._fetch(index, priority))
+            task.add_done_callback(lambda done: self._finished(index, done))
+        return task
+
+    def _finished(self, index, task):
+        if self._tasks.get(index) is task:
+            del self._tasks[index]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f'Proxy fetch of segment {index} failed: {task.exception()}')
+
+    async def _fetch(self, index, priority):
+        async with contextlib.nullcontext() if priority else self._semaphore:
+            self._running.add(index)
+            try:
+                data = await self.downloader.fetch_segment(self._session, index)
+            finally:
+                self._running.discard(index)
+        await asyncio.to_thread(self.cache.put, index, data)
+        return data
+
+    def _prefetch(self, index):
+        window = range(index + 1, min(index + 1 + self.prefetch, len(self.downloader.segments)))
+        for other, task in list(self._tasks.items()):
+            if other != index and other not in window:
+                # A seek left it behind
+                task.cancel()
+        for ahead in window:
+            if ahead not in self._tasks and ahead not in self.cache:
+                self._start(ahead)
@@ -0,0 +1,157 @@
+"""
+Fast HTML Extraction for IDLIX Downloader
+
+Targeted regex extraction of the few fields IdlixHelper reads from the idlix
+pages. Every function returns None as soon as something is missing or looks
+unexpected, the caller then falls back to the BeautifulSoup parser.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import re
+import codecs
+from html import unescape
+from urllib.parse import unquote
+
+ATTRIBUTE = re.compile(r'''([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''')
+POST_ID_TAG = re.compile(r'''<meta\b[^>]*\bid\s*=\s*["']?dooplay-ajax-counter["'\s>][^>]*>''', re.I)
+NAME_TAG = re.compile(r'''<meta\b[^>]*\bitemprop\s*=\s*["']?name["'\s>][^>]*>''', re.I)
+IMAGE_TAG = re.compile(r'''<img\b[^>]*\bitemprop\s*=\s*["']?image["'\s>][^>]*>''', re.I)
+FEATURED_BLOCK = re.compile(r'''<div\b[^>]*\bclass\s*=\s*["']items featured["'][^>]*>''', re.I)
+ARTICLE = re.compile(r'<article\b[^>]*>(.*?)</article>', re.I | re.S)
+FIRST_TAG = {
+    name: re.compile(rf'<{name}\b[^>]*>', re.I) for name in ('a', 'img')
+}
+FIRST_TEXT = {
+    name: re.compile(rf'<{name}\b[^>]*>(.*?)</{name}>', re.I | re.S) for name in ('h3', 'span')
+}
+TAG = re.compile(r'<[^>]+>')
+DIV_TOKEN = re.compile(r'<(/?)div\b', re.I)
+
+
+def attributes(tag):
+    return {
+        match.group(1).lower(): unescape(next(v for v in match.groups()[1:] if v is not None))
+        for match in ATTRIBUTE.finditer(tag)
+    }
+
+
+def _text(name, block):
+    match = FIRST_TEXT[name].search(block)
+    if not match or re.search(rf'<{name}\b', match.group(1), re.I):
+        # Missing, or nested tags of the same name that a non-greedy match would cut short
+        return None
+    return unescape(TAG.sub('', match.group(1)))
+
+
+def _block_end(html, start):
+    depth = 1
+    for match in DIV_TOKEN.finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.start()
+    return None
+
+
+def video_data(html):
+    """
+    Same result as IdlixHelper.parse_video_page, or None.
+    """
+    post_id = POST_ID_TAG.search(html)
+    name = NAME_TAG.search(html)
+    image = IMAGE_TAG.search(html)
+    if not post_id or not name or not image:
+        return None
+    video_id = attributes(post_id.group(0)).get('data-postid')
+    video_name = attributes(name.group(0)).get('content')
+    poster = attributes(image.group(0)).get('src')
+    if video_id is None or video_name is None or poster is None:
+        return None
+    return {
+        'video_id': video_id,
+        'video_name': unquote(video_name),
+        'poster': poster
+    }
+
+
+class VideoDataScanner:
+    """
+    Incremental version of video_data for streamed pages. feed() returns True once
+    data-postid, itemprop=name and itemprop=image have all been seen, so the caller
+    can close the response without downloading the comments and related grids.
+    """
+    # A tag split across two chunks is found again on the next scan
+    OVERLAP = 4096
+    PATTERNS = {'post_id': POST_ID_TAG, 'name': NAME_TAG, 'image': IMAGE_TAG}
+
+    def __init__(self, encoding='utf-8'):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._parts = []
+        self._tail = ''
+        self.tags = {}
+        self.bytes_read = 0
+
+    @property
+    def done(self):
+        return len(self.tags) == len(self.PATTERNS)
+
+    @property
+    def text(self):
+        return ''.join(self._parts)
+
+    def feed(self, chunk):
+        self.bytes_read += len(chunk)
+        text = self._decoder.decode(chunk)
+        self._parts.append(text)
+        window = self._tail + text
+        for field, pattern in self.PATTERNS.items():
+            if field not in self.tags:
+                # The patterns only match complete tags, a half-received one is found on the next feed
+                match = pattern.search(window)
+                if match:
+                    self.tags[field] = match.group(0)
+        self._tail = window[-self.OVERLAP:]
+        return self.done
+
+    def result(self):
+        """
+        Same dict as video_data, or None when a field was not seen.
+        """
+        if not self.done:
+            return None
+        return video_data(''.join(self.tags[field] for field in ('post_id', 'name', 'image')))
+
+
+def home(html):
+    """
+    Same result as IdlixHelper.parse_home, or None.
+    """
+    block = FEATURED_BLOCK.search(html)
+    if not block:
+        return None
+    end = _block_end(html, block.end())
+    if end is None:
+        return None
+
+    tmp_featured = []
+    for article in ARTICLE.findall(html, block.end(), end):
+        anchor = FIRST_TAG['a'].search(article)
+        image = FIRST_TAG['img'].search(article)
+        title = _text('h3', article)
+        year = _text('span', article)
+        if not anchor or not image or title is None or year is None:
+            return None
+        href = attributes(anchor.group(0)).get('href')
+        if not href or len(href.split('/')) < 4:
+            return None
+        if href.split('/')[3] == 'tvseries':
+            continue
+        tmp_featured.append({
+            "url": href,
+            "title": title,
+            "year": year,
+            "type": href.split('/')[3],
+            "poster": attributes(image.group(0)).get('src'),
+        })
+    return tmp_featured
@@ -6,21 +6,21 @@ Author  :   sandroputraa
 """
 
 import os
-import random
 import re
 import json
-import m3u8
+import time
 import shutil
-import zipfile
-import requests
 import subprocess
-import m3u8_To_MP4
 from loguru import logger
-from bs4 import BeautifulSoup
 from urllib.parse import unquote, urlparse
-from vtt_to_srt.vtt_to_srt import ConvertFile
-from curl_cffi import requests as cffi_requests
-from src.CryptoJsAesHelper import CryptoJsAes, dec
+from src.hlsDownloader import HlsDownloader
+from src.resolveCache import ResolveCache
+from src.sessionPool import SessionPool
+from src.metrics import metrics, current_stage
+from src.jobControl import Job, JobCancelled, DeadlineExceeded
+from src.toolLocator import tools, BUNDLED_DIR
+from src.retryPolicy import retryable_error, HttpStatusError
+from src import htmlExtract
 
 
 class IdlixHelper:
@@ -42,66 +42,209 @@ class IdlixHelper:
         "Accept-Language": "en-US,en;q=0.9,id;q=0.8"
     }
 
-    def __init__(self):
+    def __init__(self, cache=True, pool=None, job=None):
         self.poster = None
+        self.page_url = None
         self.m3u8_url = None
         self.video_id = None
         self.embed_url = None
         self.video_name = None
         self.is_subtitle = None
         self.variant_playlist = None
-        self.request = cffi_requests.Session(
-            impersonate=random.choice(["chrome124", "chrome119", "chrome104"]),
-            headers=self.BASE_STATIC_HEADERS,
-            debug=False,
-        )
+        self._video_payloads = {}
+        # Every outbound request goes through the pool: one warm session per host, shared cookies.
+        # Pass the same pool to several helpers (batch jobs, GUI) to share the connections too.
+        self.pool = pool or SessionPool()
+        self.pool.register(self.BASE_WEB_URL, self.BASE_STATIC_HEADERS)
+        self.request = self.pool.session(self.BASE_WEB_URL)
+        # Pass cache=False to always resolve live, or a ResolveCache instance to share one
+        self.cache = ResolveCache() if cache is True else (cache or None)
+        # Cancellation token and resolve deadline of the title this helper works on
+        self.job = job or Job()
 
         # Proxy Example
-        # self.request.proxies = {
+        # self.pool = SessionPool(proxies={
         #    'https': ''
-        # }
-
-        # FFMPEG
-        if os.name == 'nt':
-            for _ in os.environ.get('path').split(';'):
-                if 'ffmpeg' in _:
-                    logger.info(f'FFMPEG Found: {_}')
-                    break
-            else:
-                if not os.path.exists('ffmpeg-release-essentials.zip'):
-                    self.download_ffmpeg()
-                logger.warning('FFMPEG not set in PATH, Trying set PATH')
-                try:
-                    with zipfile.ZipFile('ffmpeg-release-essentials.zip', 'r') as zip_ref:
-                        zip_ref.extractall(
-                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ffmpeg')
-                        )
-                    logger.success('Success Extracting ffmpeg')
-                    path = ""
-                    for _ in os.listdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ffmpeg')):
-                        if 'ffmpeg' in _:
-                            logger.info(f'Found: {os.path.join(os.path.dirname(os.path.abspath(__file__)), "ffmpeg", _, "bin")}')
-                            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ffmpeg", _, "bin")
-                            break
-                    else:
-                        logger.error('FFMPEG not found, please install ffmpeg first before running this script')
-                    subprocess.call(["setx", "PATH", "%PATH%;" + path])
-                    logger.success('FFMPEG PATH set successfully, Please restart the program')
-                    exit()
-                except Exception as e:
-                    print(f'Error: {e}')
-        else:
-            if not shutil.which('ffmpeg'):
+        # })
+
+        # FFMPEG, located once and remembered in idlix_tools.json
+        if not tools.find('ffmpeg'):
+            if os.name == 'nt':
+                self.install_ffmpeg(self.pool)
+            if not tools.find('ffmpeg'):
                 logger.error('FFMPEG not found, please install ffmpeg first before running this script')
                 exit()
 
+    # ============================================================
+    # Stateless core, shared with AsyncIdlixHelper
+    # ============================================================
+    JENIUSPLAY_URL = 'https://jeniusplay.com/player/index.php'
+    # ffplay reads through a local prefetching HlsProxy; False hands it the remote playlist
+    PLAY_PROXY = True
+
+    @classmethod
+    def parse_home(cls, html):
+        tmp_featured = htmlExtract.home(html)
+        if tmp_featured is not None:
+            return tmp_featured
+        return cls.parse_home_soup(html)
+
+    @staticmethod
+    def parse_home_soup(html, features='html.parser'):
+        # bs4, m3u8, Crypto and vtt_to_srt are imported where they are used, a home listing needs none of them
+        from bs4 import BeautifulSoup
+        bs = BeautifulSoup(html, features)
+        tmp_featured = []
+        for featured in bs.find('div', {'class': 'items featured'}).find_all('article'):
+            href = featured.find('a').get('href')
+
+            if href.split('/')[3] == 'tvseries':
+                continue
+
+            tmp_featured.append({
+                "url": href,
+                "title": featured.find('h3').text,
+                "year": featured.find('span').text,
+                "type": href.split('/')[3],
+                "poster": featured.find('img').get('src'),
+            })
+        return tmp_featured
+
+    @classmethod
+    def parse_video_page(cls, html):
+        video_data = htmlExtract.video_data(html)
+        if video_data:
+            return video_data
+        return cls.parse_video_page_soup(html)
+
+    @staticmethod
+    def parse_video_page_soup(html, features='html.parser'):
+        from bs4 import BeautifulSoup
+        bs = BeautifulSoup(html, features)
+        return {
+            'video_id': bs.find('meta', {'id': 'dooplay-ajax-counter'}).get('data-postid'),
+            'video_name': unquote(bs.find('meta', {'itemprop': 'name'}).get('content')),
+            'poster': bs.find('img', {'itemprop': 'image'}).get('src')
+        }
+
+    @staticmethod
+    def embed_request_data(video_id):
+        return {
+            "action": "doo_player_ajax",
+            "post": video_id,
+            "nume": "1",
+            "type": "movie",
+        }
+
+    @staticmethod
+    def decrypt_embed_url(payload):
+        from src.CryptoJsAesHelper import CryptoJsAes, dec
+        return CryptoJsAes.decrypt(
+            payload.get('embed_url'),
+            dec(
+                payload.get('key'),
+                json.loads(payload.get('embed_url')).get('m')
+            )
+        )
+
     @staticmethod
-    def download_ffmpeg():
+    def embed_hash(embed_url):
+        if '/video/' in urlparse(embed_url).path:
+            return urlparse(embed_url).path.split('/')[2]
+        if '=' in urlparse(embed_url).query:
+            return urlparse(embed_url).query.split('=')[1]
+        # Already reduced to the hash
+        return embed_url
+
+    @classmethod
+    def get_video_request(cls, embed_hash):
+        return {
+            'params': {
+                "data": embed_hash,
+                "do": "getVideo"
+            },
+            'headers': {
+                "Host": "jeniusplay.com",
+                "X-Requested-With": "XMLHttpRequest",
+                "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+            },
+            'data': {
+                "hash": embed_hash,
+                "r": cls.BASE_WEB_URL,
+            },
+        }
+
+    @staticmethod
+    def parse_video_payload(text):
+        try:
+            payload_json = json.loads(text)
+        except ValueError:
+            payload_json = {}
+        return {
+            'text': text,
+            'json': payload_json if isinstance(payload_json, dict) else {}
+        }
+
+    @staticmethod
+    def video_source_m3u8(payload_json):
+        if not payload_json.get('videoSource'):
+            return None
+        return payload_json.get('videoSource').rsplit(".", 1)[0] + ".m3u8"
+
+    @staticmethod
+    def parse_variant_playlist(text, uri):
+        import m3u8
+        variant_playlist = m3u8.loads(text, uri=uri)
+        tmp_variant_playlist = []
+        id = 0
+        for playlist in variant_playlist.playlists:
+            tmp_variant_playlist.append({
+                'bandwidth': playlist.stream_info.bandwidth,
+                'resolution': str(playlist.stream_info.resolution[0]) + 'x' + str(playlist.stream_info.resolution[1]),
+                'uri': playlist.uri,
+                'id': str(id)
+            })
+            id += 1
+        return variant_playlist, tmp_variant_playlist
+
+    VARIANT_POLICIES = ('best', 'lowest', '1080p', '720p', '480p', '360p')
+
+    @staticmethod
+    def pick_variant(variant_playlist, policy='best'):
+        """
+        Choose a variant without asking: 'best' / 'lowest' bandwidth, or '<height>p' for the
+        tallest variant not above that height (the lowest one when all are taller).
+        """
+        if not variant_playlist:
+            return None
+        by_bandwidth = sorted(variant_playlist, key=lambda v: v['bandwidth'] or 0)
+        if policy == 'lowest':
+            return by_bandwidth[0]
+        if policy and policy.endswith('p') and policy[:-1].isdigit():
+            limit = int(policy[:-1])
+            by_height = sorted(variant_playlist, key=lambda v: (int(v['resolution'].split('x')[1]), v['bandwidth'] or 0))
+            fitting = [v for v in by_height if int(v['resolution'].split('x')[1]) <= limit]
+            return fitting[-1] if fitting else by_height[0]
+        return by_bandwidth[-1]
+
+    @staticmethod
+    def subtitle_url(text):
+        regex_subtitle = re.search(r"var playerjsSubtitle = \"(.*)\";", text)
+        if not regex_subtitle:
+            # Inside the JSON payload the script is string-escaped
+            regex_subtitle = re.search(r'var playerjsSubtitle = \\"(.*?)\\";', text)
+        if not regex_subtitle or "https://" not in regex_subtitle.group(1):
+            return None
+        return "https://" + regex_subtitle.group(1).split("https://")[1]
+
+    @staticmethod
+    def download_ffmpeg(pool=None):
         try:
             logger.info('Downloading ffmpeg')
-            content = requests.get(
-                url='https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-essentials.zip',
-                stream=True
+            content = (pool or SessionPool()).get(
+                'https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-essentials.zip',
+                stream=True,
+                timeout=None
             )
             with open("ffmpeg-release-essentials.zip", mode="wb") as file:
                 for chunk in content.iter_content(chunk_size=1024):
@@ -113,47 +256,55 @@ class IdlixHelper:
                         end=''
                     )
                     file.write(chunk)
+            content.close()
             print()
             logger.success('Downloaded ffmpeg')
         except Exception as e:
             print(f'Error: {e}')
 
+    @classmethod
+    def install_ffmpeg(cls, pool=None):
+        """
+        Windows fallback: download the ffmpeg release zip once and unpack it next to this module,
+        ToolLocator finds ffmpeg / ffplay there and remembers the paths.
+        """
+        import zipfile
+        logger.warning('FFMPEG not found in PATH, using the bundled release')
+        try:
+            if not os.path.exists('ffmpeg-release-essentials.zip'):
+                cls.download_ffmpeg(pool)
+            with zipfile.ZipFile('ffmpeg-release-essentials.zip', 'r') as zip_ref:
+                zip_ref.extractall(BUNDLED_DIR)
+            logger.success('Success Extracting ffmpeg')
+        except Exception as e:
+            print(f'Error: {e}')
+
+    @metrics.stage('get_home')
     def get_home(self):
         try:
-            request = self.request.get(
+            request = self.pool.get(
                 url=self.BASE_WEB_URL,
                 timeout=10
             )
             if request.status_code == 200:
-                bs = BeautifulSoup(request.text, 'html.parser')
-                tmp_featured = []
-                for featured in bs.find('div', {'class': 'items featured'}).find_all('article'):
-
-                    if featured.find('a').get('href').split('/')[3] == 'tvseries':
-                        continue
-
-                    tmp_featured.append({
-                        "url": featured.find('a').get('href'),
-                        "title": featured.find('h3').text,
-                        "year": featured.find('span').text,
-                        "type": featured.find('a').get('href').split('/')[3],
-                        "poster": featured.find('img').get('src'),
-                    })
                 return {
                     'status': True,
-                    'featured_movie': tmp_featured
+                    'featured_movie': self.parse_home(request.text)
                 }
             else:
                 return {
                     'status': False,
-                    'message': 'Failed to get home page'
+                    'message': 'Failed to get home page',
+                    'status_code': request.status_code
                 }
         except Exception as error_get_home:
             return {
                 'status': False,
-                'message': str(error_get_home)
+                'message': str(error_get_home),
+                'retryable': retryable_error(error_get_home)
             }
 
+    @metrics.stage('get_video_data')
     def get_video_data(self, url):
         if not url:
             return {
@@ -161,14 +312,43 @@ class IdlixHelper:
                 'message': 'URL is required'
             }
         if url.startswith(self.BASE_WEB_URL):
-            request = self.request.get(
-                url=url,
-            )
+            self.page_url = url
+            cached = self.cache and self.cache.get(url, 'video_id', 'video_name', 'poster')
+            if cached:
+                self.video_id = cached['video_id']
+                self.video_name = cached['video_name']
+                self.poster = cached['poster']
+                return {
+                    'status': True,
+                    'video_id': self.video_id,
+                    'video_name': self.video_name,
+                    'poster': self.poster,
+                    'cached': True
+                }
+
+            # Everything needed sits before the player block, stop reading there
+            scanner = htmlExtract.VideoDataScanner()
+            try:
+                request, complete = self.pool.get_until(url, scanner.feed, timeout=self._timeout())
+                video_data = scanner.result()
+                page_text = scanner.text
+                if request.status_code == 200 and video_data is None and not complete:
+                    # Tags seen but not usable by the fast path, the full parse needs the whole page
+                    request = self.pool.get(url, timeout=self._timeout())
+                    page_text = request.text
+            except Exception as error_get_video_data:
+                return {
+                    'status': False,
+                    'message': str(error_get_video_data),
+                    'retryable': retryable_error(error_get_video_data)
+                }
             if request.status_code == 200:
-                bs = BeautifulSoup(request.text, 'html.parser')
-                self.video_id = bs.find('meta', {'id': 'dooplay-ajax-counter'}).get('data-postid')
-                self.video_name = unquote(bs.find('meta', {'itemprop': 'name'}).get('content'))
-                self.poster = bs.find('img', {'itemprop': 'image'}).get('src')
+                video_data = video_data or self.parse_video_page(page_text)
+                self.video_id = video_data['video_id']
+                self.video_name = video_data['video_name']
+                self.poster = video_data['poster']
+                if self.cache:
+                    self.cache.set(url, video_id=self.video_id, video_name=self.video_name, poster=self.poster)
                 return {
                     'status': True,
                     'video_id': self.video_id,
@@ -178,7 +358,8 @@ class IdlixHelper:
             else:
                 return {
                     'status': False,
-                    'message': 'Failed to get video data'
+                    'message': 'Failed to get video data',
+                    'status_code': request.status_code
                 }
         else:
             return {
@@ -186,30 +367,31 @@ class IdlixHelper:
                 'message': 'Invalid URL'
             }
 
+    @metrics.stage('get_embed_url')
     def get_embed_url(self):
         if not self.video_id:
             return {
                 'status': False,
                 'message': 'Video ID is required'
             }
+        cached = self.cache and self.page_url and self.cache.get(self.page_url, 'embed_url')
+        if cached:
+            self.embed_url = cached['embed_url']
+            return {
+                'status': True,
+                'embed_url': self.embed_url,
+                'cached': True
+            }
         try:
-            request = self.request.post(
+            request = self.pool.post(
                 url=self.BASE_WEB_URL + "wp-admin/admin-ajax.php",
-                data={
-                    "action": "doo_player_ajax",
-                    "post": self.video_id,
-                    "nume": "1",
-                    "type": "movie",
-                }
+                data=self.embed_request_data(self.video_id),
+                timeout=self._timeout()
             )
             if request.status_code == 200 and request.json().get('embed_url'):
-                self.embed_url = CryptoJsAes.decrypt(
-                    request.json().get('embed_url'),
-                    dec(
-                        request.json().get('key'),
-                        json.loads(request.json().get('embed_url')).get('m')
-                    )
-                )
+                self.embed_url = self.decrypt_embed_url(request.json())
+                if self.cache and self.page_url:
+                    self.cache.set(self.page_url, embed_url=self.embed_url)
                 return {
                     'status': True,
                     'embed_url': self.embed_url
@@ -217,14 +399,17 @@ class IdlixHelper:
             else:
                 return {
                     'status': False,
-                    'message': 'Failed to get embed URL'
+                    'message': 'Failed to get embed URL',
+                    'status_code': request.status_code
                 }
         except Exception as error_get_embed_url:
             return {
                 'status': False,
-                'message': str(error_get_embed_url)
+                'message': str(error_get_embed_url),
+                'retryable': retryable_error(error_get_embed_url)
             }
 
+    @metrics.stage('get_m3u8_url')
     def get_m3u8_url(self):
         if not self.embed_url:
             return {
@@ -232,50 +417,25 @@ class IdlixHelper:
                 'message': 'Embed URL is required'
             }
 
-        if '/video/' in urlparse(self.embed_url).path:
-            self.embed_url = urlparse(self.embed_url).path.split('/')[2]
-        elif urlparse(self.embed_url).query.split('=')[1]:
-            self.embed_url = urlparse(self.embed_url).query.split('=')[1]
+        self.embed_url = self.embed_hash(self.embed_url)
 
         try:
-            request = cffi_requests.post(
-                url='https://jeniusplay.com/player/index.php',
-                params={
-                    "data": self.embed_url,
-                    "do": "getVideo"
-                },
-                headers={
-                    "Host": "jeniusplay.com",
-                    "X-Requested-With": "XMLHttpRequest",
-                    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                },
-                data={
-                    "hash": self.embed_url,
-                    "r": self.BASE_WEB_URL,
-                },
-                impersonate="chrome",
-            )
+            cached = self._cached_m3u8()
+            if cached:
+                return cached
 
-            if request.status_code == 200 and request.json().get('videoSource'):
-                self.m3u8_url = request.json().get('videoSource').rsplit(".", 1)[0] + ".m3u8"
-                self.variant_playlist = m3u8.load(self.m3u8_url)
-                tmp_variant_playlist = []
-                id = 0
-                for playlist in self.variant_playlist.playlists:
-                    tmp_variant_playlist.append({
-                        'bandwidth': playlist.stream_info.bandwidth,
-                        'resolution': str(playlist.stream_info.resolution[0]) + 'x' + str(playlist.stream_info.resolution[1]),
-                        'uri': playlist.uri,
-                        'id': str(id)
-                    })
-                    id += 1
-                is_variant_playlist = True if len(tmp_variant_playlist) > 1 else False
-                return {
-                    'status': True,
-                    'm3u8_url': self.m3u8_url,
-                    'variant_playlist': tmp_variant_playlist,
-                    'is_variant_playlist': is_variant_playlist
-                }
+            payload = self._get_video_payload()
+
+            if payload and self.video_source_m3u8(payload['json']):
+                self.m3u8_url = self.video_source_m3u8(payload['json'])
+                tmp_variant_playlist = self._load_variant_playlist()
+                if self.cache and self.page_url:
+                    self.cache.set(
+                        self.page_url,
+                        m3u8_url=self.m3u8_url,
+                        variant_playlist=tmp_variant_playlist
+                    )
+                return self._m3u8_result(tmp_variant_playlist)
             else:
                 return {
                     'status': False,
@@ -284,31 +444,99 @@ class IdlixHelper:
         except Exception as error_get_m3u8_url:
             return {
                 'status': False,
-                'message': str(error_get_m3u8_url)
+                'message': str(error_get_m3u8_url),
+                'retryable': retryable_error(error_get_m3u8_url)
             }
 
-    def download_m3u8(self):
+    def _timeout(self):
+        """
+        Request timeout inside the running stage, from the deadline budget of the job.
+        """
+        return self.job.timeout(current_stage.get())
+
+    def _get_video_payload(self):
+        """
+        POST jeniusplay getVideo once per embed hash and keep the answer, get_m3u8_url and
+        get_subtitle both read from the same payload.
+        """
+        if self.embed_url in self._video_payloads:
+            return self._video_payloads[self.embed_url]
+
+        request = self.pool.post(self.JENIUSPLAY_URL, timeout=self._timeout(), **self.get_video_request(self.embed_url))
+        if request.status_code != 200:
+            return None
+        payload = self.parse_video_payload(request.text)
+        # A 200 without videoSource (a transient error page) is not kept, so a retry asks again
+        if self.video_source_m3u8(payload['json']):
+            self._video_payloads[self.embed_url] = payload
+        return payload
+
+    def _load_variant_playlist(self):
+        request = self.pool.get(self.m3u8_url, timeout=self._timeout())
+        if request.status_code != 200:
+            raise HttpStatusError(request.status_code, self.m3u8_url)
+        self.variant_playlist, tmp_variant_playlist = self.parse_variant_playlist(request.text, self.m3u8_url)
+        return tmp_variant_playlist
+
+    def _m3u8_result(self, tmp_variant_playlist, cached=False):
+        is_variant_playlist = True if len(tmp_variant_playlist) > 1 else False
+        result = {
+            'status': True,
+            'm3u8_url': self.m3u8_url,
+            'variant_playlist': tmp_variant_playlist,
+            'is_variant_playlist': is_variant_playlist
+        }
+        if cached:
+            result['cached'] = True
+        return result
+
+    def _cached_m3u8(self):
+        cached = self.cache and self.page_url and self.cache.get(self.page_url, 'm3u8_url', 'variant_playlist')
+        if not cached:
+            return None
+        self.m3u8_url = cached['m3u8_url']
+        try:
+            # Loading the master playlist doubles as validation, an expired token answers 403
+            tmp_variant_playlist = self._load_variant_playlist()
+        except (JobCancelled, DeadlineExceeded):
+            raise
+        except Exception as error_cached_m3u8:
+            logger.warning(f'Cached playlist rejected ({error_cached_m3u8}), resolving live')
+            self.cache.invalidate(self.page_url, 'm3u8_url', 'variant_playlist')
+            self.m3u8_url = None
+            return None
+        return self._m3u8_result(tmp_variant_playlist, cached=True)
+
+    @metrics.stage('download_m3u8')
+    def download_m3u8(self, max_num_workers=HlsDownloader.MAX_NUM_WORKERS, mode='segments', remux=True, adaptive=True):
         try:
             if not self.m3u8_url:
                 return {
                     'status': False,
                     'message': 'M3U8 URL is required'
                 }
-            if not os.path.exists(os.getcwd() + '/tmp/'):
-                os.mkdir(os.getcwd() + '/tmp/')
-
-            m3u8_To_MP4.multithread_download(
-                m3u8_uri=self.m3u8_url,
-                max_num_workers=10,
-                mp4_file_name=self.video_name,
-                mp4_file_dir=os.getcwd() + '/',
-                tmpdir=os.getcwd() + '/tmp/'
+
+            # One tmp dir per title so a re-run picks up the journal of the interrupted one
+            tmp_dir = os.path.join(os.getcwd(), 'tmp', self.video_name.replace(" ", "_"))
+            downloader = HlsDownloader(
+                m3u8_url=self.m3u8_url,
+                output_name=self.video_name,
+                output_dir=os.getcwd(),
+                tmp_dir=tmp_dir,
+                max_num_workers=max_num_workers,
+                impersonate=self.pool.impersonate,
+                cookies=self.pool.cookies,
+                mode=mode,
+                remux=remux,
+                job=self.job,
+                adaptive=adaptive,
             )
-            shutil.rmtree(os.getcwd() + '/tmp/', ignore_errors=True)
+            path = downloader.download()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
             return {
                 'status': True,
                 'message': 'Download success',
-                'path': os.getcwd() + '/' + self.video_name + '.mp4'
+                'path': path
             }
         except Exception as error_download_m3u8:
             return {
@@ -316,6 +544,7 @@ class IdlixHelper:
                 'message': str(error_download_m3u8)
             }
 
+    @metrics.stage('get_subtitle')
     def get_subtitle(self, download=True):
         try:
             if not self.embed_url:
@@ -324,29 +553,12 @@ class IdlixHelper:
                     'message': 'Embed URL is required'
                 }
 
-            request = cffi_requests.post(
-                url='https://jeniusplay.com/player/index.php',
-                params={
-                    "data": self.embed_url,
-                    "do": "getVideo"
-                },
-                headers={
-                    "Host": "jeniusplay.com",
-                    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                },
-                data={
-                    "hash": self.embed_url,
-                    "r": self.BASE_WEB_URL
-                },
-                impersonate="chrome",
-
-            )
-            regex_subtitle = re.search(r"var playerjsSubtitle = \"(.*)\";", request.text)
-            if regex_subtitle:
+            payload = self._get_video_payload()
+            subtitle_url = self.subtitle_url(payload['text']) if payload else None
+            if subtitle_url:
                 if download:
-                    subtitle_request = requests.get(
-                        url="https://" + regex_subtitle.group(1).split("https://")[1],
-                    )
+                    subtitle_request = self.pool.get(subtitle_url, timeout=self._timeout())
+                    time.sleep(self.job.bandwidth.pace(len(subtitle_request.content)))
                     with open(self.video_name.replace(" ", "_") + '.vtt', 'wb') as subtitle_file:
                         subtitle_file.write(subtitle_request.content)
                     self.convert_vtt_to_srt(self.video_name.replace(" ", "_") + '.vtt')
@@ -359,7 +571,7 @@ class IdlixHelper:
                 self.is_subtitle = True
                 return {
                     'status': True,
-                    'subtitle': "https://" + regex_subtitle.group(1).split("https://")[1]
+                    'subtitle': subtitle_url
                 }
             else:
                 self.is_subtitle = False
@@ -373,7 +585,31 @@ class IdlixHelper:
                 'message': str(error_get_subtitle)
             }
 
+    def play_source(self):
+        """
+        (URL for ffplay, HlsProxy or None). The proxy is started here and closed by the caller;
+        when it cannot start, ffplay gets the remote playlist as before.
+        """
+        if not self.PLAY_PROXY:
+            return self.m3u8_url, None
+        # http.server is only needed for playback
+        from src.hlsProxy import HlsProxy
+        downloader = HlsDownloader(
+            m3u8_url=self.m3u8_url,
+            output_name=self.video_name,
+            impersonate=self.pool.impersonate,
+            cookies=self.pool.cookies,
+            job=self.job,
+        )
+        try:
+            proxy = HlsProxy(downloader).start()
+        except Exception as error_proxy:
+            logger.warning(f'HLS proxy unavailable ({error_proxy}), playing the remote playlist')
+            return self.m3u8_url, None
+        return proxy.url, proxy
+
     def play_m3u8(self):
+        proxy = None
         try:
             if not self.m3u8_url:
                 return {
@@ -381,30 +617,13 @@ class IdlixHelper:
                     'message': 'M3U8 URL is required'
                 }
 
+            source, proxy = self.play_source()
+            command = [tools.command("ffplay"), "-i", source, "-window_title", self.video_name]
             if self.is_subtitle:
-                subprocess.call([
-                    "ffplay",
-                    "-i",
-                    self.m3u8_url,
-                    "-window_title",
-                    self.video_name,
-                    "-vf",
-                    "subtitles=" + self.video_name.replace(" ", "_") + ".srt",
-                    "-hide_banner",
-                    "-loglevel",
-                    "panic"
-                ])
-
-            subprocess.call([
-                "ffplay",
-                "-i",
-                self.m3u8_url,
-                "-window_title",
-                self.video_name,
-                "-hide_banner",
-                "-loglevel",
-                "panic"
-            ])
+                command += ["-vf", "subtitles=" + self.video_name.replace(" ", "_") + ".srt"]
+            # Without the proxy ffplay fetches the segments itself, the hold keeps its bandwidth share free of downloads
+            self.job.bandwidth.hold()
+            subprocess.call(command + ["-hide_banner", "-loglevel", "panic"])
 
             if self.is_subtitle and os.path.exists(self.video_name.replace(" ", "_") + '.srt'):
                 os.remove(self.video_name.replace(" ", "_") + '.srt')
@@ -419,9 +638,14 @@ class IdlixHelper:
                 'status': False,
                 'message': str(error_play_m3u8)
             }
+        finally:
+            self.job.bandwidth.release()
+            if proxy:
+                proxy.close()
 
     @staticmethod
     def convert_vtt_to_srt(vtt_file):
+        from vtt_to_srt.vtt_to_srt import ConvertFile
         convert_file = ConvertFile(vtt_file, "utf-8")
         convert_file.convert()
 
@@ -0,0 +1,185 @@
+"""
+Job Control for IDLIX Downloader
+
+One Job per title: a cancellation token checked by the resolver stages and
+the segment workers, plus a deadline budget for resolving that is split
+across the stages, so one hung connection can no longer stall a title.
+The kind of a job ("play" or "download") picks its weight in the global
+bandwidth limit.
+Cancelling also cancels the asyncio work of the job (segment workers, async
+resolve), which closes its sessions and frees the connections at once.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import time
+import asyncio
+import threading
+import contextlib
+from src.bandwidthLimiter import bandwidth
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Job:
+    # Seconds for resolving one title, page -> embed -> m3u8 (-> subtitle)
+    BUDGET = 120
+    # Relative share of the budget per stage
+    SHARES = {
+        'get_video_data': 3,
+        'get_embed_url': 2,
+        'get_m3u8_url': 3,
+        'get_subtitle': 2,
+    }
+    # Upper bound for a single request, whatever the budget has left
+    REQUEST_TIMEOUT = 30
+
+    def __init__(self, budget=BUDGET, shares=None, request_timeout=REQUEST_TIMEOUT, parent=None,
+                 kind='download', weight=None):
+        """
+        budget=None disables the deadline, the job then only carries the token and request timeouts.
+        A child of `parent` (e.g. one title of a batch) is cancelled together with it.
+        weight overrides the bandwidth weight of `kind`.
+        """
+        self.budget = budget
+        self.kind = kind
+        # Segment, subtitle and poster bytes of this job are paced through it
+        self.bandwidth = bandwidth.share(kind, weight)
+        self.shares = dict(shares or self.SHARES)
+        self.request_timeout = request_timeout
+        self.reason = None
+        # The clock starts with the first stage, not while the user is still picking a title
+        self.started = None
+        self._ends = {}
+        self._callbacks = []
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent.on_cancel(lambda: self.cancel(parent.reason))
+
+    # ============================================================
+    # Cancellation
+    # ============================================================
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason='Cancelled'):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """
+        Run callback() once when the job is cancelled, right away if it already is. Returns a remover.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._forget(callback)
+        callback()
+        return lambda: None
+
+    def _forget(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self):
+        if self._event.is_set():
+            raise JobCancelled(self.reason)
+
+    async def guard(self, coro):
+        """
+        Await coro in its own task that cancel() (from any thread) cancels; raises JobCancelled then.
+        """
+        task = asyncio.ensure_future(coro)
+        loop = task.get_loop()
+
+        def cancel_task():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                # Loop already closed, the task finished long ago
+                pass
+
+        forget = self.on_cancel(cancel_task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self.cancelled:
+                raise JobCancelled(self.reason) from None
+            raise
+        finally:
+            forget()
+
+    # ============================================================
+    # Deadlines
+    # ============================================================
+    def stage_deadline(self, stage):
+        """
+        Monotonic end of `stage`, fixed when the stage first asks. What is left of the budget is
+        split over this stage and the ones not started yet by their shares, so time saved by a fast
+        stage goes to the later ones. None without a budget.
+        """
+        if self.budget is None:
+            return None
+        with self._lock:
+            if stage not in self._ends:
+                now = time.monotonic()
+                if self.started is None:
+                    self.started = now
+                left = max(self.started + self.budget - now, 0)
+                share = self.shares.get(stage, 1)
+                waiting = sum(weight for name, weight in self.shares.items() if name not in self._ends and name != stage)
+                self._ends[stage] = now + left * share / (share + waiting)
+            return self._ends[stage]
+
+    @contextlib.contextmanager
+    def paused(self):
+        """
+        Stop the budget clock while the job waits on the user (variant prompt); every stage end
+        fixed so far moves by the time spent inside.
+        """
+        paused_at = time.monotonic()
+        try:
+            yield self
+        finally:
+            pause = time.monotonic() - paused_at
+            with self._lock:
+                if self.started is not None:
+                    self.started += pause
+                for stage in self._ends:
+                    self._ends[stage] += pause
+
+    def remaining(self, stage):
+        """
+        Seconds left for `stage`, None without a budget. Raises JobCancelled / DeadlineExceeded instead of returning <= 0.
+        """
+        self.check()
+        end = self.stage_deadline(stage)
+        if end is None:
+            return None
+        left = end - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded(f'{stage} ran out of its time budget')
+        return left
+
+    def timeout(self, stage):
+        """
+        Timeout for the next request of `stage`: the time left of the stage, capped at request_timeout.
+        """
+        left = self.remaining(stage)
+        return self.request_timeout if left is None else min(left, self.request_timeout)
@@ -0,0 +1,164 @@
+"""
+Non-blocking Log Pipeline for IDLIX Downloader
+
+Loguru sinks only push onto bounded ring buffers, so a log call on the
+download path never waits for stderr, a file or the Tk text widget. When a
+buffer is full the oldest lines are dropped and counted. A writer thread
+flushes console and JSON-lines output in batches; the GUI drains its own
+ring from a timer.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import sys
+import json
+import atexit
+import threading
+from collections import deque
+from loguru import logger
+
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+GUI_FORMAT = "{time:HH:mm:ss} | {level} | {message}"
+
+
+class LogRing:
+    CAPACITY = 5000
+
+    def __init__(self, capacity=CAPACITY):
+        self.items = deque(maxlen=capacity)
+        self.dropped = 0
+        self._ready = threading.Condition()
+
+    def put(self, item):
+        with self._ready:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self._ready.notify()
+
+    def drain(self, limit=None):
+        with self._ready:
+            count = len(self.items) if limit is None else min(limit, len(self.items))
+            return [self.items.popleft() for _ in range(count)]
+
+    def wait(self, timeout=None):
+        with self._ready:
+            if not self.items:
+                self._ready.wait(timeout)
+            return bool(self.items)
+
+    def wake(self):
+        with self._ready:
+            self._ready.notify_all()
+
+
+def json_record(message):
+    """
+    Loguru message -> the plain dict written as one JSON line, built on the logging thread
+    so the writer never touches the live record.
+    """
+    record = message.record
+    return {
+        'time': record['time'].isoformat(),
+        'level': record['level'].name,
+        'module': record['name'],
+        'function': record['function'],
+        'line': record['line'],
+        'thread': record['thread'].name,
+        'message': record['message'],
+        'extra': {key: str(value) for key, value in record['extra'].items()},
+    }
+
+
+class BatchWriter:
+    """
+    Background thread that drains a LogRing into a text stream, one write + flush per batch.
+    `encode` turns a queued item into a line (default: already formatted text).
+    """
+    FLUSH_INTERVAL = 0.2
+
+    def __init__(self, stream, capacity=LogRing.CAPACITY, encode=None, close_stream=False):
+        self.stream = stream
+        self.ring = LogRing(capacity)
+        self.encode = encode or str
+        self.close_stream = close_stream
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, message):
+        self.ring.put(message)
+
+    def put(self, message):
+        self.ring.put(json_record(message))
+
+    def _flush(self):
+        batch = self.ring.drain()
+        if self.ring.dropped:
+            dropped, self.ring.dropped = self.ring.dropped, 0
+            batch.insert(0, f'... {dropped} log lines dropped\n' if self.encode is str else {'dropped': dropped})
+        if batch:
+            self.stream.write("".join(self.encode(item) for item in batch))
+            self.stream.flush()
+
+    def _run(self):
+        while not self._stopped:
+            self.ring.wait(self.FLUSH_INTERVAL)
+            self._flush()
+
+    def stop(self):
+        self._stopped = True
+        self.ring.wake()
+        self._thread.join()
+        self._flush()
+        if self.close_stream:
+            self.stream.close()
+
+
+_writers = []
+
+
+def _stop_writers():
+    while _writers:
+        _writers.pop().stop()
+
+
+atexit.register(_stop_writers)
+
+
+def configure(level="INFO", console=True, json_path=None, gui_ring=None, capacity=LogRing.CAPACITY):
+    """
+    Replace the loguru sinks: console on stderr, optional JSON lines file, optional GUI ring.
+    Queued lines are flushed by the next configure(), shutdown() or at exit.
+    """
+    logger.remove()
+    _stop_writers()
+
+    if console:
+        writer = BatchWriter(sys.stderr, capacity)
+        _writers.append(writer)
+        logger.add(writer.write, level=level, format=CONSOLE_FORMAT, colorize=sys.stderr.isatty())
+
+    if json_path:
+        writer = BatchWriter(
+            open(json_path, 'a', encoding='utf-8'),
+            capacity,
+            encode=lambda item: json.dumps(item, ensure_ascii=False) + "\n",
+            close_stream=True
+        )
+        _writers.append(writer)
+        logger.add(writer.put, level=level, format="{message}")
+
+    if gui_ring is not None:
+        logger.add(gui_ring.put, level=level, format=GUI_FORMAT)
+
+    return logger
+
+
+def shutdown():
+    logger.remove()
+    _stop_writers()
@@ -0,0 +1,283 @@
+"""
+Metrics for IDLIX Downloader
+
+Latency histograms and counters per stage and per host, so a slow title can
+be traced to the site, jeniusplay or the CDN. IdlixHelper stages are wrapped
+with @stage, every pooled request and segment fetch calls record_request.
+Export as JSON or Prometheus text (file or a small /metrics endpoint) and as
+a summary table for the CLI.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import json
+import time
+import bisect
+import threading
+import functools
+import contextvars
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds, Prometheus style upper bounds; the last bucket is +Inf
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.4, 0.6, 1.0, 1.5, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+current_stage = contextvars.ContextVar('idlix_stage', default='other')
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Estimate by linear interpolation inside the bucket, like histogram_quantile() in PromQL.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Metrics:
+    PREFIX = 'idlix'
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+            self.started = time.time()
+
+    def record_request(self, host, seconds, status=None, nbytes=0, error=None, stage=None, retry=False):
+        """
+        One HTTP request. `error` is an exception class name; HTTP status >= 400 counts as an error too.
+        """
+        stage = stage or current_stage.get()
+        self.observe('request_seconds', seconds, host=host, stage=stage)
+        if nbytes:
+            self.inc('request_bytes_total', nbytes, host=host, stage=stage)
+        if retry:
+            self.inc('retries_total', host=host, stage=stage)
+        if error or (status and status >= 400):
+            self.inc('request_errors_total', host=host, stage=stage, kind=error or f'http_{status}')
+
+    def stage(self, name):
+        """
+        Decorator for IdlixHelper stages: times the call and labels the requests made inside it.
+        A result dict with status False counts as a stage error.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                token = current_stage.set(name)
+                started = time.perf_counter()
+                error = None
+                try:
+                    result = func(*args, **kwargs)
+                    if isinstance(result, dict) and not result.get('status'):
+                        error = 'failed'
+                    return result
+                except Exception as error_stage:
+                    error = type(error_stage).__name__
+                    raise
+                finally:
+                    current_stage.reset(token)
+                    self.observe('stage_seconds', time.perf_counter() - started, stage=name)
+                    if error:
+                        self.inc('stage_errors_total', stage=name, kind=error)
+            return wrapper
+        return decorator
+
+    # ============================================================
+    # Export
+    # ============================================================
+    def to_dict(self):
+        with self._lock:
+            return {
+                'uptime_s': round(time.time() - self.started, 3),
+                'histograms': [
+                    dict(name=name, labels=dict(labels), **histogram.to_dict())
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                'gauges': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.gauges.items()
+                ],
+            }
+
+    def to_prometheus(self):
+        def render(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{key}="{str(value)}"' for key, value in pairs) + '}'
+
+        lines = []
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+        typed = set()
+        for (name, labels), histogram in histograms:
+            metric = f'{self.PREFIX}_{name}'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{render(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{metric}_sum{render(labels)} {histogram.sum:.6f}')
+            lines.append(f'{metric}_count{render(labels)} {histogram.count}')
+        for (name, labels), value in counters:
+            metric = f'{self.PREFIX}_{name}'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{render(labels)} {value}')
+        for (name, labels), value in gauges:
+            metric = f'{self.PREFIX}_{name}'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f'# TYPE {metric} gauge')
+            lines.append(f'{metric}{render(labels)} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        JSON when the path ends with .json, Prometheus text (node_exporter textfile format) otherwise.
+        """
+        body = json.dumps(self.to_dict(), indent=2) if path.endswith('.json') else self.to_prometheus()
+        tmp_path = path + '.part'
+        with open(tmp_path, 'w', encoding='utf-8') as output:
+            output.write(body)
+        os.replace(tmp_path, path)
+
+    def serve(self, port, host='127.0.0.1'):
+        """
+        Background /metrics (Prometheus text) and /metrics.json endpoint. Returns the server.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == '/metrics.json':
+                    body, content_type = json.dumps(registry.to_dict()), 'application/json'
+                elif self.path == '/metrics':
+                    body, content_type = registry.to_prometheus(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        return server
+
+    def summary_rows(self):
+        """
+        One row per (stage, host): requests, errors, retries, p50 / p95 ms and MB, slowest stages first.
+        """
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+
+        def total(name, labels):
+            return sum(
+                value for (counter, counter_labels), value in counters.items()
+                if counter == name and all(item in counter_labels for item in labels)
+            )
+
+        rows = []
+        for (name, labels), histogram in histograms.items():
+            if name == 'stage_seconds':
+                host = '*'
+                errors = total('stage_errors_total', labels)
+                retries = total('retries_total', labels)
+                nbytes = total('request_bytes_total', labels)
+            elif name == 'request_seconds':
+                host = dict(labels)['host']
+                errors = total('request_errors_total', labels)
+                retries = total('retries_total', labels)
+                nbytes = total('request_bytes_total', labels)
+            else:
+                continue
+            rows.append({
+                'stage': dict(labels)['stage'],
+                'host': host,
+                'count': histogram.count,
+                'errors': errors,
+                'retries': retries,
+                'p50_ms': round(histogram.quantile(0.5) * 1000, 1),
+                'p95_ms': round(histogram.quantile(0.95) * 1000, 1),
+                'total_s': round(histogram.sum, 3),
+                'mb': round(nbytes / 1024 / 1024, 2),
+            })
+        return sorted(rows, key=lambda row: (row['host'] != '*', -row['total_s']))
+
+
+metrics = Metrics()
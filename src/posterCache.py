@@ -0,0 +1,114 @@
+"""
+Poster Thumbnail Cache for IDLIX Downloader GUI
+
+Fetches posters through the session pool, decodes them straight at
+thumbnail size and keeps the thumbnails on disk, evicting the least
+recently used files once the cache grows past max_bytes.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from io import BytesIO
+from PIL import Image
+from src.bandwidthLimiter import bandwidth
+
+
+class PosterCache:
+    DIR_NAME = 'poster_cache'
+    MAX_BYTES = 50 * 1024 * 1024
+    # A .part file this old was left behind by a crash, not by a fetch in progress
+    STALE_PART = 3600
+
+    def __init__(self, cache_dir=None, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir or os.path.join(os.getcwd(), self.DIR_NAME)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path(self, url, size):
+        key = hashlib.sha1(f'{url}|{size[0]}x{size[1]}'.encode()).hexdigest()
+        return os.path.join(self.cache_dir, key + '.jpg')
+
+    def get(self, url, size):
+        """
+        Cached thumbnail or None. Cheap enough for the Tk thread.
+        """
+        path = self.path(url, size)
+        try:
+            image = Image.open(path)
+            image.load()
+        except (OSError, ValueError):
+            return None
+        # mtime doubles as the LRU clock
+        os.utime(path)
+        return image
+
+    @staticmethod
+    def decode(raw, size):
+        image = Image.open(BytesIO(raw))
+        # JPEG decoder scales by 1/2, 1/4 or 1/8 while decoding, no full-size bitmap in memory
+        image.draft('RGB', size)
+        return image.convert('RGB').resize(size, reducing_gap=2.0)
+
+    def fetch(self, url, size, pool, timeout=8):
+        """
+        Cache first, otherwise download, decode at target size and store. Runs in worker threads.
+        """
+        image = self.get(url, size)
+        if image:
+            return image
+        request = pool.get(url, timeout=timeout)
+        if request.status_code != 200:
+            raise Exception(f'HTTP {request.status_code} loading poster')
+        time.sleep(bandwidth.background.pace(len(request.content)))
+        image = self.decode(request.content, size)
+        self.put(url, size, image)
+        return image
+
+    def put(self, url, size, image):
+        path = self.path(url, size)
+        # Own temp file per writer, two fetches of the same poster must not share one
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                image.save(tmp_file, 'JPEG', quality=90)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            now = time.time()
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                    if name.endswith('.part'):
+                        # In flight in another thread unless stale, never counted as an entry
+                        if now - stat.st_mtime > self.STALE_PART:
+                            os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
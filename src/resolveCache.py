@@ -0,0 +1,102 @@
+"""
+Resolution Cache for IDLIX Downloader
+
+SQLite store keyed by page URL for the values IdlixHelper resolves before a
+download can start (post id, name, poster, embed URL, playlist URLs).
+Every field has its own TTL and the least recently used titles are evicted.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+class ResolveCache:
+    FILE_NAME = 'idlix_cache.sqlite3'
+    MAX_ENTRIES = 500
+    # Page metadata hardly ever changes, the signed playlist URLs expire quickly
+    FIELD_TTL = {
+        'video_id': 30 * 86400,
+        'video_name': 30 * 86400,
+        'poster': 7 * 86400,
+        'embed_url': 86400,
+        'm3u8_url': 3 * 3600,
+        'variant_playlist': 3 * 3600,
+    }
+
+    def __init__(self, path=None, max_entries=MAX_ENTRIES, field_ttl=None):
+        self.path = path or os.path.join(os.getcwd(), self.FILE_NAME)
+        self.max_entries = max_entries
+        self.field_ttl = dict(self.FIELD_TTL, **(field_ttl or {}))
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (url TEXT PRIMARY KEY, last_used REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fields ("
+                "url TEXT, field TEXT, value TEXT, stored_at REAL, PRIMARY KEY (url, field))"
+            )
+
+    def get(self, url, *fields):
+        """
+        Return {field: value} when every requested field is cached and fresh, otherwise None.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            rows = self._db.execute(
+                f"SELECT field, value, stored_at FROM fields WHERE url = ? AND field IN ({','.join('?' * len(fields))})",
+                (url, *fields)
+            ).fetchall()
+            values = {
+                field: json.loads(value) for field, value, stored_at in rows
+                if now - stored_at < self.field_ttl.get(field, 0)
+            }
+            if len(values) != len(fields):
+                return None
+            self._db.execute("UPDATE entries SET last_used = ? WHERE url = ?", (now, url))
+        return values
+
+    def set(self, url, **fields):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO entries (url, last_used) VALUES (?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET last_used = excluded.last_used",
+                (url, now)
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO fields (url, field, value, stored_at) VALUES (?, ?, ?, ?)",
+                [(url, field, json.dumps(value), now) for field, value in fields.items()]
+            )
+            self._evict()
+
+    def invalidate(self, url, *fields):
+        with self._lock, self._db:
+            if fields:
+                self._db.execute(
+                    f"DELETE FROM fields WHERE url = ? AND field IN ({','.join('?' * len(fields))})",
+                    (url, *fields)
+                )
+            else:
+                self._db.execute("DELETE FROM fields WHERE url = ?", (url,))
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+
+    def _evict(self):
+        stale = self._db.execute(
+            "SELECT url FROM entries ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+            (self.max_entries,)
+        ).fetchall()
+        if stale:
+            self._db.executemany("DELETE FROM fields WHERE url = ?", stale)
+            self._db.executemany("DELETE FROM entries WHERE url = ?", stale)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
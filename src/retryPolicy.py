@@ -0,0 +1,257 @@
+"""
+Retry Engine for IDLIX Downloader
+
+Shared by the CLI, the GUI, batch jobs and segment fetches:
+    - exponential backoff with full jitter
+    - retryable vs fatal classification of results and exceptions
+    - a per-run retry budget (retries earn a share of the calls made)
+    - per-host circuit breakers, so a dead host fails fast instead of
+      costing every queued title its full set of attempts
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import time
+import random
+import asyncio
+import threading
+from curl_cffi.requests import exceptions as curl_exceptions
+from src.metrics import metrics
+from src.jobControl import JobCancelled, DeadlineExceeded
+
+# HTTP status codes worth another attempt; 403 included because CDN edges reject tokens intermittently
+RETRYABLE_STATUS = (403, 408, 425, 429, 500, 502, 503, 504)
+
+# Result messages caused by the input or a missing earlier stage, retrying cannot fix them
+FATAL_MESSAGES = (
+    'URL is required',
+    'Invalid URL',
+    'Video ID is required',
+    'Embed URL is required',
+    'M3U8 URL is required',
+    'Subtitle not found',
+)
+
+# curl_cffi < 0.8 (the pinned 0.7.1) only has RequestsException, the finer classes came later
+FATAL_ERRORS = tuple(filter(None, (
+    getattr(curl_exceptions, name, None) for name in (
+        'InvalidURL', 'InvalidSchema', 'MissingSchema', 'URLRequired',
+        'CertificateVerifyError', 'TooManyRedirects', 'ImpersonateError',
+    )
+)))
+REQUEST_ERRORS = getattr(curl_exceptions, 'RequestException', None) or curl_exceptions.RequestsException
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class HttpStatusError(Exception):
+    def __init__(self, status_code, url):
+        super().__init__(f'HTTP {status_code} loading {url}')
+        self.status_code = status_code
+
+
+def retryable_error(error):
+    if isinstance(error, HttpStatusError):
+        return error.status_code in RETRYABLE_STATUS
+    if isinstance(error, (CircuitOpenError, JobCancelled, DeadlineExceeded) + FATAL_ERRORS):
+        return False
+    return isinstance(error, (REQUEST_ERRORS, OSError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open -> half-open after `reset_after`
+    seconds, where one probe request decides between closed and open again.
+    """
+    THRESHOLD = 5
+    RESET_AFTER = 30
+
+    def __init__(self, threshold=THRESHOLD, reset_after=RESET_AFTER):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release(self):
+        """
+        The request let through told nothing about the host (cancelled, throttled): free the
+        half-open probe for the next request without counting a success or a failure.
+        """
+        with self._lock:
+            self.probing = False
+
+
+class RetryBudget:
+    """
+    Every call deposits `ratio` tokens, every retry spends one, so retries stay a bounded share
+    of the traffic of a run. `minimum` tokens are there from the start for small runs.
+    """
+    RATIO = 0.2
+    MINIMUM = 10
+
+    def __init__(self, ratio=RATIO, minimum=MINIMUM):
+        self.ratio = ratio
+        self.tokens = float(minimum)
+        self.maximum = float(minimum) * 10
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.maximum)
+
+    def spend(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    ATTEMPTS = 3
+    BASE_DELAY = 0.5
+    MAX_DELAY = 8.0
+
+    def __init__(self, attempts=ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY, budget=None,
+                 breaker_threshold=CircuitBreaker.THRESHOLD, breaker_reset=CircuitBreaker.RESET_AFTER):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def breaker(self, host):
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self.breakers[host]
+
+    # ============================================================
+    # Request level, called by SessionPool / HlsDownloader / AsyncIdlixHelper
+    # ============================================================
+    def before_request(self, host):
+        if not self.breaker(host).allow():
+            metrics.inc('circuit_rejections_total', host=host)
+            raise CircuitOpenError(f'Circuit open for {host}, skipping request')
+
+    def after_request(self, host, status=None, error=None):
+        if status == 429 or getattr(error, 'status_code', None) == 429:
+            # Throttled, not down: backoff and the adaptive segment limit slow down, the circuit stays as it is
+            return self.breaker(host).release()
+        if isinstance(error, (asyncio.CancelledError, JobCancelled, DeadlineExceeded)) or (
+                error is not None and not isinstance(error, Exception)):
+            # Hedge loser, seek, job cancel or timeout of our own: no outcome for the host
+            return self.breaker(host).release()
+        if error is not None:
+            failed = retryable_error(error)
+        else:
+            failed = status is not None and status >= 500
+        if failed:
+            self.breaker(host).failure()
+        else:
+            self.breaker(host).success()
+
+    def may_retry(self):
+        """
+        Called before sleeping for another attempt; False when the run has used up its retry budget.
+        """
+        if self.budget.spend():
+            return True
+        metrics.inc('retry_budget_exhausted_total')
+        return False
+
+    # ============================================================
+    # Stage level, the old retry() of main.py / main_gui.py
+    # ============================================================
+    @staticmethod
+    def classify(result):
+        """
+        'ok', 'retry' or 'fatal' for an IdlixHelper result dict.
+        """
+        if result and result.get('status'):
+            return 'ok'
+        if not result:
+            return 'retry'
+        if 'retryable' in result:
+            return 'retry' if result['retryable'] else 'fatal'
+        if result.get('status_code') and result['status_code'] not in RETRYABLE_STATUS:
+            return 'fatal'
+        if result.get('message') in FATAL_MESSAGES:
+            return 'fatal'
+        return 'retry'
+
+    def wait(self, seconds):
+        time.sleep(seconds)
+
+    def call(self, func, *args, **kwargs):
+        name = getattr(func, '__name__', 'call')
+        result = None
+        for attempt in range(self.attempts):
+            self.budget.deposit()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error_call:
+                if not retryable_error(error_call):
+                    raise
+                result = {'status': False, 'message': str(error_call)}
+            outcome = self.classify(result)
+            if outcome != 'retry':
+                return result
+            if attempt + 1 == self.attempts or not self.may_retry():
+                break
+            metrics.inc('retries_total', stage=name)
+            self.wait(self.backoff(attempt))
+        return {
+            'status': False,
+            'message': f"Maximum retry reached: {(result or {}).get('message')}"
+        }
+
+
+retry_policy = RetryPolicy()
+
+
+def retry(func, *args, **kwargs):
+    return retry_policy.call(func, *args, **kwargs)
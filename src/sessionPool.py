@@ -0,0 +1,128 @@
+"""
+Session Pool for IDLIX Downloader
+
+One impersonated, keep-alive curl_cffi session per host (idlix, jeniusplay,
+CDN, poster host, ...) with a shared cookie jar, so every request after the
+first one to a host skips the TCP + TLS handshake.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import time
+import random
+import threading
+from http.cookiejar import CookieJar
+from urllib.parse import urlsplit
+from curl_cffi import CurlOpt
+from curl_cffi.requests import Session
+from src.metrics import metrics
+from src.retryPolicy import retry_policy
+
+
+class SessionPool:
+    IMPERSONATE = ["chrome124", "chrome119", "chrome104"]
+    MAX_CONNECTIONS = 10
+    TIMEOUT = 30
+
+    def __init__(self, impersonate=None, max_connections=MAX_CONNECTIONS, proxies=None, timeout=TIMEOUT, policy=None):
+        self.impersonate = impersonate or random.choice(self.IMPERSONATE)
+        self.max_connections = max_connections
+        self.proxies = proxies
+        self.timeout = timeout
+        # Per-host circuit breakers live in the retry policy, shared with the segment downloader
+        self.policy = policy or retry_policy
+        self.cookies = CookieJar()
+        self._headers = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url):
+        return urlsplit(url).netloc or url
+
+    def register(self, url, headers):
+        """
+        Default headers for every request to the host of `url`, e.g. the idlix page headers.
+        """
+        host = self.host(url)
+        with self._lock:
+            self._headers[host] = headers
+            if host in self._sessions:
+                self._sessions[host].headers.update(headers)
+
+    def session(self, url):
+        host = self.host(url)
+        with self._lock:
+            if host not in self._sessions:
+                self._sessions[host] = Session(
+                    impersonate=self.impersonate,
+                    headers=self._headers.get(host),
+                    cookies=self.cookies,
+                    proxies=self.proxies,
+                    timeout=self.timeout,
+                    curl_options={CurlOpt.MAXCONNECTS: self.max_connections},
+                    debug=False,
+                )
+            return self._sessions[host]
+
+    def request(self, method, url, **kwargs):
+        host = self.host(url)
+        self.policy.before_request(host)
+        started = time.perf_counter()
+        try:
+            response = self.session(url).request(method, url, **kwargs)
+        except Exception as error_request:
+            metrics.record_request(host, time.perf_counter() - started, error=type(error_request).__name__)
+            self.policy.after_request(host, error=error_request)
+            raise
+        self.policy.after_request(host, response.status_code)
+        # Streamed bodies are not read yet, get_until accounts for their bytes
+        nbytes = 0 if kwargs.get('stream') else len(response.content)
+        metrics.record_request(host, time.perf_counter() - started, response.status_code, nbytes)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def get_until(self, url, feed, **kwargs):
+        """
+        Streamed GET that hands every body chunk to feed(chunk) and closes the response as soon
+        as feed returns True. Returns the response (body not loaded) and whether the body was read to the end.
+        """
+        host = self.host(url)
+        self.policy.before_request(host)
+        started = time.perf_counter()
+        response = None
+        complete = True
+        nbytes = 0
+        try:
+            response = self.session(url).get(url, stream=True, **kwargs)
+            if response.status_code == 200:
+                for chunk in response.iter_content():
+                    nbytes += len(chunk)
+                    if feed(chunk):
+                        complete = False
+                        break
+        except Exception as error_request:
+            metrics.record_request(host, time.perf_counter() - started, nbytes=nbytes, error=type(error_request).__name__)
+            self.policy.after_request(host, error=error_request)
+            raise
+        finally:
+            if response is not None:
+                response.close()
+        metrics.record_request(host, time.perf_counter() - started, response.status_code, nbytes)
+        self.policy.after_request(host, response.status_code)
+        return response, complete
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,82 @@
+"""
+Tool Locator for IDLIX Downloader
+
+Finds ffmpeg and ffplay once and remembers their paths in a small state
+file, so a restart or a new IdlixHelper no longer scans PATH or unpacks
+ffmpeg-release-essentials.zip again. A remembered path is only trusted
+while the file is still there.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import json
+import shutil
+import threading
+
+# Where the Windows fallback of IdlixHelper unpacks the ffmpeg release zip
+BUNDLED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ffmpeg')
+
+
+class ToolLocator:
+    FILE_NAME = 'idlix_tools.json'
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.getcwd(), self.FILE_NAME)
+        self._tools = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as state_file:
+                tools = json.load(state_file)
+            return tools if isinstance(tools, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = self.path + '.part'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as state_file:
+                json.dump(self._tools, state_file, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Read-only working dir, the paths are still cached for this run
+            pass
+
+    @staticmethod
+    def _bundled(name):
+        if not os.path.isdir(BUNDLED_DIR):
+            return None
+        executable = name + '.exe' if os.name == 'nt' else name
+        for entry in os.listdir(BUNDLED_DIR):
+            candidate = os.path.join(BUNDLED_DIR, entry, 'bin', executable)
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def find(self, name):
+        """
+        Absolute path of `name` (ffmpeg, ffplay), from the state file, PATH or the unpacked bundle. None if missing.
+        """
+        with self._lock:
+            if self._tools is None:
+                self._tools = self._load()
+            cached = self._tools.get(name)
+            if cached and os.path.isfile(cached):
+                return cached
+            found = shutil.which(name) or self._bundled(name)
+            if found:
+                self._tools[name] = found
+                self._save()
+            return found
+
+    def command(self, name):
+        """
+        What to put in argv[0]: the located path, or the bare name so the OS reports a missing tool.
+        """
+        return self.find(name) or name
+
+
+tools = ToolLocator()
@@ -0,0 +1,117 @@
+"""
+Tests for src/adaptiveConcurrency.py: how the AIMD limit moves on
+congestion, slowdown, plateau and clean windows, and that slots follow it.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import asyncio
+import pytest
+from src import adaptiveConcurrency
+from src.adaptiveConcurrency import AimdLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(adaptiveConcurrency.time, 'perf_counter', clock)
+    return clock
+
+
+def window(limiter, clock, seconds=1.0, nbytes=1_000_000):
+    """
+    One round of `limit` requests of `seconds` each, run side by side.
+    """
+    clock.now += seconds
+    for _ in range(max(limiter.MIN_SAMPLES, limiter.limit)):
+        limiter.observe(seconds, nbytes)
+
+
+def test_slow_start_doubles_then_probes_additively(clock):
+    limiter = AimdLimiter(2, 1, 32)
+    window(limiter, clock)
+    assert limiter.limit == 4
+    window(limiter, clock)
+    assert limiter.limit == 8
+    clock.now += 1
+    limiter.observe(1.0, congested=True)
+    assert limiter.limit == 4
+    window(limiter, clock)
+    assert limiter.limit == 5
+
+
+def test_congestion_halves_once_per_round(clock):
+    limiter = AimdLimiter(16, 1, 32)
+    clock.now += 1
+    limiter.observe(0.5, congested=True)
+    assert limiter.limit == 8
+    # Started before the cut, at the old limit: no second cut
+    limiter.observe(0.8, congested=True)
+    assert limiter.limit == 8
+    clock.now += 1
+    limiter.observe(0.5, congested=True)
+    assert limiter.limit == 4
+
+
+def test_slowdown_backs_off(clock):
+    limiter = AimdLimiter(4, 1, 32)
+    limiter.slow_start = False
+    window(limiter, clock)
+    assert limiter.limit == 5
+    # Every request now takes three times as long for the same bytes: the link is full
+    window(limiter, clock, seconds=3.0)
+    assert limiter.limit == 4
+
+
+def test_plateau_reverts_the_last_increase(clock):
+    limiter = AimdLimiter(4, 1, 32)
+    limiter.slow_start = False
+    window(limiter, clock)
+    assert limiter.limit == 5
+    # One more request in flight, the same total goodput
+    clock.now += 1.0
+    for _ in range(5):
+        limiter.observe(1.0, 800_000)
+    assert limiter.limit == 4
+
+
+def test_limit_stays_between_floor_and_ceiling(clock):
+    limiter = AimdLimiter(4, 3, 6)
+    for _ in range(5):
+        window(limiter, clock)
+    assert limiter.limit == 6
+    for _ in range(5):
+        clock.now += 10
+        limiter.observe(0.1, congested=True)
+    assert limiter.limit == 3
+
+
+def test_slots_follow_the_limit():
+    async def run():
+        limiter = AimdLimiter(2, 1, 8)
+        running, peak = 0, 0
+
+        async def request():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(request() for _ in range(10)))
+        first_peak, peak = peak, 0
+        limiter._change(5, 'test', '')
+        await asyncio.gather(*(request() for _ in range(10)))
+        return first_peak, peak
+
+    assert asyncio.run(run()) == (2, 5)
@@ -0,0 +1,93 @@
+"""
+Tests for src/bandwidthLimiter.py: rate parsing, the token bucket and the
+weighted split between jobs.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import pytest
+from src import bandwidthLimiter
+from src.bandwidthLimiter import BandwidthLimiter, parse_rate, parse_weights
+
+
+class Clock:
+    def __init__(self):
+        self.now = 50.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(bandwidthLimiter.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.mark.parametrize('value, rate', [
+    ('0', 0), ('', 0), (None, 0), ('1000', 1000), ('500K', 500 * 1024), ('4M', 4 * 1024 ** 2),
+    ('1.5MB/s', int(1.5 * 1024 ** 2)), ('2g', 2 * 1024 ** 3),
+])
+def test_parse_rate(value, rate):
+    assert parse_rate(value) == rate
+
+
+def test_parse_rate_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_rate('fast')
+
+
+def test_parse_weights():
+    assert parse_weights(' play=8, download=1.5 ') == {'play': 8.0, 'download': 1.5}
+    assert parse_weights('') == {}
+
+
+def test_unlimited_never_waits(clock):
+    share = BandwidthLimiter().share()
+    assert share.pace(10 ** 9) == 0.0
+
+
+def test_burst_then_rate(clock):
+    limiter = BandwidthLimiter(rate=1000)
+    share = limiter.share()
+    # The first BURST seconds of the rate are free
+    assert share.pace(500) == 0.0
+    assert share.pace(1000) == pytest.approx(1.0)
+    clock.now += 1.0
+    assert share.pace(0) == 0.0
+
+
+def test_pre_charged_estimate_is_settled(clock):
+    share = BandwidthLimiter(rate=1000).share()
+    share.pace(500)
+    assert share.pace(2000) == pytest.approx(2.0)
+    # The segment came in at 500 bytes, not the 2000 charged up front
+    assert share.pace(-1500) == pytest.approx(0.5)
+
+
+def test_active_shares_split_by_weight(clock):
+    limiter = BandwidthLimiter(rate=9000)
+    first, second = limiter.share('download'), limiter.share('download')
+    first.pace(0)
+    assert limiter.share_rate(first) == limiter.rate
+    second.pace(0)
+    assert limiter.share_rate(first) == pytest.approx(4500)
+    # Idle shares stop counting
+    clock.now += limiter.IDLE + 1
+    first.pace(0)
+    assert limiter.share_rate(first) == limiter.rate
+
+
+def test_held_play_share_takes_its_weight(clock):
+    limiter = BandwidthLimiter(rate=9000, weights={'play': 8, 'download': 1})
+    download, play = limiter.share('download'), limiter.share('play')
+    playing = [True]
+    play.hold(lambda: playing[0])
+    assert limiter.share_rate(download) == pytest.approx(1000)
+    playing[0] = False
+    assert limiter.share_rate(download) == limiter.rate
+    play.hold()
+    play.release()
+    assert limiter.share_rate(download) == limiter.rate
@@ -0,0 +1,118 @@
+"""
+Tests for the segment journal of src/hlsDownloader.py: what survives an
+interrupted download and what is fetched again on resume.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import pytest
+from bench.standinServer import StandinServer, StandinConfig, segment_bytes
+from src.hlsDownloader import HlsDownloader, SegmentError, SegmentFileSink, SegmentJournal
+from src.jobControl import Job
+
+PLAYLIST = 'https://cdn.example/hls/abc/720/media.m3u8'
+
+
+def segment_path(tmp_dir):
+    return lambda index: os.path.join(tmp_dir, f'{index:06d}.ts')
+
+
+def write_segments(tmp_dir, playlist_url, segments, total=None):
+    """
+    A journal as an interrupted download leaves it: every segment in `segments` stored and recorded.
+    """
+    journal = SegmentJournal(tmp_dir)
+    journal.resume(playlist_url, total or len(segments), segment_path(tmp_dir))
+    for index, data in segments.items():
+        with open(segment_path(tmp_dir)(index), 'wb') as segment_file:
+            segment_file.write(data)
+        journal.record(index, data)
+    journal.close()
+
+
+def resume(tmp_dir, playlist_url=PLAYLIST, total=4):
+    journal = SegmentJournal(tmp_dir)
+    finished = journal.resume(playlist_url, total, segment_path(tmp_dir))
+    journal.close()
+    return finished
+
+
+def test_resume_returns_recorded_segments(tmp_path):
+    write_segments(str(tmp_path), PLAYLIST, {0: b'a' * 10, 2: b'c' * 10}, total=4)
+    assert resume(str(tmp_path)) == {0, 2}
+
+
+def test_resume_ignores_the_signed_query(tmp_path):
+    write_segments(str(tmp_path), PLAYLIST + '?token=old&expires=1', {0: b'a', 1: b'b'}, total=4)
+    assert resume(str(tmp_path), PLAYLIST + '?token=new&expires=2') == {0, 1}
+
+
+def test_resume_skips_changed_or_missing_segments(tmp_path):
+    write_segments(str(tmp_path), PLAYLIST, {0: b'aaaa', 1: b'bbbb', 2: b'cccc'}, total=4)
+    # Same length, other bytes: only the checksum tells
+    with open(segment_path(str(tmp_path))(0), 'wb') as segment_file:
+        segment_file.write(b'xxxx')
+    # Cut short by the crash
+    with open(segment_path(str(tmp_path))(1), 'wb') as segment_file:
+        segment_file.write(b'bb')
+    os.remove(segment_path(str(tmp_path))(2))
+    assert resume(str(tmp_path)) == set()
+
+
+def test_resume_survives_a_torn_last_line(tmp_path):
+    write_segments(str(tmp_path), PLAYLIST, {0: b'a', 1: b'b'}, total=4)
+    with open(os.path.join(str(tmp_path), SegmentJournal.FILE_NAME), 'a') as journal_file:
+        journal_file.write('{"index": 2, "length": 1, "chec')
+    assert resume(str(tmp_path)) == {0, 1}
+
+
+@pytest.mark.parametrize('playlist_url, total', [
+    ('https://cdn.example/hls/other/720/media.m3u8', 4),
+    (PLAYLIST, 5),
+])
+def test_journal_of_another_playlist_is_discarded(tmp_path, playlist_url, total):
+    write_segments(str(tmp_path), PLAYLIST, {0: b'a', 1: b'b'}, total=4)
+    assert resume(str(tmp_path), playlist_url, total) == set()
+    # Started over for the new playlist, the old entries do not come back
+    assert resume(str(tmp_path), PLAYLIST, 4) == set()
+
+
+def concat(sink):
+    with open(sink.output_path, 'wb') as output:
+        for index in range(sink.total):
+            with open(sink.segment_path(index), 'rb') as segment_file:
+                output.write(segment_file.read())
+
+
+def test_download_resumes_after_an_interrupted_run(tmp_path, monkeypatch):
+    tmp_dir = str(tmp_path / 'tmp')
+
+    def download():
+        downloader = HlsDownloader(
+            server.base_url + 'cdn/abc/720/media.m3u8', 'title', output_dir=str(tmp_path), tmp_dir=tmp_dir,
+            mode='segments', job=Job(budget=None), hedge=False
+        )
+        return downloader.download()
+
+    def broken_mux(sink):
+        raise SegmentError('ffmpeg failed: interrupted')
+
+    with StandinServer(StandinConfig(segments=8, segment_size=4096, latency=0, variants=(720,))) as server:
+        stats = server.handler.stats
+        monkeypatch.setattr(SegmentFileSink, '_mux', broken_mux)
+        with pytest.raises(SegmentError):
+            download()
+        assert stats.to_dict()['requests']['segment'] == 8
+
+        # Lose one segment and corrupt another, both must be fetched again, nothing else
+        os.remove(os.path.join(tmp_dir, '000003.ts'))
+        with open(os.path.join(tmp_dir, '000005.ts'), 'r+b') as segment_file:
+            segment_file.write(b'\0' * 16)
+        monkeypatch.setattr(SegmentFileSink, '_mux', concat)
+        path = download()
+        assert stats.to_dict()['requests']['segment'] == 10
+
+    with open(path, 'rb') as output:
+        assert output.read() == b''.join(segment_bytes('abc', '720', index, 4096) for index in range(8))
@@ -0,0 +1,117 @@
+"""
+Tests for src/htmlExtract.py: the regex fast path and the streaming
+VideoDataScanner must give what the BeautifulSoup parsers give, or None so
+IdlixHelper falls back to them.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import pytest
+from src import htmlExtract
+from src.htmlExtract import VideoDataScanner
+from src.idlixHelper import IdlixHelper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench', 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as fixture_file:
+        return fixture_file.read()
+
+
+def movie_page(post_id, name, image, filler=''):
+    return f'<html><head>{post_id}{name}</head><body>{filler}<div class="poster">{image}</div></body></html>'
+
+
+# Attribute quoting, order, entities and encodings the pages have used or could
+MOVIE_PAGES = {
+    'single quotes': movie_page(
+        "<meta id='dooplay-ajax-counter' data-postid='42'/>",
+        "<meta itemprop='name' content='Film%2042%20%282024%29'>",
+        "<img itemprop='image' src='https://img.example/42.jpg'>",
+    ),
+    'double quotes, other order': movie_page(
+        '<meta data-postid="42" id="dooplay-ajax-counter">',
+        '<meta content="Film 42" itemprop="name"/>',
+        '<img src="https://img.example/42.jpg" alt="Film" itemprop="image"/>',
+    ),
+    'unquoted': movie_page(
+        '<meta id=dooplay-ajax-counter data-postid=42>',
+        '<meta itemprop=name content=Film42>',
+        '<img itemprop=image src=https://img.example/42.jpg>',
+    ),
+    'entities': movie_page(
+        '<meta id="dooplay-ajax-counter" data-postid="42">',
+        '<meta itemprop="name" content="Tom &amp; Jerry&#39;s &quot;Film&quot;">',
+        '<img itemprop="image" src="https://img.example/42.jpg?w=300&amp;h=450">',
+    ),
+    'non-ascii': movie_page(
+        '<meta id="dooplay-ajax-counter" data-postid="42">',
+        '<meta itemprop="name" content="Amélie – 天気の子">',
+        '<img itemprop="image" src="https://img.example/42.jpg">',
+        filler='<p>' + 'é' * 5000 + '</p>',
+    ),
+    'upper case tags': movie_page(
+        '<META ID="dooplay-ajax-counter" DATA-POSTID="42">',
+        '<META ITEMPROP="name" CONTENT="Film 42">',
+        '<IMG ITEMPROP="image" SRC="https://img.example/42.jpg">',
+    ),
+}
+
+
+@pytest.mark.parametrize('html', [fixture('movie.html')] + list(MOVIE_PAGES.values()),
+                         ids=['fixture'] + list(MOVIE_PAGES))
+def test_video_data_matches_soup(html):
+    assert htmlExtract.video_data(html) == IdlixHelper.parse_video_page_soup(html)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 64, 1000, 4096, 1 << 20])
+@pytest.mark.parametrize('html', [fixture('movie.html')] + list(MOVIE_PAGES.values()),
+                         ids=['fixture'] + list(MOVIE_PAGES))
+def test_scanner_matches_soup_at_any_chunk_size(html, chunk_size):
+    body = html.encode('utf-8')
+    scanner = VideoDataScanner()
+    done_at = None
+    for start in range(0, len(body), chunk_size):
+        if scanner.feed(body[start:start + chunk_size]):
+            done_at = start + chunk_size
+            break
+    assert done_at is not None
+    assert scanner.result() == IdlixHelper.parse_video_page_soup(html)
+
+
+def test_scanner_stops_before_the_rest_of_the_page():
+    html = fixture('movie.html')
+    body = html.encode('utf-8')
+    scanner = VideoDataScanner()
+    for start in range(0, len(body), 1024):
+        if scanner.feed(body[start:start + 1024]):
+            break
+    assert scanner.bytes_read < len(body)
+    # What was read is still enough for the soup fallback
+    assert IdlixHelper.parse_video_page_soup(scanner.text) == scanner.result()
+
+
+@pytest.mark.parametrize('html', [
+    movie_page('', '<meta itemprop="name" content="Film">', '<img itemprop="image" src="a.jpg">'),
+    movie_page('<meta id="dooplay-ajax-counter">', '<meta itemprop="name" content="Film">',
+               '<img itemprop="image" src="a.jpg">'),
+    movie_page('<meta id="dooplay-ajax-counter" data-postid="1">', '', '<img itemprop="image" src="a.jpg">'),
+], ids=['no post id tag', 'no data-postid', 'no name'])
+def test_incomplete_page_falls_back(html):
+    assert htmlExtract.video_data(html) is None
+    scanner = VideoDataScanner()
+    scanner.feed(html.encode('utf-8'))
+    assert scanner.result() is None
+
+
+def test_home_matches_soup():
+    html = fixture('home.html')
+    featured = htmlExtract.home(html)
+    assert featured and featured == IdlixHelper.parse_home_soup(html)
+
+
+def test_home_without_featured_block_falls_back():
+    assert htmlExtract.home('<html><body><div class="items">nothing</div></body></html>') is None
@@ -0,0 +1,146 @@
+"""
+Tests for IdlixHelper stages that keep state between requests, against a
+stub session pool.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import json
+import asyncio
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src import idlixHelper
+from src.idlixHelper import IdlixHelper
+from src.asyncIdlixHelper import AsyncIdlixHelper, IdlixTitle
+
+
+class Response:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class StubPool:
+    """
+    Answers every POST with the next of `posts` and every GET with `page`; records what was asked.
+    """
+
+    def __init__(self, posts=(), page=''):
+        self.posts = list(posts)
+        self.page = page
+        self.asked = []
+
+    def register(self, *args):
+        pass
+
+    def session(self, *args):
+        return None
+
+    def post(self, url, **kwargs):
+        self.asked.append(url)
+        return self.posts.pop(0)
+
+    def get(self, url, **kwargs):
+        self.asked.append(url)
+        return Response(self.page)
+
+    def get_until(self, url, feed, **kwargs):
+        self.asked.append(url)
+        body = self.page.encode()
+        for start in range(0, len(body), 256):
+            if feed(body[start:start + 256]):
+                return Response(''), False
+        return Response(''), True
+
+
+@pytest.fixture(autouse=True)
+def ffmpeg_found(monkeypatch):
+    # The helper refuses to start without ffmpeg, none of these tests run it
+    monkeypatch.setattr(idlixHelper.tools, 'find', lambda name: name)
+
+
+def helper(pool):
+    idlix = IdlixHelper(cache=False, pool=pool)
+    idlix.embed_url = 'abc123'
+    return idlix
+
+
+def test_video_payload_is_shared_once_it_has_a_source():
+    source = {'videoSource': 'https://cdn.example/hls/abc/master.txt'}
+    pool = StubPool([Response(json.dumps(source))])
+    idlix = helper(pool)
+    assert idlix._get_video_payload()['json'] == source
+    assert idlix._get_video_payload()['json'] == source
+    assert len(pool.asked) == 1
+
+
+def test_video_payload_without_a_source_is_asked_again():
+    source = {'videoSource': 'https://cdn.example/hls/abc/master.txt'}
+    pool = StubPool([Response('{"error": "busy"}'), Response('<html>maintenance</html>'), Response(json.dumps(source))])
+    idlix = helper(pool)
+    assert idlix._get_video_payload()['json'] == {'error': 'busy'}
+    assert idlix._get_video_payload()['json'] == {}
+    assert idlix._get_video_payload()['json'] == source
+    assert len(pool.asked) == 3
+
+
+def test_failed_video_payload_request_is_not_kept():
+    pool = StubPool([Response('', 502), Response('{"videoSource": "https://cdn.example/a.txt"}')])
+    idlix = helper(pool)
+    assert idlix._get_video_payload() is None
+    assert idlix.video_source_m3u8(idlix._get_video_payload()['json']) == 'https://cdn.example/a.m3u8'
+
+
+# An old player block left in a comment: the fast path sees its tags first, BeautifulSoup skips it
+COMMENTED_PAGE = (
+    '<html><head><!-- <meta id="dooplay-ajax-counter"><meta itemprop="name"><img itemprop="image"> -->'
+    + '<p>' + 'x' * 4096 + '</p>'
+    + '<meta id="dooplay-ajax-counter" data-postid="77"><meta itemprop="name" content="Film%2077"></head>'
+    + '<body>' + 'y' * 20000 + '<img itemprop="image" src="https://img.example/77.jpg"></body></html>'
+)
+COMMENTED_DATA = {'video_id': '77', 'video_name': 'Film 77', 'poster': 'https://img.example/77.jpg'}
+
+
+def test_unusable_fast_path_parses_the_whole_page(monkeypatch):
+    monkeypatch.setattr(IdlixHelper, 'BASE_WEB_URL', 'https://idlix.example/')
+    url = 'https://idlix.example/movie/film-77/'
+    pool = StubPool(page=COMMENTED_PAGE)
+    result = IdlixHelper(cache=False, pool=pool).get_video_data(url)
+    assert result['status']
+    assert {key: result[key] for key in COMMENTED_DATA} == COMMENTED_DATA
+    # The scan stopped early, so the page was loaded again in full
+    assert pool.asked == [url, url]
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = COMMENTED_PAGE.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_async_unusable_fast_path_parses_the_whole_page(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/'
+    monkeypatch.setattr(IdlixHelper, 'BASE_WEB_URL', base_url)
+
+    async def resolve():
+        async with AsyncIdlixHelper() as helper:
+            return await helper.get_video_data(IdlixTitle(base_url + 'movie/film-77/'))
+
+    try:
+        title = asyncio.run(resolve())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert title.status
+    assert (title.video_id, title.video_name, title.poster) == tuple(COMMENTED_DATA.values())
@@ -0,0 +1,76 @@
+"""
+Tests for src/posterCache.py: concurrent writers, LRU eviction and
+in-flight temp files.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import os
+import time
+import threading
+from PIL import Image
+from src.posterCache import PosterCache
+
+SIZE = (150, 210)
+URL = 'https://img.example/1.jpg'
+
+
+def poster(color):
+    return Image.new('RGB', SIZE, color)
+
+
+def test_put_then_get(tmp_path):
+    cache = PosterCache(cache_dir=str(tmp_path))
+    cache.put(URL, SIZE, poster('red'))
+    image = cache.get(URL, SIZE)
+    assert image.size == SIZE
+    assert cache.get('https://img.example/other.jpg', SIZE) is None
+    assert [name for name in os.listdir(str(tmp_path)) if name.endswith('.part')] == []
+
+
+def test_concurrent_writers_of_one_poster(tmp_path):
+    cache = PosterCache(cache_dir=str(tmp_path))
+    errors = []
+
+    def write(color):
+        try:
+            for _ in range(20):
+                cache.put(URL, SIZE, poster(color))
+        except Exception as error_write:
+            errors.append(error_write)
+
+    threads = [threading.Thread(target=write, args=(color,)) for color in ('red', 'green', 'blue', 'white')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    # Whichever writer won, the file is a whole JPEG
+    assert cache.get(URL, SIZE).size == SIZE
+    assert os.listdir(str(tmp_path)) == [os.path.basename(cache.path(URL, SIZE))]
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = PosterCache(cache_dir=str(tmp_path), max_bytes=10 ** 9)
+    urls = [f'https://img.example/{index}.jpg' for index in range(3)]
+    for index, url in enumerate(urls):
+        cache.put(url, SIZE, poster('red'))
+        # mtime is the LRU clock
+        os.utime(cache.path(url, SIZE), (1000 + index, 1000 + index))
+    cache.max_bytes = os.path.getsize(cache.path(urls[0], SIZE)) * 2
+    cache.evict()
+    assert [os.path.exists(cache.path(url, SIZE)) for url in urls] == [False, True, True]
+
+
+def test_evict_leaves_in_flight_part_files(tmp_path):
+    cache = PosterCache(cache_dir=str(tmp_path), max_bytes=0)
+    in_flight = tmp_path / 'abc.part'
+    in_flight.write_bytes(b'x' * 1000)
+    stale = tmp_path / 'old.part'
+    stale.write_bytes(b'x' * 1000)
+    old = time.time() - PosterCache.STALE_PART - 10
+    os.utime(str(stale), (old, old))
+    cache.evict()
+    assert in_flight.exists()
+    assert not stale.exists()
@@ -0,0 +1,140 @@
+"""
+Tests for VirtualPosterGrid of main_gui.py on a stub canvas: which cells
+exist and which posters get painted, without a display.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import pytest
+from PIL import Image
+import main_gui
+from main_gui import VirtualPosterGrid
+
+POSTER_SIZE = (150, 210)
+
+
+class StubCanvas:
+    """
+    Just enough of tk.Canvas for the grid: item ids, their options and a fixed viewport.
+    """
+
+    def __init__(self, width=700, height=600):
+        self.width = width
+        self.height = height
+        self.top = 0
+        self.options = {}
+        self.tags = {}
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def canvasy(self, y):
+        return self.top + y
+
+    def _create(self, tags, **options):
+        item = len(self.options) + 1
+        self.options[item] = dict(options)
+        for tag in tags:
+            self.tags.setdefault(tag, []).append(item)
+        return item
+
+    def create_image(self, x, y, anchor=None, image=None, tags=()):
+        return self._create(tags, image=image)
+
+    def create_text(self, x, y, anchor=None, fill=None, width=None, justify=None, tags=()):
+        return self._create(tags, text='')
+
+    def itemconfigure(self, item, **options):
+        for target in self.tags.get(item, [item]):
+            self.options[target].update(options)
+
+    def coords(self, item, *xy):
+        pass
+
+    def configure(self, **options):
+        pass
+
+    def bind(self, *args):
+        pass
+
+    def tag_bind(self, *args):
+        pass
+
+    def yview(self, *args):
+        pass
+
+    def yview_moveto(self, fraction):
+        self.top = 0
+
+
+class StubScrollbar:
+    def configure(self, **options):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def photo_images(monkeypatch):
+    # ImageTk.PhotoImage needs a Tk interpreter, the grid only hands it back to the canvas
+    monkeypatch.setattr(main_gui.ImageTk, 'PhotoImage', lambda img: ('photo', id(img)))
+
+
+def make_grid(need_image):
+    return VirtualPosterGrid(StubCanvas(), StubScrollbar(), POSTER_SIZE, lambda movie: None, need_image)
+
+
+def movies(count):
+    return [{'title': f'Film {i}', 'poster': f'https://img.example/{i}.jpg'} for i in range(count)]
+
+
+def painted(grid):
+    return [
+        cell['index'] for cell in grid.cells
+        if cell['index'] is not None and grid.canvas.options[cell['image']]['image'] is not grid.placeholder
+    ]
+
+
+def test_cached_posters_paint_on_the_first_redraw():
+    poster = Image.new('RGB', POSTER_SIZE)
+    grid = None
+
+    def from_cache(generation, index, movie):
+        # Like IdlixGUI.request_poster with every thumbnail on disk: answered synchronously
+        grid.set_image(generation, index, poster)
+
+    grid = make_grid(from_cache)
+    grid.set_items(movies(12))
+    assert sorted(painted(grid)) == list(range(12))
+    assert not grid.requested
+
+
+def test_posters_from_the_network_paint_when_they_arrive():
+    asked = []
+    grid = make_grid(lambda generation, index, movie: asked.append((generation, index)))
+    grid.set_items(movies(12))
+    assert sorted(index for _, index in asked) == list(range(12))
+    assert painted(grid) == []
+    for generation, index in asked:
+        grid.set_image(generation, index, Image.new('RGB', POSTER_SIZE))
+    assert sorted(painted(grid)) == list(range(12))
+
+
+def test_late_image_of_an_older_list_is_dropped():
+    asked = []
+    grid = make_grid(lambda generation, index, movie: asked.append((generation, index)))
+    grid.set_items(movies(4))
+    old_generation = asked[0][0]
+    grid.set_items(movies(4))
+    grid.set_image(old_generation, 0, Image.new('RGB', POSTER_SIZE))
+    assert painted(grid) == []
+
+
+def test_only_rows_near_the_viewport_get_cells():
+    grid = make_grid(lambda generation, index, movie: None)
+    grid.set_items(movies(1000))
+    # 4 columns of 170 px; rows of 270 px, so rows 0-2 are on screen, plus BUFFER_ROWS below
+    assert len(grid.cells) == 4 * (3 + VirtualPosterGrid.BUFFER_ROWS)
+    assert grid.visible == range(0, len(grid.cells))
@@ -0,0 +1,85 @@
+"""
+Tests for src/resolveCache.py: per-field TTL, LRU eviction and invalidation.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import pytest
+from src import resolveCache
+from src.resolveCache import ResolveCache
+
+URL = 'https://tv10.idlixku.com/movie/film-1/'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resolveCache.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResolveCache(path=str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_get_returns_every_requested_field(cache):
+    cache.set(URL, video_id='1', video_name='Film', variant_playlist=[{'id': 0, 'resolution': '720p'}])
+    assert cache.get(URL, 'video_id', 'variant_playlist') == {
+        'video_id': '1', 'variant_playlist': [{'id': 0, 'resolution': '720p'}]
+    }
+
+
+def test_get_is_all_or_nothing(cache):
+    cache.set(URL, video_id='1')
+    assert cache.get(URL, 'video_id', 'embed_url') is None
+
+
+def test_fields_expire_on_their_own_ttl(cache, clock):
+    cache.set(URL, video_id='1', m3u8_url='https://cdn.example/master.m3u8')
+    clock.now += ResolveCache.FIELD_TTL['m3u8_url'] + 1
+    assert cache.get(URL, 'm3u8_url') is None
+    assert cache.get(URL, 'video_id') == {'video_id': '1'}
+
+
+def test_least_recently_used_title_is_evicted(cache, clock):
+    for index in range(2):
+        cache.set(f'{URL}{index}', video_id=str(index))
+        clock.now += 1
+    # Reading the first keeps it, the second is now the oldest
+    assert cache.get(f'{URL}0', 'video_id')
+    clock.now += 1
+    cache.set(f'{URL}2', video_id='2')
+    assert cache.get(f'{URL}0', 'video_id') == {'video_id': '0'}
+    assert cache.get(f'{URL}1', 'video_id') is None
+    assert cache.get(f'{URL}2', 'video_id') == {'video_id': '2'}
+
+
+def test_invalidate_fields_or_title(cache):
+    cache.set(URL, video_id='1', m3u8_url='https://cdn.example/master.m3u8')
+    cache.invalidate(URL, 'm3u8_url')
+    assert cache.get(URL, 'm3u8_url') is None
+    assert cache.get(URL, 'video_id') == {'video_id': '1'}
+    cache.invalidate(URL)
+    assert cache.get(URL, 'video_id') is None
+
+
+def test_survives_a_restart(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite3')
+    first = ResolveCache(path=path)
+    first.set(URL, embed_url='https://jeniusplay.com/video/abc')
+    first.close()
+    second = ResolveCache(path=path)
+    assert second.get(URL, 'embed_url') == {'embed_url': 'https://jeniusplay.com/video/abc'}
+    second.close()
@@ -0,0 +1,151 @@
+"""
+Tests for src/retryPolicy.py: circuit breaker states, the half-open probe
+and the retry budget.
+
+Date    :   October 2026
+Author  :   sandroputraa
+"""
+
+import asyncio
+import pytest
+from src import retryPolicy
+from src.retryPolicy import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy, HttpStatusError
+from src.hlsDownloader import HlsDownloader
+from src.jobControl import JobCancelled
+
+HOST = 'cdn.example'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retryPolicy.time, 'monotonic', clock)
+    return clock
+
+
+def open_policy(clock, reset_after=30):
+    policy = RetryPolicy(breaker_threshold=1, breaker_reset=reset_after)
+    policy.after_request(HOST, 503)
+    assert policy.breaker(HOST).state == 'open'
+    clock.now += reset_after
+    assert policy.breaker(HOST).state == 'half-open'
+    return policy
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(threshold=3, reset_after=30)
+    breaker.failure()
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    breaker.failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+
+def test_half_open_lets_one_probe_through(clock):
+    policy = open_policy(clock)
+    policy.before_request(HOST)
+    with pytest.raises(CircuitOpenError):
+        policy.before_request(HOST)
+
+
+def test_successful_probe_closes(clock):
+    policy = open_policy(clock)
+    policy.before_request(HOST)
+    policy.after_request(HOST, 200)
+    assert policy.breaker(HOST).state == 'closed'
+    policy.before_request(HOST)
+    policy.before_request(HOST)
+
+
+def test_failed_probe_opens_again(clock):
+    policy = open_policy(clock)
+    policy.before_request(HOST)
+    policy.after_request(HOST, error=HttpStatusError(502, 'https://cdn.example/a.ts'))
+    assert policy.breaker(HOST).state == 'open'
+    with pytest.raises(CircuitOpenError):
+        policy.before_request(HOST)
+
+
+@pytest.mark.parametrize('outcome', [
+    {'error': asyncio.CancelledError()},
+    {'error': JobCancelled('Cancelled by user')},
+    {'error': KeyboardInterrupt()},
+    {'status': 429},
+    {'error': HttpStatusError(429, 'https://cdn.example/a.ts')},
+])
+def test_probe_without_outcome_is_handed_back(clock, outcome):
+    policy = open_policy(clock)
+    policy.before_request(HOST)
+    policy.after_request(HOST, **outcome)
+    breaker = policy.breaker(HOST)
+    # Neither closed nor opened again, and the next request may probe
+    assert breaker.state == 'half-open' and breaker.failures == 1
+    policy.before_request(HOST)
+
+
+class HangingSession:
+    async def request(self, *args, **kwargs):
+        await asyncio.sleep(3600)
+
+
+def test_cancelled_segment_request_frees_the_probe(clock):
+    policy = open_policy(clock)
+    downloader = HlsDownloader(f'https://{HOST}/media.m3u8', 'title', policy=policy, hedge=False)
+
+    async def cancel_probe():
+        probe = asyncio.ensure_future(downloader._request(HangingSession(), 'GET', f'https://{HOST}/0.ts'))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            policy.before_request(HOST)
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+
+    asyncio.run(cancel_probe())
+    assert policy.breaker(HOST).allow()
+
+
+def test_retry_budget_refills_from_calls():
+    budget = RetryBudget(ratio=0.5, minimum=1)
+    assert budget.spend()
+    assert not budget.spend()
+    budget.deposit()
+    assert not budget.spend()
+    budget.deposit()
+    assert budget.spend()
+
+
+def test_call_stops_retrying_when_the_budget_is_spent():
+    policy = RetryPolicy(attempts=5, budget=RetryBudget(ratio=0, minimum=1))
+    policy.wait = lambda seconds: None
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        return {'status': False, 'message': 'HTTP 503'}
+
+    result = policy.call(flaky)
+    assert not result['status'] and len(calls) == 2
+
+
+def test_call_does_not_retry_fatal_results():
+    policy = RetryPolicy(attempts=5)
+    policy.wait = lambda seconds: None
+    calls = []
+
+    def missing():
+        calls.append(1)
+        return {'status': False, 'message': 'Invalid URL'}
+
+    assert policy.call(missing) == {'status': False, 'message': 'Invalid URL'}
+    assert len(calls) == 1